@@ -0,0 +1,309 @@
+"""
+Benchmarks del pipeline sobre datos sintéticos de tamaño producción.
+
+Genera (una sola vez por escala) los archivos de entrada con generadores.py y
+mide cada caso en un proceso aparte, con FILTROS_DATA apuntando a los datos
+sintéticos para no tocar data/. Cada caso corre dentro de una corrida de
+metricas.py, así que además del total quedan los pasos internos (las reglas
+del script 2, el cruce de CUIT del script 3, etc.).
+
+    python benchmarks/bench.py                          # escalas 1, 2 y 5
+    python benchmarks/bench.py --escalas 1 --casos lote formato
+    python benchmarks/bench.py --fraccion 0.05          # datos al 5% (prueba rápida)
+
+Los resultados quedan en benchmarks/resultados/bench-AAAAMMDDTHHMMSS.json
+(con el commit medido) y se comparan contra el resultado anterior con la misma
+fracción: una diferencia de tiempo mayor a UMBRAL_REGRESION se marca con ⚠.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+
+BENCH_DIR = Path(__file__).parent
+BASE_DIR = BENCH_DIR.parent
+DATOS_DIR = BENCH_DIR / 'datos'
+RESULTADOS_DIR = BENCH_DIR / 'resultados'
+sys.path.insert(0, str(BASE_DIR / 'filtros'))
+
+UMBRAL_REGRESION = 0.20  # +20% de tiempo contra la corrida anterior
+MINIMO_COMPARABLE_S = 0.1  # pasos más cortos que esto son ruido y no se marcan
+
+# Filas del escalar de referencia (normalize_phone fila por fila es ~100x más lento)
+MUESTRA_ESCALAR = 100_000
+
+
+# ==================== CASOS ====================
+# Cada caso corre en su propio proceso con FILTROS_DATA ya definido, por eso
+# los módulos del pipeline se importan adentro de cada función.
+def caso_telefonos(datos):
+    import pandas as pd
+    from metricas import medir
+    from telefonos import normalize_phone, normalizar_telefonos, procesar_numeros
+
+    clientes = pd.read_csv(datos / 'raw' / 'reportes' / 'reporte-0.csv', sep=';',
+                           usecols=['Cliente'], dtype=str)['Cliente']
+    with medir('normalizar_telefonos', clientes) as paso:
+        paso.salida(normalizar_telefonos(clientes).dropna())
+    with medir('procesar_numeros', clientes) as paso:
+        paso.salida(procesar_numeros(clientes))
+    muestra = clientes.head(MUESTRA_ESCALAR)
+    with medir('normalize_phone (escalar)', muestra) as paso:
+        paso.salida(muestra.apply(normalize_phone).dropna())
+
+
+def caso_ingesta(datos):
+    from ingesta import leer_iris, leer_reporte, procesar_archivos
+    from metricas import medir
+
+    # Solo lectura: los archivos no se marcan como procesados
+    reportes = sorted((datos / 'raw' / 'reportes').glob('reporte-[0-9]*.csv'))
+    with medir('ingesta reportes') as paso:
+        paso.salida(procesar_archivos(leer_reporte, reportes)[0])
+    iris = sorted((datos / 'raw' / 'extraerEstado').glob('iris-*.txt'))
+    with medir('ingesta Iris') as paso:
+        paso.salida(procesar_archivos(leer_iris, iris)[0])
+
+
+def caso_consolidado(datos):
+    import esquemas
+    from consolidado import agregar_al_consolidado, leer_consolidado, update_consolidated
+    from ingesta import leer_iris, procesar_archivos
+    from metricas import medir
+
+    df_nuevo, _ = procesar_archivos(leer_iris, sorted((datos / 'raw' / 'extraerEstado').glob('iris-*.txt')))
+    consolidado = datos / 'processed' / 'Iris-consolidado'
+    with medir('leer consolidado Iris') as paso:
+        df_existente = leer_consolidado(consolidado, esquemas.IRIS)
+        paso.salida(df_existente)
+    with medir('update_consolidated', len(df_existente) + len(df_nuevo)) as paso:
+        paso.salida(update_consolidated(df_existente, df_nuevo.copy(), 'linea'))
+    # El almacén particionado se mide sobre una copia para no alterar los datos de la escala
+    with tempfile.TemporaryDirectory(dir=datos) as tmp:
+        copia = Path(tmp) / 'Iris-consolidado'
+        shutil.copytree(consolidado, copia)
+        with medir('agregar_al_consolidado', df_nuevo) as paso:
+            paso.salida(agregar_al_consolidado(copia, df_nuevo, esquemas.IRIS))
+
+
+def _etapa(numero):
+    import importlib
+    return importlib.import_module({
+        2: '2_Filtro-seleccion-de-lote',
+        3: '3_Formato-base',
+    }[numero])
+
+
+def _reporte_de_ayer(etapa2, datos):
+    """El script 2 busca el reporte por la fecha de ayer: se copia el sintético con ese nombre"""
+    destino = etapa2.reporte_dia_anterior()
+    if not destino.exists():
+        shutil.copyfile(datos / 'raw' / 'reportes' / 'reporte-ayer.csv', destino)
+
+
+def caso_lote_frio(datos):
+    """Script 2 sin snapshot de la base ni índices (primera corrida del día con base nueva)"""
+    etapa2 = _etapa(2)
+    _reporte_de_ayer(etapa2, datos)
+    etapa2.BASE_ELEGIBLE.unlink(missing_ok=True)
+    shutil.rmtree(etapa2.INDICE_EXCLUSION, ignore_errors=True)
+    shutil.rmtree(etapa2.INDICE_IRIS, ignore_errors=True)
+    etapa2.main(guardar_csv=False)
+
+
+def caso_lote(datos):
+    """Script 2 con snapshot e índices ya armados; el lote queda para el caso formato"""
+    from checkpoints import guardar_df
+
+    etapa2 = _etapa(2)
+    _reporte_de_ayer(etapa2, datos)
+    guardar_df(etapa2.main(guardar_csv=False), datos / 'lote.parquet')
+
+
+def caso_lote_arrow(datos):
+    """Script 2 con el motor arrow (mismo snapshot e índices que el caso lote)"""
+    etapa2 = _etapa(2)
+    _reporte_de_ayer(etapa2, datos)
+    etapa2.main(guardar_csv=False, motor='arrow')
+
+
+def caso_formato(datos):
+    from checkpoints import leer_df
+
+    _etapa(3).main(leer_df(datos / 'lote.parquet'))
+
+
+CASOS = {
+    'telefonos': caso_telefonos,
+    'ingesta': caso_ingesta,
+    'consolidado': caso_consolidado,
+    'lote_frio': caso_lote_frio,
+    'lote': caso_lote,
+    'lote_arrow': caso_lote_arrow,
+    'formato': caso_formato,
+}
+
+
+def correr_caso(nombre, datos):
+    """Punto de entrada del proceso hijo: el reporte queda en datos/runs/"""
+    from metricas import corrida
+
+    with corrida(datos / 'runs', nombre=nombre):
+        CASOS[nombre](datos)
+
+
+# ==================== ORQUESTACIÓN ====================
+def _directorio(escala, fraccion):
+    return DATOS_DIR / (f'x{escala}' if fraccion == 1 else f'x{escala}-f{fraccion:g}')
+
+
+def preparar(escala, fraccion, regenerar=False):
+    """Genera los datos de la escala si no existen (o si se pide regenerarlos)"""
+    directorio = _directorio(escala, fraccion)
+    listo = directorio / '.listo'
+    if listo.exists() and not regenerar:
+        return directorio
+    shutil.rmtree(directorio, ignore_errors=True)
+    print(f"\n🔄 Generando datos sintéticos x{escala} (fracción {fraccion:g}) en {directorio}")
+    # En otro proceso: Linux conserva el RSS pico a través de fork/exec y los
+    # casos heredarían el del generador
+    subprocess.run([sys.executable, __file__, '--generar', str(escala), '--fraccion', str(fraccion),
+                    '--datos', str(directorio)], check=True)
+    return directorio
+
+
+def generar_datos(escala, fraccion, directorio):
+    from generadores import generar
+
+    filas = generar(directorio, escala=escala, fraccion=fraccion)
+    (directorio / '.listo').write_text(json.dumps(filas), encoding='utf-8')
+
+
+def _hijo(nombre, datos):
+    """
+    Corre un caso en un proceso nuevo y devuelve su reporte de métricas, o
+    None si el proceso falló (si murió antes de escribir el reporte, el último
+    de data/runs es el de una corrida anterior)
+    """
+    from metricas import ultimo_reporte
+
+    env = os.environ.copy()
+    env['FILTROS_DATA'] = str(datos)
+    env['PYTHONIOENCODING'] = 'utf-8'
+    resultado = subprocess.run(
+        [sys.executable, __file__, '--caso', nombre, '--datos', str(datos)],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, encoding='utf-8', errors='replace', check=False,
+    )
+    if resultado.returncode != 0:
+        print(f"  ✗ {nombre} (código {resultado.returncode}): {resultado.stderr.strip()[-500:]}")
+        return None
+    return ultimo_reporte(datos / 'runs')
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                               capture_output=True, text=True, check=False).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _filas_por_segundo(paso):
+    filas = paso.get('filas_entrada') or paso.get('filas_salida')
+    if not filas or not paso['wall_s']:
+        return None
+    return round(filas / paso['wall_s'])
+
+
+def _anterior(fraccion):
+    """Último resultado guardado con la misma fracción de datos"""
+    for archivo in sorted(RESULTADOS_DIR.glob('bench-*.json'), reverse=True):
+        resultado = json.loads(archivo.read_text(encoding='utf-8'))
+        if resultado.get('fraccion') == fraccion:
+            return resultado
+    return None
+
+
+def _indice(resultado):
+    return {(m['escala'], m['caso'], m['paso']): m for m in resultado['mediciones']} if resultado else {}
+
+
+def imprimir(resultado, anterior):
+    previos = _indice(anterior)
+    if anterior:
+        print(f"\nComparado con {anterior['fecha']} (commit {anterior.get('commit') or '?'})")
+    print(f"\n{'escala':<7}{'caso':<13}{'paso':<40}{'tiempo':>9}{'filas/s':>12}{'RSS MB':>9}  cambio")
+    for m in resultado['mediciones']:
+        cambio = ''
+        previo = previos.get((m['escala'], m['caso'], m['paso']))
+        if previo and min(previo['wall_s'], m['wall_s']) >= MINIMO_COMPARABLE_S:
+            delta = m['wall_s'] / previo['wall_s'] - 1
+            cambio = f"{delta:+.0%}" + ('  ⚠' if delta > UMBRAL_REGRESION else '')
+        sangria = '  ' * max(m['nivel'] - 1, 0)
+        print(f"x{m['escala']:<6}{m['caso']:<13}{(sangria + m['paso'])[:39]:<40}{m['wall_s']:>8.2f}s"
+              f"{m['filas_s'] or '':>12}{m['rss_pico_mb'] or '':>9}  {cambio}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline con datos sintéticos")
+    parser.add_argument('--escalas', type=int, nargs='+', default=[1, 2, 5],
+                        help="múltiplos del volumen de producción (default: 1 2 5)")
+    parser.add_argument('--fraccion', type=float, default=1.0,
+                        help="achicar todos los archivos (p. ej. 0.05 para una prueba rápida)")
+    parser.add_argument('--casos', nargs='+', choices=list(CASOS), default=list(CASOS))
+    parser.add_argument('--regenerar', action='store_true', help="volver a generar los datos sintéticos")
+    parser.add_argument('--caso', help=argparse.SUPPRESS)    # uso interno: proceso hijo
+    parser.add_argument('--generar', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--datos', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generar:
+        generar_datos(args.generar, args.fraccion, Path(args.datos))
+        return
+
+    if args.caso:
+        correr_caso(args.caso, Path(args.datos))
+        return
+
+    resultado = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'fraccion': args.fraccion,
+        'mediciones': [],
+    }
+    for escala in args.escalas:
+        datos = preparar(escala, args.fraccion, args.regenerar)
+        for nombre in args.casos:
+            print(f"→ x{escala} {nombre}")
+            reporte = _hijo(nombre, datos)
+            if reporte is None or reporte['nombre'] != nombre:
+                continue
+            for paso in reporte['pasos']:
+                resultado['mediciones'].append({
+                    'escala': escala,
+                    'caso': nombre,
+                    'paso': paso['nombre'],
+                    'nivel': paso['nivel'],
+                    'wall_s': paso['wall_s'],
+                    'cpu_s': paso['cpu_s'],
+                    'rss_pico_mb': paso['rss_pico_mb'],
+                    'filas_s': _filas_por_segundo(paso),
+                    'estado': reporte['estado'],
+                })
+
+    anterior = _anterior(args.fraccion)
+    RESULTADOS_DIR.mkdir(parents=True, exist_ok=True)
+    archivo = RESULTADOS_DIR / f"bench-{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    archivo.write_text(json.dumps(resultado, ensure_ascii=False, indent=1), encoding='utf-8')
+    imprimir(resultado, anterior)
+    print(f"\n✓ Resultados: {archivo}")
+
+
+if __name__ == '__main__':
+    main()
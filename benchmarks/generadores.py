@@ -0,0 +1,238 @@
+"""
+Generadores de datos sintéticos con la forma de los archivos reales.
+
+Escala 1 = volumen de producción: base de 5.2M filas, 5.5M registros de Iris,
+3M de Registro_No_Llame y ~1M de lineas_filtradas_150. Los números son
+argentinos (código de área de 2, 3 o 4 dígitos + abonado, 10 dígitos en
+total) y en los reportes aparecen con las variantes que limpia la
+normalización: prefijo 0 / 90, "15" después del código de área, espacios y
+guiones.
+
+Todo se genera con numpy / pyarrow (sin loops por fila) y con semilla fija:
+la misma escala produce siempre los mismos archivos.
+
+    datos/
+    ├── base_2024_2025_actualizada.parquet   (todas las columnas como texto)
+    ├── Registro_No_Llame.parquet            (linea como texto)
+    ├── lineas_filtradas_150.parquet         (linea int64)
+    ├── base_cuit.csv                        (DNI,CUIT)
+    ├── raw/reportes/reporte-N.csv           (sin procesar)
+    ├── raw/reportes/reporte-ayer.csv        (se copia al nombre del día anterior al medir)
+    ├── raw/extraerEstado/iris-N.txt         (linea&dd/mm/aaaa&estado)
+    └── processed/Iris-consolidado/          (armado desde los TXT con consolidado.py)
+"""
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+import esquemas
+from areas import CODIGOS_4_DIGITOS, largo_codigo_numerico
+from consolidado import agregar_al_consolidado
+
+
+# Filas por archivo a escala 1
+FILAS = {
+    'base': 5_200_000,
+    'iris': 5_500_000,
+    'no_llame': 3_000_000,
+    'lineas_filtradas': 1_050_000,
+    'cuit': 2_000_000,
+    'reporte': 300_000,
+}
+ARCHIVOS_IRIS = 3
+ARCHIVOS_REPORTE = 3
+
+# Códigos de área: AMBA (11) pesa la mitad; el resto se reparte entre 3 y 4 dígitos
+_AREAS_3 = np.array(['221', '223', '261', '264', '299', '341', '342', '343', '351', '353', '358',
+            '376', '379', '381', '385', '387', '388'], dtype=np.int64)
+_AREAS_4 = np.array(sorted(CODIGOS_4_DIGITOS), dtype=np.int64)
+
+ESTADOS_IRIS = ['Port In', 'Port Out', 'Activa', 'Suspendida', 'Baja']
+TIPIFICACIONES = ['Venta', 'Ya tiene MVS', 'No Disp.', 'Cliente moroso (Supera umbral)',
+                  'Edificio sin Disp de Caja', 'No contesta', 'Ocupado', 'Volver a llamar']
+CAUSAS = ['Se discó un número que no corresponde a un abonado en servicio',
+          'La Linea se encuentra en reparación', 'Normal', 'Sin respuesta']
+APELLIDOS = ['GONZALEZ', 'RODRIGUEZ', 'GOMEZ', 'FERNANDEZ', 'LOPEZ', 'DIAZ', 'MARTINEZ', 'PEREZ',
+             'GARCIA', 'SANCHEZ', 'ROMERO', 'SOSA', 'TORRES', 'ALVAREZ', 'RUIZ', 'RAMIREZ']
+NOMBRES = ['MARIA', 'JUAN', 'CARLOS', 'ANA', 'JOSE', 'LAURA', 'LUIS', 'SILVIA', 'JORGE',
+           'MARTA', 'DANIEL', 'GRACIELA', 'MIGUEL', 'NORMA', 'PABLO', 'BEATRIZ']
+
+
+# ==================== NÚMEROS ====================
+def lineas(rng, n):
+    """(línea de 10 dígitos como int64, largo del código de área) para n abonados"""
+    largo = rng.choice([2, 3, 4], size=n, p=[0.5, 0.3, 0.2])
+    area = np.full(n, 11, dtype=np.int64)
+    area[largo == 3] = rng.choice(_AREAS_3, size=(largo == 3).sum())
+    area[largo == 4] = rng.choice(_AREAS_4, size=(largo == 4).sum())
+    digitos = 10 - largo
+    # El abonado no empieza con 0 ni 1 (como en la numeración real)
+    abonado = (rng.random(n) * 8 * 10 ** (digitos - 1)).astype(np.int64) + 2 * 10 ** (digitos - 1)
+    return area * 10 ** digitos + abonado, largo
+
+
+def _texto(valores):
+    return pc.cast(pa.array(valores), pa.string())
+
+
+def variantes(rng, numeros, largo_area):
+    """
+    Números como aparecen en los reportes: 45% tal cual, 20% con 0 adelante,
+    10% con 90, 15% "0AA 15 NNNN", 5% "AA15NNNN" y 5% con guiones / basura
+    """
+    n = len(numeros)
+    texto = _texto(numeros)
+    area = pc.utf8_slice_codeunits(texto, 0, 2)
+    area = pc.if_else(pa.array(largo_area == 3), pc.utf8_slice_codeunits(texto, 0, 3), area)
+    area = pc.if_else(pa.array(largo_area == 4), pc.utf8_slice_codeunits(texto, 0, 4), area)
+    # El abonado arranca en una posición distinta según el largo del código de área
+    partes = {k: pc.utf8_slice_codeunits(texto, k, 10) for k in (2, 3, 4)}
+    resto = pc.if_else(pa.array(largo_area == 2), partes[2],
+                       pc.if_else(pa.array(largo_area == 3), partes[3], partes[4]))
+
+    tipo = rng.choice(6, size=n, p=[0.45, 0.20, 0.10, 0.15, 0.05, 0.05])
+    opciones = [
+        texto,
+        pc.binary_join_element_wise('0', texto, ''),
+        pc.binary_join_element_wise('90', texto, ''),
+        pc.binary_join_element_wise('0', area, ' 15 ', resto, ''),
+        pc.binary_join_element_wise(area, '15', resto, ''),
+        pc.binary_join_element_wise(area, '-', resto, ''),
+    ]
+    resultado = opciones[0]
+    for k in range(1, len(opciones)):
+        resultado = pc.if_else(pa.array(tipo == k), opciones[k], resultado)
+    return resultado
+
+
+def _fechas(rng, n, desde, hasta):
+    """n fechas uniformes en [desde, hasta] como timestamp[s]"""
+    inicio = np.datetime64(desde, 's').astype(np.int64)
+    fin = np.datetime64(hasta, 's').astype(np.int64)
+    segundos = rng.integers(inicio, fin, size=n)
+    return pa.array(segundos.astype('datetime64[s]'))
+
+
+# ==================== ARCHIVOS ====================
+def generar_base(rng, n, destino):
+    numeros, _ = lineas(rng, n)
+    linea = _texto(numeros)
+    # Ruido de la base real: '.0' al final, vacíos y líneas repetidas
+    ruido = rng.random(n)
+    linea = pc.if_else(pa.array(ruido < 0.005), pc.binary_join_element_wise(linea, '.0', ''), linea)
+    linea = pc.if_else(pa.array((ruido >= 0.005) & (ruido < 0.006)), pa.scalar('', pa.string()), linea)
+    repetidas = rng.random(n) < 0.01
+    linea = pc.if_else(pa.array(repetidas), pc.take(linea, pa.array(rng.integers(0, n, n))), linea)
+
+    nombres = np.array([f'{a} {b}' for a in APELLIDOS for b in NOMBRES])
+    dni = rng.integers(5_000_000, 99_999_999, size=n)
+    dni = pc.if_else(pa.array(rng.random(n) < 0.01), pa.scalar('S/D'), _texto(dni))
+    otras = pc.binary_join_element_wise(_texto(lineas(rng, n)[0]), _texto(lineas(rng, n)[0]), ', ')
+    otras = pc.if_else(pa.array(rng.random(n) < 0.7), pa.scalar(None, pa.string()), otras)
+
+    tabla = pa.table({
+        'linea': linea,
+        'nombre_completo': pa.array(nombres[rng.integers(0, len(nombres), n)]),
+        'tipo_doc': pa.array(np.where(rng.random(n) < 0.98, 'Documento Nacional Identidad', 'Pasaporte')),
+        'dni': dni,
+        'compania': pa.array(rng.choice(['Claro', 'Movistar', 'Personal'], size=n, p=[0.7, 0.15, 0.15])),
+        'contrato': pa.array(rng.choice(['Contrato CPP', 'Activa (Prepago)', 'Baja', 'Empresa'],
+                                        size=n, p=[0.45, 0.45, 0.05, 0.05])),
+        'fecha_portout': pc.strftime(_fechas(rng, n, '2022-01-01', date.today().isoformat()), format='%Y-%m-%d'),
+        'cantidad_de_lineas': _texto(rng.integers(0, 10, size=n)),
+        'otras_lineas': otras,
+    })
+    pq.write_table(tabla, destino, compression='snappy')
+    return numeros, dni
+
+
+def generar_iris(rng, lineas_base, n, destinos):
+    """Exports de Iris repartidos en `destinos`; 80% de las líneas salen de la base"""
+    extra, _ = lineas(rng, n)
+    numeros = np.where(rng.random(n) < 0.8, lineas_base[rng.integers(0, len(lineas_base), n)], extra)
+    tabla = pa.table({
+        'linea': _texto(numeros),
+        'fecha': pc.strftime(_fechas(rng, n, '2025-01-01', date.today().isoformat()), format='%d/%m/%Y'),
+        'estado': pa.array(rng.choice(ESTADOS_IRIS, size=n)),
+    })
+    opciones = pacsv.WriteOptions(include_header=False, delimiter='&', quoting_style='none')
+    for parte, destino in zip(np.array_split(np.arange(n), len(destinos)), destinos):
+        pacsv.write_csv(tabla.take(pa.array(parte)), destino, write_options=opciones)
+        # Algunas filas corruptas como en los exports reales
+        with open(destino, 'a', encoding='utf-8') as f:
+            f.write("roto&\n12345&99/99/9999&Port In\n1&2&3&4\n")
+    return tabla
+
+
+def generar_reporte(rng, lineas_base, n, destino):
+    numeros, largo = lineas(rng, n)
+    de_base = rng.random(n) < 0.7
+    elegidas = rng.integers(0, len(lineas_base), n)
+    numeros = np.where(de_base, lineas_base[elegidas], numeros)
+    # El largo del código de área de las líneas de la base se recalcula por prefijo (ver areas.py)
+    largo = largo_codigo_numerico(numeros)
+    dia = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
+    inicio = np.datetime64(dia, 's') + rng.integers(0, 36_000, n).astype('timedelta64[s]')
+    tabla = pa.table({
+        'Inicio': pc.strftime(pa.array(inicio), format='%d/%m/%Y %H:%M:%S'),
+        'Cliente': variantes(rng, numeros, largo),
+        'Tipificación': pa.array(rng.choice(TIPIFICACIONES, size=n)),
+        'Causa Terminación': pa.array(rng.choice(CAUSAS, size=n)),
+        'TalkingTime': _texto(rng.integers(0, 600, n)),
+        'Sentido': pa.array(np.full(n, 'Saliente')),
+    })
+    pacsv.write_csv(tabla, destino, write_options=pacsv.WriteOptions(delimiter=';', quoting_style='needed'))
+
+
+def generar(directorio, escala=1, fraccion=1.0, semilla=0):
+    """Genera todos los archivos de `directorio` para la escala dada (filas = FILAS * escala * fraccion)"""
+    rng = np.random.default_rng(semilla)
+    filas = {nombre: max(int(n * escala * fraccion), 10) for nombre, n in FILAS.items()}
+    (directorio / 'raw' / 'reportes').mkdir(parents=True, exist_ok=True)
+    (directorio / 'raw' / 'extraerEstado').mkdir(parents=True, exist_ok=True)
+    (directorio / 'processed').mkdir(parents=True, exist_ok=True)
+    (directorio / 'bases').mkdir(parents=True, exist_ok=True)
+
+    print(f"→ Base: {filas['base']} filas")
+    numeros, dni = generar_base(rng, filas['base'], directorio / 'base_2024_2025_actualizada.parquet')
+
+    print(f"→ Registro_No_Llame: {filas['no_llame']} filas / lineas_filtradas_150: {filas['lineas_filtradas']} filas")
+    no_llame = np.where(rng.random(filas['no_llame']) < 0.3,
+                        numeros[rng.integers(0, len(numeros), filas['no_llame'])],
+                        lineas(rng, filas['no_llame'])[0])
+    pq.write_table(pa.table({'linea': _texto(no_llame)}), directorio / 'Registro_No_Llame.parquet')
+    filtradas = np.where(rng.random(filas['lineas_filtradas']) < 0.3,
+                         numeros[rng.integers(0, len(numeros), filas['lineas_filtradas'])],
+                         lineas(rng, filas['lineas_filtradas'])[0])
+    pq.write_table(pa.table({'linea': pa.array(filtradas, pa.int64())}), directorio / 'lineas_filtradas_150.parquet')
+
+    print(f"→ base_cuit.csv: {filas['cuit']} filas")
+    dni_cuit = pc.take(dni, pa.array(rng.integers(0, len(dni), filas['cuit'])))
+    cuit = pc.binary_join_element_wise('20', dni_cuit, _texto(rng.integers(0, 10, filas['cuit'])), '')
+    pacsv.write_csv(pa.table({'DNI': dni_cuit, 'CUIT': cuit}), directorio / 'base_cuit.csv')
+
+    print(f"→ Iris: {filas['iris']} filas en {ARCHIVOS_IRIS} archivos")
+    iris = generar_iris(rng, numeros, filas['iris'], [
+        directorio / 'raw' / 'extraerEstado' / f'iris-{k}.txt' for k in range(ARCHIVOS_IRIS)
+    ])
+
+    print(f"→ Reportes: {ARCHIVOS_REPORTE} x {filas['reporte']} filas")
+    for k in range(ARCHIVOS_REPORTE):
+        generar_reporte(rng, numeros, filas['reporte'], directorio / 'raw' / 'reportes' / f'reporte-{k}.csv')
+    generar_reporte(rng, numeros, filas['reporte'], directorio / 'raw' / 'reportes' / 'reporte-ayer.csv')
+
+    # Iris-consolidado: último estado por línea, escrito con el almacén del pipeline
+    print("→ Iris-consolidado")
+    df_iris = pd.DataFrame({
+        'linea': iris['linea'].to_pandas(),
+        'fecha': pd.to_datetime(iris['fecha'].to_pandas(), format='%d/%m/%Y'),
+        'estado': iris['estado'].to_pandas(),
+    }).sort_values('fecha', kind='stable').drop_duplicates('linea', keep='last')
+    df_iris['fecha_consulta'] = date.today()
+    agregar_al_consolidado(directorio / 'processed' / 'Iris-consolidado', df_iris, esquemas.IRIS)
+    return filas
@@ -1,9 +1,13 @@
 import pandas as pd
-import re
-import os
-from datetime import datetime
 from pathlib import Path
 
+import esquemas
+from catalogo import DATA_PROCESSED, ruta
+from consolidado import agregar_al_consolidado, compactar, leer_consolidado, migrar_consolidado
+from indices import agregar_a_exclusion, construir_iris, huella_archivo
+from ingesta import leer_iris, leer_reporte, procesar_archivos
+from metricas import medir
+
 """Usar parquet
 
 # Leer CSV, forzando todo como str
@@ -16,61 +20,19 @@ df.to_parquet("mi_archivo.parquet", engine="pyarrow", compression="snappy", inde
 """
 
 # ==================== CONFIGURACIÓN DE PATHS ====================
-# El script está en filtros/, los datos están en data/ (un nivel arriba)
-BASE_DIR = Path(__file__).parent.parent
-DATA_RAW = BASE_DIR / 'data' / 'raw'
-DATA_PROCESSED = BASE_DIR / 'data' / 'processed'
-
-REPORTES_DIR = DATA_RAW / 'reportes'
-IRIS_DIR = DATA_RAW / 'extraerEstado'
-
-TIPIFICACIONES_OUTPUT = DATA_PROCESSED / 'Tipificaciones-consolidadas.parquet'
-IRIS_OUTPUT = DATA_PROCESSED / 'Iris-consolidado.parquet'
-LINEAS_FILTRADAS_150 = BASE_DIR / 'data' / 'lineas_filtradas_150.parquet'
+# Las rutas de los datasets salen del catálogo (data/ o FILTROS_DATA, ver catalogo.py)
+REPORTES_DIR = ruta('reportes')
+IRIS_DIR = ruta('iris_crudo')
+
+# Consolidados particionados (directorios con fragmentos parquet, ver consolidado.py)
+TIPIFICACIONES_OUTPUT = ruta('tipificaciones')
+IRIS_OUTPUT = ruta('iris')
+LINEAS_FILTRADAS_150 = ruta('lineas_filtradas')
+NO_LLAME = ruta('no_llame')
+INDICE_EXCLUSION = DATA_PROCESSED / 'indice_exclusion'
+INDICE_IRIS = DATA_PROCESSED / 'indice_iris'
 
 # ==================== FUNCIONES AUXILIARES ====================
-def normalize_phone(phone):
-    """
-    Normaliza números de teléfono argentinos eliminando 0, 90 y 15
-    para obtener números de 10 dígitos
-    """
-    if pd.isna(phone):
-        return None
-    
-    phone_str = str(phone).strip()
-    
-    # Eliminar espacios, guiones y paréntesis
-    phone_clean = re.sub(r'[\s\-\(\)]', '', phone_str)
-    
-    # Solo procesar si contiene solo dígitos
-    if not phone_clean.isdigit():
-        return None
-    
-    # Eliminar prefijo 0 o 90 al inicio
-    if phone_clean.startswith('90'):
-        phone_clean = phone_clean[2:]
-    elif phone_clean.startswith('0'):
-        phone_clean = phone_clean[1:]
-    
-    # Eliminar 15 después del código de área (posiciones 2-4 típicamente)
-    if len(phone_clean) > 4:
-        # Códigos de área de 2 dígitos + 15
-        if phone_clean[2:4] == '15':
-            phone_clean = phone_clean[:2] + phone_clean[4:]
-        # Códigos de área de 3 dígitos + 15  
-        elif len(phone_clean) > 5 and phone_clean[3:5] == '15':
-            phone_clean = phone_clean[:3] + phone_clean[5:]
-        # Códigos de área de 4 dígitos + 15
-        elif len(phone_clean) > 6 and phone_clean[4:6] == '15':
-            phone_clean = phone_clean[:4] + phone_clean[6:]
-    
-    # Retornar solo si tiene exactamente 10 dígitos
-    if len(phone_clean) == 10:
-        return phone_clean
-    
-    return None
-
-
 def get_unprocessed_files(directory, extension=''):
     """
     Obtiene lista de archivos que NO tienen '-p' antes de la extensión
@@ -98,297 +60,132 @@ def mark_as_processed(file_path):
     print(f"✓ Archivo marcado como procesado: {new_path.name}")
 
 
-def load_existing_consolidated(file_path, key_column):
-    """
-    Carga archivo consolidado existente, retorna DataFrame vacío si no existe o está vacío
-    """
-    if file_path.exists():
-        try:
-            df = pd.read_parquet(file_path, engine='pyarrow')
-            
-            # Verificar si el DataFrame está vacío o no tiene columnas
-            if df.empty or len(df.columns) == 0:
-                print(f"⚠ El archivo consolidado existe pero está vacío, se creará nuevo")
-                return pd.DataFrame()
-            
-            df['fecha'] = pd.to_datetime(df['fecha'])
-            print(f"✓ Cargado consolidado existente: {len(df)} registros")
-            return df
-        except Exception as e:
-            print(f"⚠ Error al cargar consolidado ({str(e)}), se creará nuevo")
-            return pd.DataFrame()
-    else:
-        print(f"⚠ No existe consolidado previo, se creará nuevo")
-        return pd.DataFrame()
+# ==================== PROCESO ====================
+def main():
+    # ==================== CARGA DE DATOS ====================
+    print("\n" + "="*60)
+    print("PROCESANDO ARCHIVOS DE REPORTES")
+    print("="*60)
 
-def update_consolidated(df_existing, df_new, key_column):
-    """
-    Actualiza el consolidado: reemplaza si fecha es mayor, sino agrega nuevos
-    """
-    if df_existing.empty:
-        return df_new
-    
-    # Convertir fechas a datetime para comparación
-    df_existing['fecha'] = pd.to_datetime(df_existing['fecha'])
-    df_new['fecha'] = pd.to_datetime(df_new['fecha'])
-    
-    # IMPORTANTE: Eliminar duplicados del existente, quedándose con el más reciente
-    df_existing = df_existing.sort_values(by='fecha', ascending=False)
-    df_existing = df_existing.drop_duplicates(subset=key_column, keep='first')
-    
-    # Crear diccionario con los registros existentes
-    existing_dict = df_existing.set_index(key_column).to_dict('index')
-    
-    # Procesar nuevos registros
-    updated_count = 0
-    added_count = 0
-    skipped_count = 0
-    
-    for idx, row in df_new.iterrows():
-        key = row[key_column]
-        
-        # Saltar si la clave es nula
-        if pd.isna(key):
-            skipped_count += 1
-            continue
-        
-        # Crear diccionario de la fila SIN incluir la columna clave
-        row_dict = row.to_dict()
-        row_dict.pop(key_column, None)  # Eliminar la columna clave del diccionario
-        
-        if key in existing_dict:
-            # Si existe, comparar fechas
-            existing_date = pd.to_datetime(existing_dict[key]['fecha'])
-            new_date = pd.to_datetime(row['fecha'])
-            
-            if new_date > existing_date:
-                # Actualizar con datos más recientes
-                existing_dict[key] = row_dict
-                updated_count += 1
-        else:
-            # Agregar nuevo registro
-            existing_dict[key] = row_dict
-            added_count += 1
-    
-    print(f"  → {updated_count} registros actualizados")
-    print(f"  → {added_count} registros nuevos agregados")
-    if skipped_count > 0:
-        print(f"  → {skipped_count} registros omitidos (clave nula)")
-    
-    # Convertir de vuelta a DataFrame
-    df_result = pd.DataFrame.from_dict(existing_dict, orient='index')
-    df_result = df_result.reset_index()
-    df_result.rename(columns={'index': key_column}, inplace=True)
-    
-    return df_result
+    # Obtener archivos sin procesar de reportes
+    reportes_files = get_unprocessed_files(REPORTES_DIR, '.csv')
+    print(f"\nArchivos de reportes a procesar: {len(reportes_files)}")
 
-# ==================== CARGA DE DATOS ====================
-print("\n" + "="*60)
-print("PROCESANDO ARCHIVOS DE REPORTES")
-print("="*60)
+    # Parsear, limpiar y deduplicar cada archivo en paralelo; se unen con un solo concat
+    with medir('ingesta reportes') as paso:
+        df_reporte_all, reportes_ok = procesar_archivos(leer_reporte, reportes_files)
+        paso.salida(df_reporte_all)
 
-# Obtener archivos sin procesar de reportes
-reportes_files = get_unprocessed_files(REPORTES_DIR, '.csv')
-print(f"\nArchivos de reportes a procesar: {len(reportes_files)}")
 
-df_reporte_all = pd.DataFrame()
+    print("\n" + "="*60)
+    print("PROCESANDO ARCHIVOS DE IRIS")
+    print("="*60)
 
-for file in reportes_files:
-    print(f"\n→ Procesando: {file.name}")
-    
-    try:
-        df_temp = pd.read_csv(file, sep=';', encoding='utf-8', dtype=str)
-        
-        # LIMPIEZA DE DATOS (Reportes)
-        valid_tipifications = {
-            "Cliente moroso (Supera umbral)",
-            "Edificio sin Disp de Caja", 
-            "Venta",
-            "Ya tiene MVS"
-        }
-        valid_causa_termincacion = {
-            "Se discó un número que no corresponde a un abonado en servicio",
-            "La Linea se encuentra en reparación"
-        }
-        
-        df_temp = df_temp[["Inicio", "Cliente", "Tipificación", "Causa Terminación", "TalkingTime", "Sentido"]]
-        df_temp = df_temp[(df_temp['Tipificación'].isin(valid_tipifications)) | (df_temp['Causa Terminación'].isin(valid_causa_termincacion))]
-        df_temp['TalkingTime'] = pd.to_numeric(df_temp['TalkingTime'], errors='coerce').astype('Int64')
-        
-        df_temp['Inicio'] = pd.to_datetime(df_temp['Inicio'], format='%d/%m/%Y %H:%M:%S')
-        df_temp = df_temp.sort_values(by='Inicio', ascending=False)
-        df_temp = df_temp.drop_duplicates(subset='Cliente', keep='first')
-        
-        df_temp['Cliente'] = df_temp['Cliente'].apply(normalize_phone)
-        df_temp['Tipificacion'] = df_temp.apply(
-            lambda row: row['Causa Terminación'] if row['Tipificación'] == 'No Disp.' else row['Tipificación'],
-            axis=1
-        )
-        df_temp['fecha'] = df_temp['Inicio'].dt.date
-        df_temp['fecha_consulta'] = datetime.today().date()
-        
-        # ✅ COLUMNAS A CONSERVAR
-        df_temp = df_temp[['Cliente', 'Tipificacion', 'fecha', 'fecha_consulta']]
-        
-        # Eliminar filas con Cliente nulo (normalize_phone puede retornar None)
-        df_temp = df_temp.dropna(subset=['Cliente'])
-        
-        print(f"  Registros válidos extraídos: {len(df_temp)}")
-        
-        # Acumular en el DataFrame general
-        df_reporte_all = pd.concat([df_reporte_all, df_temp], ignore_index=True)
-        
-        # Marcar archivo como procesado
-        mark_as_processed(file)
-        
-    except Exception as e:
-        print(f"  ✗ Error procesando {file.name}: {str(e)}")
-        continue
-    
-    
+    # Obtener archivos sin procesar de Iris
+    iris_files = get_unprocessed_files(IRIS_DIR, '.txt')
+    print(f"\nArchivos de Iris a procesar: {len(iris_files)}")
 
-print("\n" + "="*60)
-print("PROCESANDO ARCHIVOS DE IRIS")
-print("="*60)
+    with medir('ingesta Iris') as paso:
+        df_iris_all, iris_ok = procesar_archivos(leer_iris, iris_files)
+        paso.salida(df_iris_all)
 
-# Obtener archivos sin procesar de Iris
-iris_files = get_unprocessed_files(IRIS_DIR, '.txt')
-print(f"\nArchivos de Iris a procesar: {len(iris_files)}")
 
-df_iris_all = pd.DataFrame()
 
-for file in iris_files:
-    print(f"\n→ Procesando: {file.name}")
-    
-    try:
-        # Leer el archivo SIN asumir número fijo de columnas
-        # on_bad_lines='skip' descarta automáticamente filas problemáticas
-        df_temp = pd.read_csv(
-            file, 
-            sep='&', 
-            encoding='utf-8', 
-            dtype=str,
-            header=None,  # Sin encabezados
-            on_bad_lines='skip'  # Saltar líneas con problemas
-        )
-        
-        initial_count = len(df_temp)
-        
-        # Filtrar solo filas que tengan exactamente 3 columnas
-        df_temp = df_temp[df_temp.apply(lambda row: row.notna().sum() == 3, axis=1)]
-        
-        # Si después del filtro no quedan filas, saltar archivo
-        if df_temp.empty:
-            print(f"  ✗ No se encontraron filas válidas con 3 columnas")
-            continue
-        
-        # Tomar solo las primeras 3 columnas
-        df_temp = df_temp.iloc[:, :3]
-        df_temp.columns = ['linea', 'fecha', 'estado']
-        
-        corrupted_rows = initial_count - len(df_temp)
-        if corrupted_rows > 0:
-            print(f"  ⚠ Se descartaron {corrupted_rows} filas corruptas/incompletas")
-        
-        # LIMPIEZA DE DATOS (Iris)
-        df_temp['fecha'] = pd.to_datetime(df_temp['fecha'], format='%d/%m/%Y', errors='coerce')
-        
-        # Eliminar filas donde la fecha no se pudo convertir
-        df_temp = df_temp.dropna(subset=['fecha'])
-        
-        # Validación adicional: verificar que 'linea' contenga solo dígitos
-        df_temp = df_temp[df_temp['linea'].str.match(r'^\d+$', na=False)]
-        
-        df_temp = df_temp.sort_values(by='fecha', ascending=False)
-        df_temp = df_temp.drop_duplicates(subset='linea', keep='first')
-        df_temp['fecha_consulta'] = datetime.today().date()
-        
-        print(f"  Registros válidos extraídos: {len(df_temp)}")
-        
-        # Acumular en el DataFrame general
-        df_iris_all = pd.concat([df_iris_all, df_temp], ignore_index=True)
-        
-        # Marcar archivo como procesado
+    # ==================== EXPORTACIÓN DE DATOS ====================
+    print("\n" + "="*60)
+    print("CONSOLIDANDO Y EXPORTANDO DATOS")
+    print("="*60)
+
+    # Crear directorio de salida si no existe
+    DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
+
+    # Consolidar Tipificaciones
+    if not df_reporte_all.empty:
+        with medir('consolidado Tipificaciones', df_reporte_all) as paso:
+            print("\n→ Consolidando Tipificaciones...")
+            migrar_consolidado(TIPIFICACIONES_OUTPUT, esquemas.TIPIFICACIONES)
+            escritos = agregar_al_consolidado(TIPIFICACIONES_OUTPUT, df_reporte_all, esquemas.TIPIFICACIONES)
+            compactar(TIPIFICACIONES_OUTPUT, esquemas.TIPIFICACIONES)
+            print(f"✓ Guardado: {TIPIFICACIONES_OUTPUT}")
+            print(f"  Registros escritos: {escritos}")
+            paso.salida(escritos)
+    else:
+        print("\n⚠ No hay nuevos datos de reportes para consolidar")
+
+    # Recién con el consolidado escrito se marcan los archivos como procesados
+    for file in reportes_ok:
         mark_as_processed(file)
-        
-    except Exception as e:
-        print(f"  ✗ Error procesando {file.name}: {str(e)}")
-        continue
-
-# ==================== EXPORTACIÓN DE DATOS ====================
-print("\n" + "="*60)
-print("CONSOLIDANDO Y EXPORTANDO DATOS")
-print("="*60)
-
-# Crear directorio de salida si no existe
-DATA_PROCESSED.mkdir(parents=True, exist_ok=True)
-
-# Consolidar Tipificaciones
-if not df_reporte_all.empty:
-    print("\n→ Consolidando Tipificaciones...")
-    df_tipificaciones_existing = load_existing_consolidated(TIPIFICACIONES_OUTPUT, 'Cliente')
-    df_tipificaciones_final = update_consolidated(df_tipificaciones_existing, df_reporte_all, 'Cliente')
-    df_tipificaciones_final = df_tipificaciones_final.astype(str)
-    df_tipificaciones_final.to_parquet(TIPIFICACIONES_OUTPUT, engine='pyarrow', compression='snappy', index=False)
-    print(f"✓ Guardado: {TIPIFICACIONES_OUTPUT}")
-    print(f"  Total registros: {len(df_tipificaciones_final)}")
-else:
-    print("\n⚠ No hay nuevos datos de reportes para consolidar")
-
-# Consolidar Iris
-if not df_iris_all.empty:
-    print("\n→ Consolidando Iris...")
-    df_iris_existing = load_existing_consolidated(IRIS_OUTPUT, 'linea')
-    df_iris_final = update_consolidated(df_iris_existing, df_iris_all, 'linea')
-    df_iris_final = df_iris_final.astype(str)
-    df_iris_final.to_parquet(IRIS_OUTPUT, engine='pyarrow', compression='snappy', index=False)
-    print(f"✓ Guardado: {IRIS_OUTPUT}")
-    print(f"  Total registros: {len(df_iris_final)}")
-else:
-    print("\n⚠ No hay nuevos datos de Iris para consolidar")
-
-print("\n" + "="*60)
-print("PROCESO COMPLETADO")
-print("="*60 + "\n")
-
-
-
-# ==================== ACTUALIZAR LINEAS_FILTRADAS_150 ====================
-print("\n" + "="*60)
-print("ACTUALIZANDO LINEAS_FILTRADAS_150.PARQUET")
-print("="*60)
-
-tipificaciones_file = DATA_PROCESSED / 'Tipificaciones-consolidadas.parquet'
-lineas_filtradas_file = LINEAS_FILTRADAS_150  # Ya está definido arriba
-
-try:
-    # Leer el parquet de Tipificaciones (solo primera columna: Cliente)
-    df_tipificaciones = pd.read_parquet(tipificaciones_file, engine='pyarrow')
-    numeros_tipificaciones = df_tipificaciones['Cliente'].astype(str).str.strip()
-    
-    # Leer el parquet de líneas filtradas
-    df_lineas = pd.read_parquet(lineas_filtradas_file, engine='pyarrow')
-    numeros_lineas = df_lineas.iloc[:, 0].astype(str).str.strip()
-    
-    # Combinar y eliminar duplicados
-    todos_numeros = pd.concat([numeros_lineas, numeros_tipificaciones], ignore_index=True)
-    numeros_unicos = todos_numeros.drop_duplicates()
-    
-    # Crear DataFrame final
-    df_final = pd.DataFrame({df_lineas.columns[0]: numeros_unicos})
-    
-    # Guardar actualizado
-    df_final.to_parquet(lineas_filtradas_file, engine='pyarrow', compression='snappy', index=False)
-    
-    print(f"✓ Proceso completado.")
-    print(f"  Total antes: {len(todos_numeros)}")
-    print(f"  Total después: {len(numeros_unicos)}")
-    print(f"  Duplicados eliminados: {len(todos_numeros) - len(numeros_unicos)}")
-    
-except Exception as e:
-    print(f"✗ Error al actualizar lineas_filtradas_150: {str(e)}")
 
-print("\n" + "="*60 + "\n")
+    # Consolidar Iris
+    if not df_iris_all.empty:
+        with medir('consolidado Iris', df_iris_all) as paso:
+            print("\n→ Consolidando Iris...")
+            migrar_consolidado(IRIS_OUTPUT, esquemas.IRIS)
+            escritos = agregar_al_consolidado(IRIS_OUTPUT, df_iris_all, esquemas.IRIS)
+            compactar(IRIS_OUTPUT, esquemas.IRIS)
+            print(f"✓ Guardado: {IRIS_OUTPUT}")
+            print(f"  Registros escritos: {escritos}")
+            construir_iris(INDICE_IRIS, IRIS_OUTPUT)
+            paso.salida(escritos)
+    else:
+        print("\n⚠ No hay nuevos datos de Iris para consolidar")
+
+    for file in iris_ok:
+        mark_as_processed(file)
+
+    print("\n" + "="*60)
+    print("PROCESO COMPLETADO")
+    print("="*60 + "\n")
+
+
+
+    # ==================== ACTUALIZAR LINEAS_FILTRADAS_150 ====================
+    print("\n" + "="*60)
+    print("ACTUALIZANDO LINEAS_FILTRADAS_150.PARQUET")
+    print("="*60)
+
+    lineas_filtradas_file = LINEAS_FILTRADAS_150  # Ya está definido arriba
+
+    with medir('lineas_filtradas_150') as paso:
+        try:
+            # Leer el consolidado de Tipificaciones (solo primera columna: Cliente, int64)
+            numeros_tipificaciones = leer_consolidado(TIPIFICACIONES_OUTPUT, esquemas.TIPIFICACIONES, columns=['Cliente'])['Cliente']
+
+            # Leer el parquet de líneas filtradas (las versiones viejas lo guardaban como texto)
+            df_lineas = pd.read_parquet(lineas_filtradas_file, engine='pyarrow')
+            numeros_lineas = df_lineas.iloc[:, 0]
+
+            # Combinar como int64 (lo que no es un número válido se descarta) y eliminar duplicados
+            todos_numeros = pd.concat([numeros_lineas, numeros_tipificaciones], ignore_index=True)
+            df_final = esquemas.a_pandas(
+                esquemas.a_tabla(pd.DataFrame({'linea': todos_numeros}), esquemas.LINEAS_FILTRADAS)
+            ).dropna().drop_duplicates()
+            numeros_unicos = df_final['linea']
+            paso.salida(numeros_unicos)
+
+            # Guardar actualizado con el esquema tipado
+            huella_anterior = huella_archivo(lineas_filtradas_file)
+            esquemas.escribir_parquet(df_final, lineas_filtradas_file, esquemas.LINEAS_FILTRADAS)
+
+            # Agregar al índice de exclusión solo las líneas nuevas (las que vienen de Tipificaciones)
+            nuevas = numeros_unicos[numeros_unicos.index >= len(numeros_lineas)]
+            agregadas = agregar_a_exclusion(INDICE_EXCLUSION, {
+                'lineas_filtradas': lineas_filtradas_file,
+                'no_llame': NO_LLAME,
+            }, 'lineas_filtradas', nuevas, huella_anterior)
+
+            print(f"✓ Proceso completado.")
+            print(f"  Total antes: {len(todos_numeros)}")
+            print(f"  Total después: {len(numeros_unicos)}")
+            print(f"  Duplicados eliminados: {len(todos_numeros) - len(numeros_unicos)}")
+            print(f"  Líneas nuevas en el índice de exclusión: {agregadas}")
+
+        except Exception as e:
+            print(f"✗ Error al actualizar lineas_filtradas_150: {str(e)}")
+
+    print("\n" + "="*60 + "\n")
+
+
 """
 import pandas as pd
 import re
@@ -489,4 +286,9 @@ df_reporte = df_reporte[['Cliente', 'Tipificacion', 'fecha', 'fecha_consulta']]
 
 df_reporte.to_csv('data\processed\Tipificaciones-consolidadas.csv', sep=';', encoding='utf-8', index=False)
 df_iris.to_csv('data\processed\Iris-consolidado.csv', sep=';', encoding='utf-8', index=False)
-"""
\ No newline at end of file
+"""
+
+
+if __name__ == '__main__':
+    # El guard es necesario para el pool de procesos de la ingesta (spawn en Windows)
+    main()
@@ -1,352 +1,331 @@
-import pandas as pd
-import os
+import argparse
+import tempfile
+import pyarrow as pa
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import catalogo
+from catalogo import BASE_DIR, DATA_PROCESSED, DATA_RAW, DATA_ROOT, ruta
+from base_principal import REGLAS_ESTATICAS, base_elegible, tabla_elegible
+from indices import cargar_exclusion, cargar_iris, consultar_estados, consultar_exclusion, etiquetas_estados
+from metricas import medir
+from lote_arrow import seleccionar
+from reglas import aplicar, cargar_reglas, imprimir_atribucion
+from salida import escribir_csv
+from telefonos import procesar_numeros
+
 
 # ==================== CONFIGURACIÓN DE PATHS ====================
-BASE_DIR = Path(__file__).parent.parent
-DATA_ROOT = BASE_DIR / 'data' 
-BASE_OUTPUT = DATA_ROOT / 'bases' / 'base.csv'
-
-BASE_MAIN_DIR = DATA_ROOT / 'base_2024_2025_actualizada.parquet'
-NO_LLAME_DIR = DATA_ROOT / 'Registro_No_Llame.parquet'
-LINEAS_FILTRADAS = DATA_ROOT / 'lineas_filtradas_150.parquet'
-IRIS_CONSOLIDADO = DATA_ROOT / 'processed/Iris-consolidado.parquet'
-
-ayer = datetime.now() - timedelta(days=1)
-fecha_str = ayer.strftime("%m%d%y")  # formato mmddyy, ej: 100225
-
-REPORTE_DIA_ANTERIOR = DATA_ROOT / f'raw/reportes/{fecha_str}-p.csv'
-
-
-# ==================== CARGAR DATAFRAMES ====================
-
-df_base = pd.read_parquet(BASE_MAIN_DIR, engine="pyarrow")
-df_lineas_filtradas = pd.read_parquet(LINEAS_FILTRADAS, engine="pyarrow")
-df_registro_no_llame = pd.read_parquet(NO_LLAME_DIR, engine="pyarrow")
-
-# Cargar Iris con manejo de errores
-try:
-    df_iris_consolidado = pd.read_parquet(IRIS_CONSOLIDADO, engine="pyarrow")
-except Exception as e:
-    print(f"⚠️ Error al cargar Iris-consolidado.parquet: {e}")
-    print("Regenerando archivo desde el script 1_generar-archivos-filtrado.py...")
-    import subprocess
-    import sys
-    script_path = BASE_DIR / 'filtros' / '1_generar-archivos-filtrado.py'
-    subprocess.run([sys.executable, str(script_path)], check=True)
-    df_iris_consolidado = pd.read_parquet(IRIS_CONSOLIDADO, engine="pyarrow")
-
-df_reporte_dia_anterior = pd.read_csv(REPORTE_DIA_ANTERIOR, sep=';', encoding='utf-8', dtype=str)
-
-# ==================== INFO DE DATAFRAMES ====================
-
-"""
-df_base.info(verbose=True, show_counts=True)
-
-formato:
-<class 'pandas.core.frame.DataFrame'>
-Index: 5182930 entries, 0 to 6496111
-Data columns (total 9 columns):
- #   Column              Non-Null Count    Dtype 
----  ------              --------------    ----- 
- 0   linea               5182930 non-null  object
- 1   nombre_completo     5182930 non-null  object
- 2   tipo_doc            5182930 non-null  object
- 3   dni                 5182930 non-null  object
- 4   compania            5182930 non-null  object
- 5   contrato            5182930 non-null  object
- 6   fecha_portout       5182930 non-null  object
- 7   cantidad_de_lineas  5182930 non-null  object
- 8   otras_lineas        5182930 non-null  object
-dtypes: object(9)
-memory usage: 395.4+ MB
-
-"""
-# ------------
-"""
-df_lineas_filtradas.info(verbose=True, show_counts=True)
-
-formato:
-<class 'pandas.core.frame.DataFrame'>
-RangeIndex: 1049287 entries, 0 to 1049286
-Data columns (total 1 columns):
- #   Column  Non-Null Count    Dtype 
----  ------  --------------    ----- 
- 0   linea   1049287 non-null  object
-dtypes: object(1)
-memory usage: 8.0+ MB
-"""
-# -------------
-"""
-df_registro_no_llame.info(verbose=True, show_counts=True)
-
-formato:
-<class 'pandas.core.frame.DataFrame'>
-RangeIndex: 3075996 entries, 0 to 3075995
-Data columns (total 1 columns):
- #   Column  Non-Null Count    Dtype 
----  ------  --------------    ----- 
- 0   linea   3075996 non-null  object
-dtypes: object(1)
-memory usage: 23.5+ MB
-"""
-
-
-# ---------------------
-# LIMPIEZA DEL df_base
-# ---------------------
-
-# Asegurar que las columnas importantes sean string y eliminar espacios en blanco
-cols_to_strip = ['linea', 'dni', 'fecha_portout']
-for col in cols_to_strip:
-    df_base[col] = df_base[col].astype(str).str.strip()
-
-df_base["linea"] = df_base["linea"].str.replace(r'\.0$', '', regex=True) # Formatear la columna 'linea' eliminando '.0' si existiera al final
-df_base = df_base[(df_base['linea'] != '') & (df_base['dni'] != '') & (df_base['fecha_portout'] != '')] # Eliminar filas donde 'linea', 'dni' o 'fecha_portout' estén vacías
-df_base = df_base.drop_duplicates(subset=['linea'], keep='first') # Eliminar duplicados en ['linea', 'dni']
-
-
-# ---------------------
-# CONTAR Y FILTRAR REGISTROS NO DESEADOS
-# ---------------------
-
-# Cantidad de registros que coinciden en cada parquet
-eliminados_lineas_filtradas = df_base['linea'].isin(df_lineas_filtradas['linea']).sum()
-eliminados_no_llame = df_base['linea'].isin(df_registro_no_llame['linea']).sum()
-
-print(f"Registros eliminados por df_lineas_filtradas: {eliminados_lineas_filtradas}")
-print(f"Registros eliminados por df_registro_no_llame: {eliminados_no_llame}")
-
-# Crear un conjunto con todas las líneas que se deben eliminar
-lineas_a_eliminar = set(df_lineas_filtradas['linea']).union(set(df_registro_no_llame['linea']))
-df_base = df_base[~df_base['linea'].isin(lineas_a_eliminar)]
-
-print(f"Cantidad de registros después de la limpieza y filtrado: {df_base.shape[0]}")
-
-
-
-# ---------------------
-# APLICAR FILTROS ADICIONALES - para seleccion de LOTE
-# ---------------------
-
-# 1. Filtrar por DNI válido (numérico y rango argentino)
-print("\n=== FILTRO 1: DNI ===")
-df_base['dni'] = pd.to_numeric(df_base['dni'], errors='coerce')
-registros_antes = df_base.shape[0]
-df_base = df_base.dropna(subset=['dni'])
-df_base['dni'] = df_base['dni'].astype(int)
-df_base = df_base[(df_base['dni'] >= 10000000) & (df_base['dni'] <= 99999999)]
-print(f"Eliminados por DNI inválido: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-# 2. Filtrar por tipo de contrato
-print("\n=== FILTRO 2: CONTRATO ===")
-registros_antes = df_base.shape[0]
-df_base = df_base[df_base['contrato'].isin(['Contrato CPP', 'Activa (Prepago)'])]
-print(f"Eliminados por tipo de contrato: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-# 3. Convertir y filtrar por fecha de portación
-print("\n=== FILTRO 3: FECHA PORTACIÓN ===")
-df_base['fecha_portout'] = pd.to_datetime(df_base['fecha_portout'], errors='coerce')
-registros_antes = df_base.shape[0]
-df_base = df_base.dropna(subset=['fecha_portout'])
-print(f"Eliminados por fecha inválida/nula: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-# Filtrar portaciones mayores a 30 días
-fecha_limite = datetime.now() - timedelta(days=30)
-df_base = df_base[df_base['fecha_portout'] < fecha_limite]
-print(f"Eliminados por fecha inválida o reciente (<30 días): {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-
-# 4. Filtros complejos por contrato + año
-print("\n=== FILTRO 4: CONTRATO + AÑO ===")
-registros_antes = df_base.shape[0]
-mask_cpp = (
-    (df_base['contrato'] == 'Contrato CPP') &
-    (df_base['fecha_portout'].dt.year.isin([2025, 2024, 2023]))
-)
-mask_prepagos = (
-    (df_base['contrato'] == 'Activa (Prepago)') &
-    (df_base['fecha_portout'].dt.year.isin([2025, 2024]))
-)
-df_base = df_base[mask_cpp | mask_prepagos]
-print(f"Eliminados por reglas de contrato+año: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-# 5. Filtrar cantidad de líneas (1 a 7)
-print("\n=== FILTRO 5: CANTIDAD DE LÍNEAS ===")
-df_base['cantidad_de_lineas'] = pd.to_numeric(df_base['cantidad_de_lineas'], errors='coerce')
-registros_antes = df_base.shape[0]
-df_base = df_base.dropna(subset=['cantidad_de_lineas'])
-df_base = df_base[(df_base['cantidad_de_lineas'] >= 1) & (df_base['cantidad_de_lineas'] <= 7)]
-print(f"Eliminados por cantidad de líneas: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-
-# 6. Filtrar por compañía (Claro)  -- NO FILTRAR SOLO POR CLARO
-print("\n=== FILTRO 6: COMPAÑÍA ===")
-registros_antes = df_base.shape[0]
-df_base = df_base[df_base['compania'] == 'Claro']
-print(f"Eliminados por compañía diferente a Claro: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-
-
-# 7. Filtrar línea por rango o prefijos
-print("\n=== FILTRO 7: RANGO/PREFIJOS DE LÍNEA ===")
-df_base['linea_num'] = pd.to_numeric(df_base['linea'], errors='coerce')
-registros_antes = df_base.shape[0]
-df_base = df_base.dropna(subset=['linea_num'])
-
-# Prefijos argentinos a incluir
-prefijos = ('342', '341', '351', '387', '381')
-mask_prefijos = df_base['linea_num'].astype(int).astype(str).str.startswith(prefijos)
-mask_rango = df_base['linea_num'] < 3000000000
-df_base = df_base[mask_rango | mask_prefijos]
-
-# Eliminar columna temporal
-df_base = df_base.drop(columns=['linea_num'])
-print(f"Eliminados por rango/prefijo de línea: {registros_antes - df_base.shape[0]}")
-print(f"Registros restantes: {df_base.shape[0]}")
-
-# ---------------------
-# RESUMEN FINAL
-# ---------------------
-print("\n" + "="*60)
-print("RESUMEN DE FILTROS APLICADOS")
-print("="*60)
-print(f"✅ Registros finales: {df_base.shape[0]}")
-print(f"✅ Columnas: {df_base.columns.tolist()}")
-print("\nDatos listos para procesar")
-
-
-
-# ---------------------
-# ACTUALIZAR ESTADOS CON IRIS CONSOLIDADO
-# ---------------------
-"""
-df_base.head(2)
-
-linea	nombre_completo	tipo_doc	dni	compania	contrato	fecha_portout	cantidad_de_lineas	otras_lineas
-1120122233	GUERRINA DOMINGO LUIS	Documento Nacional Identidad	21903576	Claro	Contrato CPP	2024-09-17	3	1126401407, 1154280257
-1120122769	MARTINEZ MARIA CRISTINA	Documento Nacional Identidad	12647091	Claro	Contrato CPP	2025-08-26	1	nan
-"""
-"""
-df_base.info()
-
-<class 'pandas.core.frame.DataFrame'>
-Index: 783363 entries, 255 to 6461328
-Data columns (total 9 columns):
- #   Column              Non-Null Count   Dtype         
----  ------              --------------   -----         
- 0   linea               783363 non-null  object        
- 1   nombre_completo     783363 non-null  object        
- 2   tipo_doc            783363 non-null  object        
- 3   dni                 783363 non-null  int64         
- 4   compania            783363 non-null  object        
- 5   contrato            783363 non-null  object        
- 6   fecha_portout       783363 non-null  datetime64[ns]
- 7   cantidad_de_lineas  783363 non-null  int64         
- 8   otras_lineas        783363 non-null  object        
-dtypes: datetime64[ns](1), int64(2), object(6)
-memory usage: 59.8+ MB
-"""
-"""
-df_iris_consolidado.head(2)
-
-linea	fecha	estado	fecha_consulta
-2966217123	2025-09-30	Port In	2025-09-30
-1161933139	2025-09-30	Port In	2025-09-30
-"""
-
-"""
-df_iris_consolidado.info()
-
-<class 'pandas.core.frame.DataFrame'>
-RangeIndex: 5469332 entries, 0 to 5469331
-Data columns (total 4 columns):
- #   Column          Dtype 
----  ------          ----- 
- 0   linea           object
- 1   fecha           object
- 2   estado          object
- 3   fecha_consulta  object
-dtypes: object(4)
-memory usage: 166.9+ MB
-"""
-
-# --- Asegurar tipos ---
-df_base['linea'] = df_base['linea'].astype(str)
-df_iris_consolidado['linea'] = df_iris_consolidado['linea'].astype(str)
-df_iris_consolidado['fecha'] = pd.to_datetime(df_iris_consolidado['fecha'], errors='coerce')
-df_iris_consolidado['fecha_consulta'] = pd.to_datetime(df_iris_consolidado['fecha_consulta'], errors='coerce')
-
-# Asegurar que las líneas sean string
-df_base['linea'] = df_base['linea'].astype(str)
-df_iris_consolidado['linea'] = df_iris_consolidado['linea'].astype(str)
-
-# Filtrar df_iris solo con 'Port Out'
-df_iris_portout = df_iris_consolidado[df_iris_consolidado['estado'] == 'Port Out']
-
-# Crear un set de líneas con Port Out para búsqueda rápida
-lineas_portout = set(df_iris_portout['linea'])
-
-# Filtrar df_base
-df_filtered = df_base[
-    (~df_base['linea'].isin(df_iris_consolidado['linea'])) |  # no está en iris
-    (df_base['linea'].isin(lineas_portout))                 # está y es Port Out
-].copy()
-
-print(f"Registros originales: {df_base.shape[0]}")
-print(f"Registros después del filtro: {df_filtered.shape[0]}")
-
-
-
-# ---------------------
-# QUITAR LOTE LLAMADO AYER
-# ---------------------
-
-
-
-cant_original = df_reporte_dia_anterior.shape[0]
-df_reporte_dia_anterior = df_reporte_dia_anterior[df_reporte_dia_anterior['Cliente'].notna() & (df_reporte_dia_anterior['Cliente'].str.strip() != '')].copy()
-print(f"Registros nulos/vacíos eliminados el reporte: {cant_original - df_reporte_dia_anterior.shape[0]}")
-
-
-def procesar_numero(numero):
-    """Procesa un número telefónico según las reglas especificadas"""
-    if not isinstance(numero, str):
-        numero = str(numero)
-        
-    numero = numero.strip()
-    
-    if numero.startswith("0"):
-        numero = numero[1:]
-    if numero.startswith("90"):
-        numero = numero[2:]
-    if numero.startswith("11"):
-        if len(numero) > 3 and numero[2:4] == "15":  # Si "15" sigue a la característica
-            numero = "11" + numero[4:]
+# Las rutas de los datasets salen del catálogo (data/ o FILTROS_DATA, ver catalogo.py)
+BASE_OUTPUT = ruta('lote')
+
+BASE_MAIN_DIR = ruta('base')
+NO_LLAME_DIR = ruta('no_llame')
+LINEAS_FILTRADAS = ruta('lineas_filtradas')
+IRIS_CONSOLIDADO = ruta('iris')
+BASE_ELEGIBLE = ruta('base_elegible')
+INDICE_EXCLUSION = DATA_PROCESSED / 'indice_exclusion'
+INDICE_IRIS = DATA_PROCESSED / 'indice_iris'
+REGLAS = DATA_ROOT / 'reglas.json'  # opcional: reemplaza las reglas por defecto (ver reglas.py)
+
+
+# ==================== REGLAS DIARIAS ====================
+# Estado Iris de las líneas que no están en el consolidado
+SIN_IRIS = 'No está en Iris'
+
+# Reglas que cambian cada día (se aplican sobre la base elegible); sección 'diarias' de data/reglas.json
+REGLAS_DIARIAS = [
+    {'nombre': 'exclusión (filtradas + no llame)', 'tipo': 'excluir', 'contexto': 'excluidas'},
+    {'nombre': 'filtro 3: fecha portación', 'tipo': 'antiguedad', 'columna': 'fecha_portout', 'dias': 30},
+    # El resultado de la clasificación Iris nunca se aplicó al lote (el df_filtered del script
+    # original no se usaba): queda informativa hasta confirmarla, con 'activa': true se aplica
+    {'nombre': 'clasificación Iris', 'tipo': 'estado', 'contexto': 'estado_iris',
+     'permitidos': [SIN_IRIS, 'Port Out'], 'activa': False},
+    {'nombre': 'lote llamado ayer', 'tipo': 'excluir', 'contexto': 'llamadas_ayer'},
+]
+
+
+def reporte_dia_anterior():
+    """Reporte (ya procesado por el script 1) del lote llamado ayer"""
+    ayer = datetime.now() - timedelta(days=1)
+    fecha_str = ayer.strftime("%m%d%y")  # formato mmddyy, ej: 100225
+    return DATA_RAW / f'reportes/{fecha_str}-p.csv'
+
+
+def llamadas_dia_anterior(df_reporte):
+    """Números del reporte de ayer (Cliente sin 0/90/15) para excluirlos del lote"""
+    cant_original = df_reporte.shape[0]
+    df_reporte = df_reporte[df_reporte['Cliente'].notna() & (df_reporte['Cliente'].str.strip() != '')]
+    print(f"Registros nulos/vacíos eliminados el reporte: {cant_original - df_reporte.shape[0]}")
+    return procesar_numeros(df_reporte['Cliente'])
+
+
+def reglas_diarias_pandas(df_base, reglas, indice_exclusion, indice_iris, clientes_ayer):
+    """Motor pandas: contexto de cada regla como máscara y un único filtrado con atribución"""
+    # ---------------------
+    # CONTEXTO DE LAS REGLAS DIARIAS
+    # ---------------------
+    lineas = df_base['linea_num'].to_numpy()
+
+    # Una sola búsqueda binaria: máscara de excluidas y cantidad de registros que coinciden en cada parquet
+    with medir('exclusión (filtradas + no llame)', df_base):
+        excluidas, conteos = consultar_exclusion(indice_exclusion, lineas)
+        print(f"Registros en df_lineas_filtradas: {conteos['lineas_filtradas']}")
+        print(f"Registros en df_registro_no_llame: {conteos['no_llame']}")
+
+
+    # ---------------------
+    # ACTUALIZAR ESTADOS CON IRIS CONSOLIDADO
+    # ---------------------
+    """
+    df_base.head(2)
+
+    linea	nombre_completo	tipo_doc	dni	compania	contrato	fecha_portout	cantidad_de_lineas	otras_lineas
+    1120122233	GUERRINA DOMINGO LUIS	Documento Nacional Identidad	21903576	Claro	Contrato CPP	2024-09-17	3	1126401407, 1154280257
+    1120122769	MARTINEZ MARIA CRISTINA	Documento Nacional Identidad	12647091	Claro	Contrato CPP	2025-08-26	1	nan
+    """
+    """
+    df_base.info()
+
+    <class 'pandas.core.frame.DataFrame'>
+    Index: 783363 entries, 255 to 6461328
+    Data columns (total 9 columns):
+     #   Column              Non-Null Count   Dtype         
+    ---  ------              --------------   -----         
+     0   linea               783363 non-null  object        
+     1   nombre_completo     783363 non-null  object        
+     2   tipo_doc            783363 non-null  object        
+     3   dni                 783363 non-null  int64         
+     4   compania            783363 non-null  object        
+     5   contrato            783363 non-null  object        
+     6   fecha_portout       783363 non-null  datetime64[ns]
+     7   cantidad_de_lineas  783363 non-null  int64         
+     8   otras_lineas        783363 non-null  object        
+    dtypes: datetime64[ns](1), int64(2), object(6)
+    memory usage: 59.8+ MB
+    """
+    """
+    df_iris_consolidado.head(2)
+
+    linea	fecha	estado	fecha_consulta
+    2966217123	2025-09-30	Port In	2025-09-30
+    1161933139	2025-09-30	Port In	2025-09-30
+    """
+
+    """
+    df_iris_consolidado.info()
+
+    <class 'pandas.core.frame.DataFrame'>
+    RangeIndex: 5469332 entries, 0 to 5469331
+    Data columns (total 4 columns):
+     #   Column          Dtype         
+    ---  ------          -----         
+     0   linea           int64         
+     1   fecha           datetime64[ms]
+     2   estado          category      
+     3   fecha_consulta  datetime64[ms]
+    dtypes: category(1), datetime64[ms](2), int64(1)
+    memory usage: 130.4 MB
+    """
+
+    # Estado Iris de toda la base elegible en una sola búsqueda sobre el índice (linea int64)
+    with medir('clasificación Iris', df_base):
+        codigos_iris, _ = consultar_estados(indice_iris, lineas)
+        estado_iris = etiquetas_estados(indice_iris, SIN_IRIS)[codigos_iris]
+
+    llamadas_ayer = df_base['linea'].isin(clientes_ayer).to_numpy()
+
+
+    # ---------------------
+    # APLICAR REGLAS DIARIAS - para seleccion de LOTE
+    # ---------------------
+
+    # Todas las reglas en una sola pasada: un único filtrado de df_base (ver reglas.py)
+    with medir('reglas diarias', df_base) as paso:
+        filas_entrada = df_base.shape[0]
+        df_base, paso['reglas'] = aplicar(df_base, reglas, {
+            'excluidas': excluidas,
+            'estado_iris': estado_iris,
+            'llamadas_ayer': llamadas_ayer,
+        })
+        imprimir_atribucion(paso['reglas'], filas_entrada)
+        paso.salida(df_base)
+    return df_base
+
+
+# ==================== PROCESO ====================
+def main(guardar_csv=True, motor='pandas'):
+    """
+    Selección del lote del día. Devuelve el lote (df_base, con sus tipos) para
+    que la etapa 3 lo reciba en memoria; base.csv se escribe solo si guardar_csv.
+    `motor`: 'pandas' (con atribución por regla) o 'arrow' (plan de Acero, ver lote_arrow.py)
+    """
+    REPORTE_DIA_ANTERIOR = reporte_dia_anterior()
+    reglas_estaticas = cargar_reglas(REGLAS, 'estaticas', REGLAS_ESTATICAS)
+    reglas_diarias = cargar_reglas(REGLAS, 'diarias', REGLAS_DIARIAS)
+
+    # ==================== CARGAR DATAFRAMES ====================
+
+    # Base principal ya limpia y con las reglas estáticas aplicadas (DNI, contrato, año, cantidad
+    # de líneas, compañía y prefijos). Se recalcula solo si cambia la base o las reglas (ver base_principal.py)
+    # Con el motor arrow queda como tabla Arrow hasta el final del plan
+    with medir('base elegible') as paso:
+        if motor == 'arrow':
+            df_base = tabla_elegible(BASE_MAIN_DIR, BASE_ELEGIBLE, reglas_estaticas)
+        else:
+            df_base = base_elegible(BASE_MAIN_DIR, BASE_ELEGIBLE, reglas_estaticas)
+        paso.salida(df_base)
+
+    # Líneas a excluir (lineas_filtradas_150 + Registro_No_Llame) como índice int64 ordenado y
+    # memory-mapped. Se reconstruye solo si cambió alguno de los dos parquet (ver indices.py)
+    with medir('índice de exclusión'):
+        indice_exclusion = cargar_exclusion(INDICE_EXCLUSION, {
+            'lineas_filtradas': LINEAS_FILTRADAS,
+            'no_llame': NO_LLAME_DIR,
+        })
+
+    # Cargar Iris con manejo de errores: índice de estados por línea (memory-mapped, ver indices.py)
+    with medir('índice Iris'):
+        try:
+            indice_iris = cargar_iris(INDICE_IRIS, IRIS_CONSOLIDADO)
+        except Exception as e:
+            print(f"⚠️ Error al cargar Iris-consolidado: {e}")
+            print("Regenerando archivo desde el script 1_generar-archivos-filtrado.py...")
+            import subprocess
+            import sys
+            script_path = BASE_DIR / 'filtros' / '1_generar-archivos-filtrado.py'
+            subprocess.run([sys.executable, str(script_path)], check=True)
+            indice_iris = cargar_iris(INDICE_IRIS, IRIS_CONSOLIDADO)
+
+    with medir('reporte de ayer (lectura)') as paso:
+        df_reporte_dia_anterior = catalogo.tabla(REPORTE_DIA_ANTERIOR, formato='csv', separador=';').to_pandas()
+        paso.salida(df_reporte_dia_anterior)
+
+    # ==================== INFO DE DATAFRAMES ====================
+
+    """
+    df_base.info(verbose=True, show_counts=True)
+
+    formato:
+    <class 'pandas.core.frame.DataFrame'>
+    Index: 5182930 entries, 0 to 6496111
+    Data columns (total 9 columns):
+     #   Column              Non-Null Count    Dtype 
+    ---  ------              --------------    ----- 
+     0   linea               5182930 non-null  object
+     1   nombre_completo     5182930 non-null  object
+     2   tipo_doc            5182930 non-null  object
+     3   dni                 5182930 non-null  object
+     4   compania            5182930 non-null  object
+     5   contrato            5182930 non-null  object
+     6   fecha_portout       5182930 non-null  object
+     7   cantidad_de_lineas  5182930 non-null  object
+     8   otras_lineas        5182930 non-null  object
+    dtypes: object(9)
+    memory usage: 395.4+ MB
+
+    """
+    # ------------
+    """
+    df_lineas_filtradas.info(verbose=True, show_counts=True)
+
+    formato:
+    <class 'pandas.core.frame.DataFrame'>
+    RangeIndex: 1049287 entries, 0 to 1049286
+    Data columns (total 1 columns):
+     #   Column  Non-Null Count    Dtype 
+    ---  ------  --------------    ----- 
+     0   linea   1049287 non-null  int64
+    dtypes: int64(1)
+    memory usage: 8.0 MB
+    """
+    # -------------
+    """
+    df_registro_no_llame.info(verbose=True, show_counts=True)
+
+    formato:
+    <class 'pandas.core.frame.DataFrame'>
+    RangeIndex: 3075996 entries, 0 to 3075995
+    Data columns (total 1 columns):
+     #   Column  Non-Null Count    Dtype 
+    ---  ------  --------------    ----- 
+     0   linea   3075996 non-null  object
+    dtypes: object(1)
+    memory usage: 23.5+ MB
+    """
+
+
+    # Líneas del lote llamado ayer
+    with medir('lote llamado ayer (reporte)', df_reporte_dia_anterior):
+        clientes_ayer = llamadas_dia_anterior(df_reporte_dia_anterior)
+
+    if motor == 'arrow':
+        # Un solo plan de Acero sobre la tabla del snapshot (ver lote_arrow.py)
+        with medir('reglas diarias (arrow)', df_base) as paso:
+            df_base = seleccionar(df_base, reglas_diarias, {
+                'excluidas': pa.table({'linea_num': indice_exclusion['lineas']}),
+                'estado_iris': pa.table({
+                    'linea_num': indice_iris['lineas'],
+                    'estado': pa.DictionaryArray.from_arrays(
+                        indice_iris['estados'], etiquetas_estados(indice_iris, SIN_IRIS)),
+                }),
+                'llamadas_ayer': pa.table({'linea': pa.array(clientes_ayer, pa.string(), from_pandas=True)}),
+            }, ausentes={'estado_iris': SIN_IRIS})
+            paso.salida(df_base)
     else:
-        # Procesar otras características (3 o 4 dígitos)
-        if len(numero) >= 5:
-            caracteristica = numero[:3]
-            if numero[3:5] == "15":  # Característica de 3 dígitos
-                numero = caracteristica + numero[5:]
-            elif len(numero) > 4 and numero[:4].isdigit() and numero[4:6] == "15":  # Característica de 4 dígitos
-                caracteristica = numero[:4]
-                numero = caracteristica + numero[6:]
-    
-    return numero
-
-df_reporte_dia_anterior['Cliente'] = df_reporte_dia_anterior['Cliente'].apply(procesar_numero)
-cant_original = df_base.shape[0]
-df_base = df_base[~df_base['linea'].isin(df_reporte_dia_anterior['Cliente'])].copy()
-print(f"Registros eliminados de df_base: {cant_original - df_base.shape[0]}")
-print(f"Registros restantes en df_base: {df_base.shape[0]}")
- 
-df_base.to_csv(BASE_OUTPUT, sep=';', encoding='utf-8', index=False)
\ No newline at end of file
+        df_base = reglas_diarias_pandas(df_base, reglas_diarias, indice_exclusion, indice_iris, clientes_ayer)
+
+    # ---------------------
+    # RESUMEN FINAL
+    # ---------------------
+    print("\n" + "="*60)
+    print("RESUMEN DE FILTROS APLICADOS")
+    print("="*60)
+    print(f"✅ Registros finales: {df_base.shape[0]}")
+    print(f"✅ Columnas: {df_base.columns.tolist()}")
+    print("\nDatos listos para procesar")
+
+    # Eliminar columna temporal
+    df_base = df_base.drop(columns=['linea_num'])
+
+    if guardar_csv:
+        with medir('escritura base.csv', df_base):
+            escribir_csv(df_base, BASE_OUTPUT)
+    return df_base
+
+
+def paridad():
+    """
+    Corre los dos motores y compara byte a byte el base.csv que escribe cada uno
+    (con escribir_csv, en un directorio temporal). True si son idénticos
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        salidas = {}
+        for motor in ('pandas', 'arrow'):
+            print(f"\n{'='*60}\nMOTOR {motor.upper()}\n{'='*60}")
+            archivo = escribir_csv(main(guardar_csv=False, motor=motor), Path(directorio) / f'base-{motor}.csv')
+            salidas[motor] = archivo.read_bytes()
+
+    pandas_csv, arrow_csv = salidas['pandas'], salidas['arrow']
+    registros = {motor: salida.count(b'\n') - 1 for motor, salida in salidas.items()}
+    if pandas_csv == arrow_csv:
+        print(f"\n✅ Paridad: los dos motores generan el mismo base.csv ({registros['pandas']} registros)")
+        return True
+    print(f"\n✗ Los motores difieren: pandas {registros['pandas']} registros, arrow {registros['arrow']}")
+    for numero, (a, b) in enumerate(zip(pandas_csv.splitlines(), arrow_csv.splitlines())):
+        if a != b:
+            print(f"  Primera diferencia en la línea {numero + 1}:\n  pandas: {a!r}\n  arrow:  {b!r}")
+            break
+    return False
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Selección del lote del día")
+    parser.add_argument('--motor', choices=['pandas', 'arrow'], default='pandas',
+                        help="pandas (default, con atribución por regla) o arrow (un solo plan de Acero)")
+    parser.add_argument('--paridad', action='store_true',
+                        help="correr los dos motores y comparar el base.csv resultante (no escribe data/bases/base.csv)")
+    args = parser.parse_args()
+    if args.paridad:
+        raise SystemExit(0 if paridad() else 1)
+    main(motor=args.motor)
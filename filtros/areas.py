@@ -0,0 +1,181 @@
+"""
+Códigos de área argentinos y búsqueda vectorizada del prefijo más largo.
+
+La tabla (CODIGOS_AREA) tiene los códigos por cantidad de dígitos: 11 (AMBA),
+los de 3 dígitos y los de 4. El código de área de una línea es el prefijo más
+largo que está en la tabla; si ninguno está se toman los 3 primeros dígitos
+(el criterio histórico del script 3).
+
+La búsqueda es un `is_in` por largo de prefijo sobre la columna completa, del
+más largo al más corto, sin recorrer fila por fila:
+
+    ani1_y_linea_15(serie)     ANI1 y línea en formato 15 (texto, script 3)
+    largo_codigo(array)        largo del código de un array Arrow de texto
+    largo_codigo_numerico(n)   lo mismo para líneas int64 (generadores de benchmarks)
+    empieza_con(n, prefijo)    str(n).startswith(prefijo) sobre int64 (regla prefijo_o_menor)
+
+`extraer_ani1` y `agregar_15_a_linea` son las implementaciones escalares de
+referencia (las que usaba el script 3 con `Series.apply`).
+"""
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# ==================== TABLA DE CÓDIGOS DE ÁREA ====================
+CODIGOS_2_DIGITOS = frozenset({"11"})
+
+CODIGOS_3_DIGITOS = frozenset({
+    "220", "221", "223", "230", "236", "237", "249", "260", "261", "263", "264", "266",
+    "280", "291", "294", "297", "298", "299", "336", "341", "342", "343", "345", "348",
+    "351", "353", "358", "362", "364", "370", "376", "379", "380", "381", "383", "385",
+    "387", "388",
+})
+
+CODIGOS_4_DIGITOS = frozenset({
+    "2202", "2221", "2223", "2224", "2225", "2226", "2227", "2229", "2241", "2242", "2243", "2244",
+    "2245", "2246", "2252", "2254", "2255", "2257", "2261", "2262", "2264", "2265", "2266", "2267",
+    "2268", "2271", "2272", "2273", "2274", "2281", "2283", "2284", "2285", "2286", "2291", "2292",
+    "2296", "2297", "2302", "2314", "2316", "2317", "2320", "2323", "2324", "2325", "2326", "2331",
+    "2333", "2334", "2335", "2336", "2337", "2338", "2342", "2343", "2344", "2345", "2346", "2352",
+    "2353", "2354", "2355", "2356", "2357", "2358", "2392", "2393", "2394", "2395", "2396", "2473",
+    "2474", "2475", "2477", "2478", "2622", "2624", "2625", "2626", "2646", "2647", "2648", "2651",
+    "2652", "2655", "2656", "2657", "2658", "2901", "2902", "2903", "2920", "2921", "2922", "2923",
+    "2924", "2925", "2926", "2927", "2928", "2929", "2931", "2932", "2933", "2934", "2935", "2936",
+    "2940", "2942", "2945", "2946", "2948", "2952", "2953", "2954", "2962", "2963", "2964", "2966",
+    "2972", "2982", "2983", "3327", "3329", "3382", "3385", "3387", "3388", "3400", "3401", "3402",
+    "3404", "3405", "3406", "3407", "3408", "3409", "3435", "3436", "3437", "3438", "3442", "3444",
+    "3445", "3446", "3447", "3454", "3455", "3456", "3458", "3460", "3462", "3463", "3464", "3465",
+    "3466", "3467", "3468", "3469", "3471", "3472", "3476", "3482", "3483", "3487", "3489", "3491",
+    "3492", "3493", "3496", "3497", "3498", "3521", "3522", "3524", "3525", "3532", "3533", "3537",
+    "3541", "3542", "3543", "3544", "3546", "3547", "3548", "3549", "3562", "3563", "3564", "3571",
+    "3572", "3573", "3574", "3575", "3576", "3582", "3583", "3584", "3585", "3711", "3715", "3716",
+    "3718", "3721", "3725", "3731", "3734", "3735", "3741", "3743", "3751", "3754", "3755", "3756",
+    "3757", "3758", "3772", "3773", "3774", "3775", "3777", "3781", "3782", "3786", "3821", "3825",
+    "3826", "3827", "3832", "3835", "3837", "3838", "3841", "3843", "3844", "3845", "3846", "3854",
+    "3855", "3856", "3857", "3858", "3861", "3862", "3863", "3865", "3867", "3868", "3869", "3873",
+    "3876", "3877", "3878", "3885", "3886", "3887", "3888", "3891", "3892", "3894"
+})
+
+CODIGOS_AREA = {2: CODIGOS_2_DIGITOS, 3: CODIGOS_3_DIGITOS, 4: CODIGOS_4_DIGITOS}
+
+# Sin código conocido se toman los 3 primeros dígitos
+LARGO_POR_DEFECTO = 3
+
+# Todo lo que str.strip() considera espacio (el último es U+3000)
+_ESPACIOS = ''.join(c for c in map(chr, range(0x3001)) if c.isspace())
+
+# Potencias de 10 para contar dígitos de enteros sin pasar a texto
+_POTENCIAS = 10 ** np.arange(19, dtype=np.int64)
+
+
+# ==================== IMPLEMENTACIONES DE REFERENCIA (ESCALARES) ====================
+def extraer_ani1(linea):
+    """Código de área (ANI1) de una línea"""
+    if isinstance(linea, str):
+        linea = linea.strip()
+        if linea.startswith("11"):
+            return "11"
+        if linea[:4] in CODIGOS_4_DIGITOS:
+            return linea[:4]
+        return linea[:3]
+    return ""
+
+
+def agregar_15_a_linea(numero):
+    """Línea con "15" después del ANI1"""
+    if isinstance(numero, str):
+        numero = numero.strip()
+        ani1 = extraer_ani1(numero)
+        return ani1 + "15" + numero[len(ani1):]
+    return ""
+
+
+# ==================== TEXTO ====================
+def _texto(serie):
+    """Array Arrow de texto sin espacios al borde; lo que no es texto queda nulo"""
+    try:
+        arr = pa.array(serie, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas mixtas: los valores que no son str no tienen código de área
+        arr = pa.array([v if isinstance(v, str) else None for v in serie.to_numpy(dtype=object)],
+                       type=pa.large_string())
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    return pc.utf8_trim(arr, _ESPACIOS)
+
+
+def largo_codigo(lineas):
+    """
+    Largo del código de área de cada línea de un array Arrow de texto: el
+    prefijo más largo que está en CODIGOS_AREA, o LARGO_POR_DEFECTO
+    """
+    largos = np.full(len(lineas), LARGO_POR_DEFECTO, dtype=np.int64)
+    resueltas = np.zeros(len(lineas), dtype=bool)
+    for largo in sorted(CODIGOS_AREA, reverse=True):
+        cabeza = pc.utf8_slice_codeunits(lineas, 0, largo)
+        en_tabla = pc.is_in(cabeza, value_set=pa.array(sorted(CODIGOS_AREA[largo]), pa.large_string()))
+        coincide = pc.fill_null(en_tabla, False).to_numpy(zero_copy_only=False) & ~resueltas
+        largos[coincide] = largo
+        resueltas |= coincide
+    return largos
+
+
+def ani1_y_linea_15(serie):
+    """
+    Versión vectorizada de `extraer_ani1` y `agregar_15_a_linea` sobre una
+    columna completa (el código de área se busca una sola vez para las dos).
+    Devuelve (ANI1, línea con 15) como Series con el índice de `serie`
+    """
+    lineas = _texto(serie)
+    largos = largo_codigo(lineas)
+
+    ani1 = pc.utf8_slice_codeunits(lineas, 0, LARGO_POR_DEFECTO)
+    resto = pc.utf8_slice_codeunits(lineas, LARGO_POR_DEFECTO)
+    for largo in CODIGOS_AREA:
+        if largo == LARGO_POR_DEFECTO:
+            continue
+        con_largo = pa.array(largos == largo)
+        ani1 = pc.if_else(con_largo, pc.utf8_slice_codeunits(lineas, 0, largo), ani1)
+        resto = pc.if_else(con_largo, pc.utf8_slice_codeunits(lineas, largo), resto)
+    linea_15 = pc.binary_join_element_wise(ani1, pa.scalar('15', pa.large_string()), resto,
+                                           pa.scalar('', pa.large_string()))
+
+    # Lo que no es texto da "" (igual que las funciones escalares)
+    resultado = []
+    for columna in (ani1, linea_15):
+        columna = pc.fill_null(columna, '').to_pandas()
+        columna.index = serie.index
+        resultado.append(columna)
+    return tuple(resultado)
+
+
+# ==================== NÚMEROS ====================
+def digitos(enteros):
+    """Cantidad de dígitos de enteros positivos (int64)"""
+    return np.searchsorted(_POTENCIAS, enteros, side='right')
+
+
+def empieza_con(enteros, prefijo, cantidad_digitos=None):
+    """Mismo resultado que str(n).startswith(prefijo) para enteros (int64), comparando los primeros dígitos"""
+    enteros = np.asarray(enteros, dtype=np.int64)
+    if cantidad_digitos is None:
+        cantidad_digitos = digitos(enteros)
+    largo = len(prefijo)
+    cabeza = enteros // _POTENCIAS[np.clip(cantidad_digitos - largo, 0, None)]
+    return (enteros > 0) & (cantidad_digitos >= largo) & (cabeza == int(prefijo))
+
+
+def largo_codigo_numerico(numeros):
+    """`largo_codigo` para líneas int64 (sin el 0 inicial): prefijo más largo de la tabla o LARGO_POR_DEFECTO"""
+    numeros = np.asarray(numeros, dtype=np.int64)
+    cantidad_digitos = digitos(numeros)
+    largos = np.full(len(numeros), LARGO_POR_DEFECTO, dtype=np.int64)
+    resueltas = np.zeros(len(numeros), dtype=bool)
+    for largo in sorted(CODIGOS_AREA, reverse=True):
+        cabeza = numeros // _POTENCIAS[np.clip(cantidad_digitos - largo, 0, None)]
+        codigos = np.array(sorted(CODIGOS_AREA[largo]), dtype=np.int64)
+        coincide = (cantidad_digitos >= largo) & np.isin(cabeza, codigos) & ~resueltas
+        largos[coincide] = largo
+        resueltas |= coincide
+    return largos
@@ -0,0 +1,267 @@
+"""
+Carga de la base principal (base_2024_2025_actualizada.parquet).
+
+Los filtros estáticos del script 2 son reglas (REGLAS_ESTATICAS, ver
+reglas.py). En lugar de leer las 5M de filas y filtrar en pandas, las que se
+pueden expresar en pyarrow (contrato, compañía, año de portación, cantidad de
+líneas) se pasan al scanner como predicados junto con la proyección de
+columnas: los row groups que no pueden cumplirlas no se decodifican y las
+filas descartadas nunca llegan a pandas.
+
+Los predicados son un superconjunto de las reglas (un valor con formato
+inesperado se deja pasar), así que después todas las reglas se evalúan
+exactas sobre el resultado, en una sola pasada.
+
+Los duplicados por `linea` se resuelven antes de las reglas (queda la primera
+fila, pase o no las reglas): las líneas que quedan repetidas después de la
+limpieza se leen completas, sin el predicado, para que la deduplicación vea
+las mismas filas que sin filtrar al leer.
+
+Base elegible: como esos filtros (y los de DNI y prefijo de línea) dependen
+solo de la base, su resultado se materializa en un snapshot ordenado por
+`linea`, con la huella del archivo de origen (mtime, tamaño y sha256) en la
+metadata. Solo se reconstruye cuando cambia la base; la corrida diaria aplica
+encima el corte de 30 días y las exclusiones.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import catalogo
+from metricas import medir
+from reglas import aplicar, imprimir_atribucion, predicado
+
+
+# Columnas de la base que usa el pipeline (todas pasan a base.csv)
+COLUMNAS = [
+    'linea', 'nombre_completo', 'tipo_doc', 'dni', 'compania', 'contrato',
+    'fecha_portout', 'cantidad_de_lineas', 'otras_lineas',
+]
+
+CONTRATOS = ['Contrato CPP', 'Activa (Prepago)']
+COMPANIA = 'Claro'
+CANTIDAD_LINEAS = (1, 7)
+PREFIJOS_LINEA = ('342', '341', '351', '387', '381')
+
+# Filtros del lote que dependen solo de la base, como reglas (ver reglas.py).
+# Se pueden sobrescribir con la sección 'estaticas' de data/reglas.json
+REGLAS_ESTATICAS = [
+    {'nombre': 'filtro 1: DNI', 'tipo': 'rango', 'columna': 'dni', 'minimo': 10000000, 'maximo': 99999999},
+    {'nombre': 'filtro 2: contrato', 'tipo': 'valores', 'columna': 'contrato', 'valores': CONTRATOS},
+    {'nombre': 'filtro 3: fecha portación válida', 'tipo': 'no_nulo', 'columna': 'fecha_portout'},
+    {'nombre': 'filtro 4: contrato + año', 'tipo': 'anio_segun', 'columna': 'contrato', 'fecha': 'fecha_portout',
+     'anios': {'Contrato CPP': [2025, 2024, 2023], 'Activa (Prepago)': [2025, 2024]}},
+    {'nombre': 'filtro 5: cantidad de líneas', 'tipo': 'rango', 'columna': 'cantidad_de_lineas',
+     'minimo': CANTIDAD_LINEAS[0], 'maximo': CANTIDAD_LINEAS[1]},
+    {'nombre': 'filtro 6: compañía', 'tipo': 'valores', 'columna': 'compania', 'valores': [COMPANIA]},
+    {'nombre': 'filtro 7: rango/prefijos', 'tipo': 'prefijo_o_menor', 'columna': 'linea_num',
+     'prefijos': list(PREFIJOS_LINEA), 'menor_a': 3000000000},
+]
+
+# Texto de un entero positivo que entra en int64 (sin ceros a la izquierda)
+_ENTERO = r'^[1-9][0-9]{0,17}$'
+
+# Cambiar al modificar la preparación de la base: invalida los snapshots existentes
+# (un cambio en las reglas ya los invalida por sí solo, ver _huella)
+VERSION_FILTROS = 3
+
+
+def _limpiar_linea(serie):
+    """Línea como texto sin espacios y sin '.0' al final"""
+    return serie.astype(str).str.strip().str.replace(r'\.0$', '', regex=True)
+
+
+def _lineas_repetidas(archivo):
+    """
+    Expresión que marca las filas cuya línea, ya limpia, aparece más de una vez
+    en la base (None si no hay). Solo se lee la columna `linea`; las líneas se
+    comparan como int64 cuando su texto limpio es el de un entero (los valores
+    que ya son solo dígitos no pasan por `_limpiar_linea`)
+    """
+    lineas = catalogo.tabla(archivo, ['linea'])['linea'].combine_chunks()
+    if pa.types.is_integer(lineas.type):
+        simples = lineas.is_valid()
+    elif pa.types.is_string(lineas.type) or pa.types.is_large_string(lineas.type):
+        simples = pc.fill_null(pc.match_substring_regex(lineas, _ENTERO), False)
+    else:
+        simples = pa.array(np.zeros(len(lineas), dtype=bool))
+    crudas_simples, crudas_resto = lineas.filter(simples), lineas.filter(pc.invert(simples))
+    limpias = pa.array(_limpiar_linea(crudas_resto.to_pandas()), type=pa.string(), from_pandas=True)
+    es_entero = pc.fill_null(pc.match_substring_regex(limpias, _ENTERO), False)
+
+    grupos = [
+        # (claves, valores crudos de cada clave)
+        (pa.concat_arrays([pc.cast(crudas_simples, pa.int64()), pc.cast(limpias.filter(es_entero), pa.int64())]),
+         pa.concat_arrays([crudas_simples, crudas_resto.filter(es_entero)])),
+        (limpias.filter(pc.invert(es_entero)), crudas_resto.filter(pc.invert(es_entero))),
+    ]
+    valores = []
+    for claves, crudas in grupos:
+        conteo = pc.value_counts(claves)
+        repetidas = conteo.field('values').filter(pc.greater(conteo.field('counts'), 1))
+        if len(repetidas):
+            valores.append(pc.unique(crudas.filter(pc.is_in(claves, repetidas))))
+    if not valores:
+        return None
+
+    valores = pa.concat_arrays(valores)
+    expresion = ds.field('linea').isin(valores.drop_null())
+    if valores.null_count:
+        expresion = expresion | ds.field('linea').is_null()
+    return expresion
+
+
+def cargar_base(archivo, reglas=REGLAS_ESTATICAS):
+    """
+    Lee la base principal con proyección de columnas y las reglas que admite el
+    scanner ya aplicadas, salvo en las líneas repetidas (ver `_lineas_repetidas`)
+    """
+    filtro = predicado(reglas, catalogo.abrir(archivo).schema)
+    if filtro is not None:
+        repetidas = _lineas_repetidas(archivo)
+        if repetidas is not None:
+            filtro = filtro | repetidas
+    return catalogo.tabla(archivo, COLUMNAS, filtro).to_pandas()
+
+
+# ==================== BASE ELEGIBLE ====================
+def _limpiar(df_base):
+    """Limpieza de linea / dni / fecha_portout y duplicados por línea"""
+    # Asegurar que las columnas importantes sean string y eliminar espacios en blanco
+    df_base['linea'] = _limpiar_linea(df_base['linea']) # Formatear la columna 'linea' eliminando '.0' si existiera al final
+    for col in ['dni', 'fecha_portout']:
+        df_base[col] = df_base[col].astype(str).str.strip()
+
+    df_base = df_base[(df_base['linea'] != '') & (df_base['dni'] != '') & (df_base['fecha_portout'] != '')] # Eliminar filas donde 'linea', 'dni' o 'fecha_portout' estén vacías
+    df_base = df_base.drop_duplicates(subset=['linea'], keep='first') # Eliminar duplicados en ['linea', 'dni']
+
+    # Línea como número: para cruzar con los parquet tipados (int64) y para el filtro 7
+    df_base['linea_num'] = pd.to_numeric(df_base['linea'], errors='coerce')
+    return df_base
+
+
+def _tipar(df_base):
+    """Tipos que usan las reglas: lo que no se puede convertir queda nulo y lo descarta su regla"""
+    df_base['dni'] = pd.to_numeric(df_base['dni'], errors='coerce')
+    df_base['fecha_portout'] = pd.to_datetime(df_base['fecha_portout'], errors='coerce')
+    df_base['cantidad_de_lineas'] = pd.to_numeric(df_base['cantidad_de_lineas'], errors='coerce')
+    return df_base
+
+
+def _filtros_estaticos(df_base, reglas):
+    """Reglas del lote que dependen solo de la base, evaluadas en una sola pasada"""
+    with medir('reglas estáticas', df_base) as paso:
+        filas_entrada = df_base.shape[0]
+        df_base, paso['reglas'] = aplicar(_tipar(df_base), reglas)
+        imprimir_atribucion(paso['reglas'], filas_entrada)
+
+        # Con las reglas de DNI y prefijo las filas que quedan ya tienen DNI y línea
+        # numéricos; si data/reglas.json no las incluye pueden quedar nulos
+        for columna in ['dni', 'linea_num']:
+            if df_base[columna].notna().all():
+                df_base[columna] = df_base[columna].astype('int64')
+        cantidad = df_base['cantidad_de_lineas']
+        if pd.api.types.is_float_dtype(cantidad.dtype) and (cantidad % 1 == 0).all():
+            df_base['cantidad_de_lineas'] = cantidad.astype('int64')
+        paso.salida(df_base)
+    return df_base
+
+
+def _sha256(archivo):
+    h = hashlib.sha256()
+    with open(archivo, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _huella_reglas(reglas):
+    """Reglas tal como quedan guardadas en la metadata (tuplas -> listas)"""
+    return json.loads(json.dumps(reglas))
+
+
+def _huella(archivo, reglas, sha256=None):
+    stat = archivo.stat()
+    return {
+        'version': VERSION_FILTROS,
+        'reglas': _huella_reglas(reglas),
+        'mtime_ns': stat.st_mtime_ns,
+        'tamanio': stat.st_size,
+        'sha256': sha256 or _sha256(archivo),
+    }
+
+
+def _leer_huella(snapshot):
+    if not snapshot.is_file():
+        return None
+    metadata = pq.read_schema(snapshot).metadata or {}
+    return json.loads(metadata[b'huella']) if b'huella' in metadata else None
+
+
+def _escribir_snapshot(tabla, snapshot, huella):
+    metadata = {**(tabla.schema.metadata or {}), b'huella': json.dumps(huella).encode()}
+    tmp = snapshot.with_suffix('.tmp')
+    pq.write_table(tabla.replace_schema_metadata(metadata), tmp, compression='snappy')
+    os.replace(tmp, snapshot)
+
+
+def _vigente(archivo, snapshot, reglas):
+    """
+    True si el snapshot corresponde a `archivo` y `reglas`. Si solo cambió el
+    mtime (mismo contenido) se actualiza la huella sin refiltrar
+    """
+    guardada = _leer_huella(snapshot)
+    if guardada is None or (guardada.get('version'), guardada.get('reglas')) != (VERSION_FILTROS, _huella_reglas(reglas)):
+        return False
+    stat = archivo.stat()
+    if (guardada['mtime_ns'], guardada['tamanio']) == (stat.st_mtime_ns, stat.st_size):
+        return True
+    if stat.st_size == guardada['tamanio'] and _sha256(archivo) == guardada['sha256']:
+        _escribir_snapshot(pq.read_table(snapshot), snapshot, _huella(archivo, reglas, guardada['sha256']))
+        print("✓ Base elegible con el mismo contenido: huella actualizada")
+        return True
+    return False
+
+
+def base_elegible(archivo, snapshot, reglas=REGLAS_ESTATICAS):
+    """
+    Base que ya pasó la limpieza y las reglas estáticas, ordenada por línea.
+    Usa el snapshot si está vigente para `archivo` y `reglas`; si no, lo reconstruye.
+    """
+    if _vigente(archivo, snapshot, reglas):
+        df_base = catalogo.tabla(snapshot).to_pandas()
+        print(f"✓ Base elegible vigente ({snapshot.name}): {df_base.shape[0]} registros")
+        return df_base
+
+    print(f"→ Reconstruyendo base elegible desde {archivo.name}...")
+    huella = _huella(archivo, reglas)
+    with medir('lectura base principal') as paso:
+        df_base = cargar_base(archivo, reglas)
+        paso.salida(df_base)
+    print(f"Registros leídos de la base principal: {df_base.shape[0]}")
+    with medir('limpieza', df_base) as paso:
+        df_base = _limpiar(df_base)
+        paso.salida(df_base)
+    df_base = _filtros_estaticos(df_base, reglas)
+    df_base = df_base.sort_values('linea_num', kind='stable', ignore_index=True)
+
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    _escribir_snapshot(pa.Table.from_pandas(df_base, preserve_index=False), snapshot, huella)
+    print(f"✓ Base elegible guardada ({snapshot.name}): {df_base.shape[0]} registros")
+    return df_base
+
+
+def tabla_elegible(archivo, snapshot, reglas=REGLAS_ESTATICAS):
+    """Base elegible como tabla Arrow, sin pasar por pandas si el snapshot está vigente (motor arrow)"""
+    if not _vigente(archivo, snapshot, reglas):
+        base_elegible(archivo, snapshot, reglas)
+    tabla = catalogo.tabla(snapshot)
+    print(f"✓ Base elegible vigente ({snapshot.name}): {len(tabla)} registros")
+    return tabla
@@ -0,0 +1,199 @@
+"""
+Catálogo de los datos del pipeline: dónde está cada dataset, en qué formato y
+con qué esquema. Los scripts toman de acá sus rutas (en lugar de repetir
+BASE_DIR / DATA_ROOT / nombres de archivo) y la lectura de los archivos
+grandes pasa por acá.
+
+    ruta('base')                              Path del dataset
+    dataset('base')                           pyarrow.dataset perezoso: no lee nada hasta
+                                              `to_table(columns=..., filter=...)`
+    leer('base', columns=[...], filter=expr)  tabla Arrow (proyección y filtro al leer), cacheada
+    abrir(ruta) / tabla(ruta, ...)            lo mismo para un archivo por ruta (p. ej. snapshots)
+
+Los consolidados (Iris, Tipificaciones) son directorios de fragmentos donde el
+más nuevo gana por clave (ver consolidado.py): `leer` devuelve ese estado
+resuelto y `dataset` un dataset en memoria sobre él. Los parquet con esquema
+declarado se llevan a ese esquema al leerlos (esquemas.conformar); los CSV se
+leen con todas las columnas como texto (como `read_csv(dtype=str)`).
+
+Caché: las tablas leídas con `leer` / `tabla` quedan en un LRU en memoria del
+proceso, acotado en bytes (FILTROS_CACHE_MB, o `configurar_cache`). Cada
+entrada guarda la huella (mtime / tamaño) del origen: si el archivo cambia se
+vuelve a leer. Por defecto está apagado (0 MB): a un script que corre una vez
+no le sirve y le suma memoria; el bot lo prende para que las corridas
+siguientes no relean la base.
+"""
+import csv
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+import esquemas
+from checkpoints import huella
+from consolidado import huella_consolidado, leer_tabla_consolidado
+
+
+# ==================== RUTAS ====================
+BASE_DIR = Path(__file__).parent.parent
+# FILTROS_DATA permite apuntar a otro directorio de datos (p. ej. los sintéticos de benchmarks/)
+DATA_ROOT = Path(os.environ.get('FILTROS_DATA') or BASE_DIR / 'data')
+DATA_RAW = DATA_ROOT / 'raw'
+DATA_PROCESSED = DATA_ROOT / 'processed'
+
+# nombre: ruta (relativa a DATA_ROOT), formato ('parquet' / 'csv' / 'consolidado'; 'txt' solo tiene ruta)
+# y esquema o separador
+DATASETS = {
+    'base': {'ruta': 'base_2024_2025_actualizada.parquet', 'formato': 'parquet'},
+    'base_elegible': {'ruta': 'processed/base_elegible.parquet', 'formato': 'parquet'},
+    'no_llame': {'ruta': 'Registro_No_Llame.parquet', 'formato': 'parquet', 'esquema': esquemas.LINEAS_FILTRADAS},
+    'lineas_filtradas': {'ruta': 'lineas_filtradas_150.parquet', 'formato': 'parquet',
+                         'esquema': esquemas.LINEAS_FILTRADAS},
+    'iris': {'ruta': 'processed/Iris-consolidado', 'formato': 'consolidado', 'esquema': esquemas.IRIS},
+    'tipificaciones': {'ruta': 'processed/Tipificaciones-consolidadas', 'formato': 'consolidado',
+                       'esquema': esquemas.TIPIFICACIONES},
+    'reportes': {'ruta': 'raw/reportes', 'formato': 'csv', 'separador': ';'},
+    'iris_crudo': {'ruta': 'raw/extraerEstado', 'formato': 'txt'},
+    'cuit': {'ruta': 'base_cuit.csv', 'formato': 'csv', 'separador': ','},
+    'lote': {'ruta': 'bases/base.csv', 'formato': 'csv', 'separador': ';'},
+}
+
+
+def ruta(nombre):
+    """Path de un dataset del catálogo"""
+    return DATA_ROOT / DATASETS[nombre]['ruta']
+
+
+# ==================== CACHÉ LRU ====================
+_cache = OrderedDict()  # clave -> (huella del origen, tabla)
+_lock = threading.Lock()
+_estado = {'limite': int(float(os.environ.get('FILTROS_CACHE_MB') or 0) * 2**20), 'bytes': 0,
+           'aciertos': 0, 'fallos': 0}
+
+
+def configurar_cache(megabytes):
+    """Límite del caché en MB (0 lo apaga); desaloja lo que no entre"""
+    with _lock:
+        _estado['limite'] = int(megabytes * 2**20)
+        _desalojar()
+
+
+def vaciar_cache():
+    with _lock:
+        _cache.clear()
+        _estado['bytes'] = 0
+
+
+def estado_cache():
+    """Entradas, bytes ocupados, límite y aciertos / fallos desde el inicio del proceso"""
+    with _lock:
+        return {**_estado, 'entradas': len(_cache)}
+
+
+def _desalojar():
+    """Saca las entradas menos usadas hasta quedar dentro del límite (con el lock tomado)"""
+    while _cache and _estado['bytes'] > _estado['limite']:
+        _, (_, tabla) = _cache.popitem(last=False)
+        _estado['bytes'] -= tabla.nbytes
+
+
+def _cacheado(clave, huella_origen, leer_tabla):
+    """Tabla de `clave` desde el caché si la huella coincide; si no la lee con `leer_tabla()`"""
+    with _lock:
+        guardado = _cache.get(clave)
+        if guardado is not None and guardado[0] == huella_origen:
+            _cache.move_to_end(clave)
+            _estado['aciertos'] += 1
+            return guardado[1]
+        _estado['fallos'] += 1
+
+    tabla = leer_tabla()
+    with _lock:
+        anterior = _cache.pop(clave, None)
+        if anterior is not None:
+            _estado['bytes'] -= anterior[1].nbytes
+        if tabla.nbytes <= _estado['limite']:
+            _cache[clave] = (huella_origen, tabla)
+            _estado['bytes'] += tabla.nbytes
+            _desalojar()
+    return tabla
+
+
+# ==================== LECTURA ====================
+# Valores que read_csv lee como nulos por defecto (los de Arrow son casi los mismos)
+_NULOS = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>',
+          'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+
+def _csv(archivo, separador):
+    """Formato CSV con todas las columnas como texto (los nombres salen del encabezado del primer archivo)"""
+    archivo = Path(archivo)
+    if archivo.is_dir():
+        primero = next(iter(sorted(archivo.glob('*.csv'))), None)
+        if primero is None:
+            raise FileNotFoundError(f"No hay archivos CSV en {archivo}")
+        archivo = primero
+    with open(archivo, encoding='utf-8', newline='') as f:
+        nombres = next(csv.reader([f.readline()], delimiter=separador))
+    return ds.CsvFileFormat(
+        parse_options=pacsv.ParseOptions(delimiter=separador, newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={nombre: pa.string() for nombre in nombres},
+            null_values=_NULOS, strings_can_be_null=True,
+        ),
+    )
+
+
+def abrir(archivo, formato='parquet', separador=None):
+    """Dataset perezoso de un archivo (o directorio) parquet / CSV"""
+    if formato == 'parquet':
+        return ds.dataset(archivo, format='parquet')
+    if formato == 'csv':
+        return ds.dataset(archivo, format=_csv(archivo, separador))
+    raise ValueError(f"Formato sin dataset Arrow: {formato!r}")
+
+
+def tabla(archivo, columns=None, filter=None, formato='parquet', separador=None, esquema=None):
+    """
+    Tabla Arrow de un archivo con proyección (`columns`) y filtro (expresión de
+    pyarrow.dataset) aplicados al leer; pasa por el caché
+    """
+    archivo = Path(archivo)
+    # El mismo archivo leído con otro formato, separador o esquema es otra tabla
+    clave = (str(archivo), None if columns is None else tuple(columns), None if filter is None else str(filter),
+             formato, separador, None if esquema is None else esquema.to_string())
+
+    def leer_tabla():
+        resultado = abrir(archivo, formato, separador).to_table(columns=columns, filter=filter)
+        return resultado if esquema is None else esquemas.conformar(resultado, esquema)
+
+    return _cacheado(clave, huella(archivo), leer_tabla)
+
+
+def dataset(nombre):
+    """Dataset perezoso de un dataset del catálogo (los consolidados, sobre su estado resuelto)"""
+    definicion = DATASETS[nombre]
+    if definicion['formato'] == 'consolidado':
+        return ds.dataset(leer(nombre))
+    return abrir(ruta(nombre), definicion['formato'], definicion.get('separador'))
+
+
+def leer(nombre, columns=None, filter=None):
+    """Tabla Arrow de un dataset del catálogo, con proyección y filtro; pasa por el caché"""
+    definicion = DATASETS[nombre]
+    if definicion['formato'] != 'consolidado':
+        return tabla(ruta(nombre), columns, filter, definicion['formato'], definicion.get('separador'),
+                     definicion.get('esquema'))
+
+    directorio = ruta(nombre)
+    clave = (str(directorio), None if columns is None else tuple(columns), None if filter is None else str(filter))
+
+    def leer_tabla():
+        resultado = leer_tabla_consolidado(directorio, definicion['esquema'], columns)
+        return resultado if filter is None else resultado.filter(filter)
+
+    return _cacheado(clave, huella_consolidado(directorio), leer_tabla)
@@ -0,0 +1,94 @@
+"""
+Caché por etapa del pipeline (usado por pipeline.py).
+
+Cada etapa registra en un manifiesto la huella de sus entradas (mtime / tamaño
+de archivos y directorios, fecha del día, código de los scripts) y dónde quedó
+su salida. Si en la próxima corrida las entradas son las mismas y la salida
+sigue en disco sin modificar, la etapa se omite y se reutiliza la salida.
+
+    checkpoints/
+    ├── manifiesto.json   {etapa: {'entradas': ..., 'salidas': {nombre: [ruta, huella]}}}
+    └── lote.parquet      lote de la etapa 2 (entrada de la etapa 3)
+"""
+import json
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from indices import huella_archivo
+
+
+MANIFIESTO = 'manifiesto.json'
+
+
+# ==================== HUELLAS ====================
+def huella(ruta):
+    """
+    Huella de una entrada: archivo -> mtime / tamaño; directorio -> la de todos
+    sus archivos (ruta relativa, mtime, tamaño); None si no existe
+    """
+    ruta = Path(ruta)
+    if ruta.is_file():
+        return huella_archivo(ruta)
+    if ruta.is_dir():
+        return [
+            [archivo.relative_to(ruta).as_posix(), archivo.stat().st_mtime_ns, archivo.stat().st_size]
+            for archivo in sorted(ruta.rglob('*')) if archivo.is_file()
+        ]
+    return None
+
+
+def _normalizar(entradas):
+    """Mismo formato que al releer el manifiesto (tuplas -> listas, claves str)"""
+    return json.loads(json.dumps(entradas, default=str))
+
+
+# ==================== MANIFIESTO ====================
+def _leer_manifiesto(directorio):
+    try:
+        return json.loads((directorio / MANIFIESTO).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def etapa_vigente(directorio, etapa, entradas):
+    """
+    Salidas registradas de `etapa` ({nombre: Path}) si sus entradas no cambiaron
+    y las salidas siguen en disco tal como se escribieron; sino None
+    """
+    registro = _leer_manifiesto(directorio).get(etapa)
+    if registro is None or registro.get('entradas') != _normalizar(entradas):
+        return None
+    salidas = {}
+    for nombre, (ruta, guardada) in registro.get('salidas', {}).items():
+        if _normalizar(huella(ruta)) != guardada:
+            return None
+        salidas[nombre] = Path(ruta)
+    return salidas
+
+
+def registrar_etapa(directorio, etapa, entradas, salidas=None):
+    """Guarda las entradas y salidas de una etapa que terminó bien (tmp + rename)"""
+    directorio.mkdir(parents=True, exist_ok=True)
+    manifiesto = _leer_manifiesto(directorio)
+    manifiesto[etapa] = {
+        'entradas': _normalizar(entradas),
+        'salidas': {nombre: [str(ruta), huella(ruta)] for nombre, ruta in (salidas or {}).items()},
+    }
+    tmp = directorio / f'{MANIFIESTO}.tmp'
+    tmp.write_text(json.dumps(manifiesto, indent=1), encoding='utf-8')
+    os.replace(tmp, directorio / MANIFIESTO)
+
+
+# ==================== SALIDAS EN MEMORIA ====================
+def guardar_df(df, archivo):
+    """DataFrame de una etapa -> parquet (conserva los tipos para reusarlo tal cual)"""
+    tmp = archivo.with_suffix('.tmp')
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, compression='snappy')
+    os.replace(tmp, archivo)
+
+
+def leer_df(archivo):
+    return pq.read_table(archivo).to_pandas()
@@ -0,0 +1,409 @@
+"""
+Consolidados incrementales (Tipificaciones / Iris).
+
+El consolidado guarda un registro por clave (`Cliente` o `linea`) con la fecha
+más reciente conocida. La actualización se hace sobre columnas completas:
+concat + orden por clave + quedarse con el último por clave, en lugar de
+recorrer fila por fila un diccionario con todo el histórico.
+
+En disco cada consolidado es un directorio particionado por bucket de hash de
+la clave, con fragmentos append-only:
+
+    Iris-consolidado/
+    ├── bucket=00/
+    │   ├── parte-20251001T080000000000.parquet   (compactado)
+    │   └── parte-20251002T080000000000.parquet   (delta del día)
+    ├── bucket=01/ ...
+    └── particion.json   función de hash y cantidad de buckets del almacén
+
+La ingesta diaria solo escribe los registros que cambian el estado (un
+fragmento nuevo por bucket afectado). Dentro de un bucket, el fragmento más
+nuevo gana para cada clave. La compactación periódica reescribe cada bucket
+con demasiados fragmentos en uno solo con el último registro por clave.
+
+Los fragmentos se escriben con el esquema tipado de `esquemas.py` (clave
+int64, fechas date32, estados como categorías). El bucket sale del hash del
+valor int64 de la clave; las claves nulas no se guardan.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+import esquemas
+
+
+# Valor que ocupa una fecha nula cuando es la primera de su clave: nunca se reemplaza
+_NAT_PRIMERO = np.iinfo(np.int64).max
+
+# Cantidad de buckets de hash por consolidado
+BUCKETS = 16
+
+# Fragmentos por bucket a partir de los cuales se compacta
+MAX_FRAGMENTOS = 10
+
+# Cómo se reparte un almacén en buckets. Los almacenes sin este particion.json
+# hasheaban el texto de la clave (y una columna con nulos pasaba por float,
+# '1123456789.0'): migrar_consolidado los reparte de nuevo
+_PARTICION = {'hash': 'int64', 'buckets': BUCKETS}
+
+
+def _ultimo_por_clave(df, key_column):
+    """Un registro por clave: el de fecha más reciente (una sola copia del DataFrame)"""
+    posiciones = (
+        df['fecha'].reset_index(drop=True)
+        .sort_values(ascending=False, kind='stable')
+        .index.to_numpy()
+    )
+    primeras = ~pd.Series(df[key_column].to_numpy()[posiciones]).duplicated().to_numpy()
+    return df.take(posiciones[primeras])
+
+
+def _resolver_delta(df_existing, df_new, key_column):
+    """
+    Aplica la regla del consolidado sobre las claves de `df_new`.
+
+    `df_existing` debe tener un registro por clave y `fecha` como datetime.
+    Devuelve (df_new sin claves nulas, posiciones en él de los registros que
+    quedan como finales, conteos de actualizados / agregados / omitidos).
+    """
+    # Saltar registros nuevos con clave nula
+    clave_nula = df_new[key_column].isna().to_numpy()
+    skipped_count = int(clave_nula.sum())
+    df_new = df_new[~clave_nula].reset_index(drop=True)
+
+    # Secuencia por clave: primero el registro existente (si hay) y luego los
+    # nuevos en el orden original. Solo se miran las claves presentes en df_new
+    existentes = df_existing[df_existing[key_column].isin(df_new[key_column])]
+    secuencia = pd.DataFrame({
+        'clave': np.concatenate([existentes[key_column].to_numpy(), df_new[key_column].to_numpy()]),
+        'fecha': np.concatenate([
+            existentes['fecha'].to_numpy(dtype='datetime64[ns]'),
+            df_new['fecha'].to_numpy(dtype='datetime64[ns]'),
+        ]).view(np.int64),
+        'es_nuevo': np.repeat([False, True], [len(existentes), len(df_new)]),
+        'posicion': np.concatenate([np.full(len(existentes), -1), np.arange(len(df_new))]),
+    })
+    secuencia = secuencia.sort_values('clave', kind='stable', ignore_index=True)
+
+    es_primero = ~secuencia['clave'].duplicated().to_numpy()
+    grupo = np.cumsum(es_primero)
+
+    # Comparaciones con NaT siempre son falsas: si la primera fecha es NaT nunca
+    # se reemplaza (máximo), una NaT posterior nunca reemplaza (NaT == mínimo int64)
+    fecha = secuencia['fecha'].to_numpy()
+    fecha = np.where(es_primero & (fecha == np.iinfo(np.int64).min), _NAT_PRIMERO, fecha)
+
+    # Un registro reemplaza al actual si supera el máximo de los anteriores de su clave
+    # (los grupos son contiguos: desplazar una posición alcanza, el primero se descarta)
+    maximo = pd.Series(fecha).groupby(grupo).cummax().to_numpy()
+    maximo_previo = np.concatenate([[_NAT_PRIMERO], maximo[:-1]])
+    reemplaza = ~es_primero & (fecha > maximo_previo)
+
+    updated_count = int(reemplaza.sum())
+    added_count = int((es_primero & secuencia['es_nuevo'].to_numpy()).sum())
+
+    # El registro final de cada clave es el último aceptado (primero o reemplazo)
+    aceptados = secuencia[es_primero | reemplaza].assign(grupo=grupo[es_primero | reemplaza])
+    finales = aceptados.drop_duplicates(subset='grupo', keep='last')
+    posiciones = np.sort(finales.loc[finales['es_nuevo'], 'posicion'].to_numpy())
+
+    return df_new, posiciones, (updated_count, added_count, skipped_count)
+
+
+def _imprimir_conteos(conteos):
+    updated_count, added_count, skipped_count = conteos
+    print(f"  → {updated_count} registros actualizados")
+    print(f"  → {added_count} registros nuevos agregados")
+    if skipped_count > 0:
+        print(f"  → {skipped_count} registros omitidos (clave nula)")
+
+
+def update_consolidated(df_existing, df_new, key_column):
+    """
+    Actualiza el consolidado: reemplaza si fecha es mayor, sino agrega nuevos.
+
+    Equivale a recorrer `df_new` en orden sobre un diccionario clave -> registro
+    (una fila nueva reemplaza a la actual solo si su fecha es estrictamente
+    mayor; las claves nulas se omiten), pero trabajando solo con las claves
+    que aparecen en `df_new`: el costo crece con el delta, no con el histórico.
+
+    El pipeline usa `agregar_al_consolidado`; esta versión en memoria queda
+    como referencia para el caso `consolidado` de benchmarks/bench.py.
+    """
+    if df_existing.empty:
+        return df_new
+
+    # Convertir fechas a datetime para comparación
+    df_existing['fecha'] = pd.to_datetime(df_existing['fecha'])
+    df_new['fecha'] = pd.to_datetime(df_new['fecha'])
+
+    # IMPORTANTE: Eliminar duplicados del existente, quedándose con el más reciente
+    df_existing = _ultimo_por_clave(df_existing, key_column)
+
+    df_new, posiciones, conteos = _resolver_delta(df_existing, df_new, key_column)
+    _imprimir_conteos(conteos)
+
+    df_finales = df_new.take(posiciones)
+    df_result = pd.concat(
+        [df_existing[~df_existing[key_column].isin(df_finales[key_column])], df_finales],
+        ignore_index=True,
+    )
+    return df_result
+
+
+# ==================== ALMACÉN PARTICIONADO ====================
+def _bucket(claves):
+    """Bucket de cada clave (array int64 sin nulos): hash estable del valor, nunca
+    de su texto, así no depende del dtype con el que llegó la columna"""
+    hashes = pd.util.hash_array(np.asarray(claves, dtype=np.int64))
+    return (hashes % BUCKETS).astype(np.int64)
+
+
+def _dir_bucket(directorio, bucket):
+    return directorio / f'bucket={bucket:02d}'
+
+
+def _fragmentos(directorio):
+    """{bucket: [fragmentos del más viejo al más nuevo]} de los buckets no vacíos"""
+    fragmentos = {}
+    if not directorio.is_dir():
+        return fragmentos
+    for dir_bucket in sorted(directorio.glob('bucket=*')):
+        archivos = sorted(dir_bucket.glob('parte-*.parquet'))
+        if archivos:
+            fragmentos[int(dir_bucket.name.split('=')[1])] = archivos
+    return fragmentos
+
+
+def _escribir_fragmento(dir_bucket, tabla):
+    """Escribe un fragmento nuevo de forma atómica (tmp + rename)"""
+    dir_bucket.mkdir(parents=True, exist_ok=True)
+    destino = dir_bucket / f"parte-{datetime.now():%Y%m%dT%H%M%S%f}.parquet"
+    tmp = destino.with_suffix('.tmp')
+    pq.write_table(tabla, tmp, compression='snappy')
+    os.replace(tmp, destino)
+    return destino
+
+
+def _particion_vigente(directorio):
+    archivo = directorio / 'particion.json'
+    return archivo.is_file() and json.loads(archivo.read_text(encoding='utf-8')) == _PARTICION
+
+
+def _marcar_particion(directorio):
+    directorio.mkdir(parents=True, exist_ok=True)
+    (directorio / 'particion.json').write_text(json.dumps(_PARTICION), encoding='utf-8')
+
+
+def _escribir_por_bucket(directorio, df, esquema):
+    """Escribe `df` repartido por bucket. Devuelve la cantidad de registros
+    omitidos porque la clave es nula (o no es un número válido)"""
+    tabla = esquemas.a_tabla(df, esquema)
+    claves = tabla[esquemas.clave(esquema)]
+    omitidos = claves.null_count
+    if omitidos:
+        tabla = tabla.filter(pc.is_valid(claves))
+    buckets = _bucket(tabla[esquemas.clave(esquema)].to_numpy())
+    for bucket in np.unique(buckets):
+        _escribir_fragmento(_dir_bucket(directorio, bucket), tabla.filter(buckets == bucket))
+    return omitidos
+
+
+def _leer_bucket(archivos, esquema, columns=None, filters=None):
+    """Estado de un bucket como tabla Arrow: para cada clave gana el fragmento más nuevo"""
+    key_column = esquemas.clave(esquema)
+    tabla = pa.concat_tables(
+        [esquemas.conformar(pq.read_table(f, columns=columns, filters=filters), esquema) for f in archivos],
+        promote_options='default',
+    )
+    if len(archivos) > 1:
+        indices = pa.table({key_column: tabla[key_column], '_i': np.arange(len(tabla))})
+        ultimos = indices.group_by(key_column, use_threads=False).aggregate([('_i', 'max')])
+        tabla = tabla.take(np.sort(ultimos['_i_max'].to_numpy()))
+    return tabla
+
+
+def leer_tabla_consolidado(directorio, esquema, columns=None):
+    """
+    Estado actual del consolidado (un registro por clave) como tabla Arrow tipada.
+    Lanza FileNotFoundError si el consolidado no existe o está vacío.
+    """
+    fragmentos = _fragmentos(directorio)
+    if not fragmentos:
+        raise FileNotFoundError(f"No existe el consolidado {directorio}")
+
+    key_column = esquemas.clave(esquema)
+    columnas = None if columns is None else list(dict.fromkeys([key_column, *columns]))
+    tabla = pa.concat_tables(
+        [_leer_bucket(archivos, esquema, columnas) for archivos in fragmentos.values()],
+        promote_options='default',
+    )
+    return tabla if columns is None else tabla.select(list(columns))
+
+
+def leer_consolidado(directorio, esquema, columns=None):
+    """
+    Lee el estado actual del consolidado (un registro por clave) con sus tipos:
+    clave int64, fechas datetime64 y categorías como Categorical.
+    Lanza FileNotFoundError si el consolidado no existe o está vacío.
+    """
+    return leer_tabla_consolidado(directorio, esquema, columns).to_pandas(date_as_object=False)
+
+
+def huella_consolidado(directorio):
+    """Fragmentos actuales del consolidado con su mtime y tamaño (cambia con cada escritura)"""
+    huella = []
+    for archivos in _fragmentos(directorio).values():
+        for archivo in archivos:
+            stat = archivo.stat()
+            huella.append([f'{archivo.parent.name}/{archivo.name}', stat.st_mtime_ns, stat.st_size])
+    return huella
+
+
+def _reparticionar(directorio, esquema):
+    """
+    Reparte de nuevo un almacén escrito con otra función de bucket. Se leen todos
+    los fragmentos en el orden en que se escribieron y se aplica la regla del
+    consolidado, así una clave que quedó en dos buckets termina en un registro.
+    El almacén nuevo se arma al lado y reemplaza al viejo con dos renames
+    """
+    key_column = esquemas.clave(esquema)
+    archivos = sorted(
+        (archivo for archivos in _fragmentos(directorio).values() for archivo in archivos),
+        key=lambda archivo: archivo.name,
+    )
+    tabla = pa.concat_tables(
+        [esquemas.conformar(pq.read_table(archivo), esquema) for archivo in archivos],
+        promote_options='default',
+    )
+    df = esquemas.a_pandas(tabla)
+    df, posiciones, (_, registros, omitidos) = _resolver_delta(df.iloc[:0], df, key_column)
+
+    nuevo = directorio.with_name(directorio.name + '.reparticion')
+    viejo = directorio.with_name(directorio.name + '.viejo')
+    shutil.rmtree(nuevo, ignore_errors=True)
+    _escribir_por_bucket(nuevo, df.take(posiciones), esquema)
+    _marcar_particion(nuevo)
+    os.replace(directorio, viejo)
+    os.replace(nuevo, directorio)
+    shutil.rmtree(viejo)
+    print(f"✓ Repartido {directorio.name} por hash de la clave int64: {registros} registros")
+    if omitidos:
+        print(f"  → {omitidos} registros omitidos (clave nula)")
+
+
+def migrar_consolidado(directorio, esquema):
+    """
+    Lleva un consolidado existente al formato actual:
+    - el archivo único viejo (`<directorio>.parquet`) pasa al almacén
+      particionado y queda renombrado como `.migrado`; las claves que no son
+      un número válido se descartan
+    - un almacén sin `particion.json` (bucket por hash del texto) se reparte de nuevo
+    - los fragmentos guardados como texto se reescriben con el esquema tipado
+    """
+    key_column = esquemas.clave(esquema)
+    archivo = directorio.with_suffix('.parquet')
+    if archivo.is_file() and not _fragmentos(directorio):
+        df = pd.read_parquet(archivo, engine='pyarrow')
+        omitidos = 0
+        if not df.empty:
+            # Tipar antes de deduplicar: '1123456789' y '1123456789.0' son la misma línea
+            df = esquemas.a_pandas(esquemas.a_tabla(df, esquema))
+            omitidos = int(df[key_column].isna().sum())
+            df = _ultimo_por_clave(df.dropna(subset=[key_column]), key_column)
+            _escribir_por_bucket(directorio, df, esquema)
+        _marcar_particion(directorio)
+        archivo.rename(archivo.with_name(archivo.name + '.migrado'))
+        print(f"✓ Migrado {archivo.name} a almacén particionado: {len(df)} registros")
+        if omitidos:
+            print(f"  → {omitidos} registros omitidos (clave nula)")
+
+    if _fragmentos(directorio) and not _particion_vigente(directorio):
+        _reparticionar(directorio, esquema)
+
+    retipados = 0
+    for archivos in _fragmentos(directorio).values():
+        for fragmento in archivos:
+            if pq.read_schema(fragmento).equals(esquema, check_metadata=False):
+                continue
+            tabla = esquemas.conformar(pq.read_table(fragmento), esquema)
+            tmp = fragmento.with_suffix('.tmp')
+            pq.write_table(tabla, tmp, compression='snappy')
+            os.replace(tmp, fragmento)
+            retipados += 1
+    if retipados:
+        print(f"✓ Convertidos {retipados} fragmentos de {directorio.name} al esquema tipado")
+
+
+def agregar_al_consolidado(directorio, df_new, esquema):
+    """
+    Ingesta de un delta: escribe solo los registros que cambian el estado
+    (clave nueva o fecha estrictamente mayor). Solo se leen clave y fecha de los
+    buckets afectados; el costo de escritura crece con el delta.
+    Las claves que no son un número válido cuentan como nulas.
+    Devuelve la cantidad de registros escritos.
+    """
+    key_column = esquemas.clave(esquema)
+    df_new = esquemas.a_pandas(esquemas.a_tabla(df_new, esquema))
+    claves = df_new[key_column].dropna()
+
+    # Un almacén nuevo nace con la partición vigente; uno viejo se reparte antes
+    fragmentos = _fragmentos(directorio)
+    if not fragmentos:
+        _marcar_particion(directorio)
+    elif not _particion_vigente(directorio):
+        _reparticionar(directorio, esquema)
+        fragmentos = _fragmentos(directorio)
+
+    # Estado actual (clave + fecha) de las claves del delta
+    buckets = _bucket(claves.to_numpy(dtype=np.int64))
+    partes = []
+    for bucket in np.unique(buckets):
+        if bucket not in fragmentos:
+            continue
+        claves_bucket = claves[buckets == bucket].unique().tolist()
+        partes.append(_leer_bucket(
+            fragmentos[bucket], esquema, [key_column, 'fecha'],
+            filters=[(key_column, 'in', claves_bucket)],
+        ))
+    if partes:
+        df_existing = esquemas.a_pandas(pa.concat_tables(partes))
+    else:
+        df_existing = esquemas.a_pandas(esquemas.a_tabla(df_new.iloc[:0], esquema).select([key_column, 'fecha']))
+
+    # El delta también se reduce a un registro por clave con la misma regla
+    df_new, posiciones, conteos = _resolver_delta(df_existing, df_new, key_column)
+    _imprimir_conteos(conteos)
+
+    df_finales = df_new.take(posiciones)
+    _escribir_por_bucket(directorio, df_finales, esquema)
+    return len(df_finales)
+
+
+def compactar(directorio, esquema, max_fragmentos=MAX_FRAGMENTOS):
+    """
+    Reescribe cada bucket con más de `max_fragmentos` fragmentos en uno solo con
+    el último registro por clave. El fragmento compactado toma el nombre del más
+    nuevo (reemplazo atómico) y recién después se borran los anteriores
+    """
+    compactados = 0
+    for archivos in _fragmentos(directorio).values():
+        if len(archivos) <= max_fragmentos:
+            continue
+        tabla = _leer_bucket(archivos, esquema)
+        tmp = archivos[-1].with_suffix('.tmp')
+        pq.write_table(tabla, tmp, compression='snappy')
+        os.replace(tmp, archivos[-1])
+        for archivo in archivos[:-1]:
+            archivo.unlink()
+        compactados += 1
+    if compactados:
+        print(f"✓ Compactados {compactados} buckets de {directorio.name}")
+    return compactados
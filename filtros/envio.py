@@ -0,0 +1,192 @@
+"""
+Preparación de la base final para mandarla por Telegram (un bot puede enviar
+archivos de hasta 50 MB).
+
+`preparar(archivo, limite)` devuelve las partes a subir, cada una de a lo sumo
+`limite` bytes y abrible en el teléfono (un CSV comprimido con encabezado, no
+pedazos binarios):
+
+    1. el archivo tal cual si ya está comprimido (.zip / .csv.gz) y entra;
+       un .csv se comprime a .zip
+    2. si no entra: un archivo por turno (columna BBDD: ..._TM / ..._TT)
+    3. si un turno sigue sin entrar: partes con la misma cantidad de filas
+
+Las partes quedan en data/bases/envio/<nombre>/ junto con un manifiesto
+(envio.json: huella del archivo de origen, partes y cuáles ya se subieron).
+Si el envío se corta, el siguiente intento reutiliza las partes y solo sube
+las que faltan (`marcar_enviada` después de cada subida); si ya se habían
+subido todas se vuelve a mandar todo.
+"""
+import csv
+import gzip
+import json
+import math
+import os
+import shutil
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from indices import huella_archivo
+from salida import escribir_csv
+
+
+# Nivel de zlib de las partes: se comprime una vez y se sube por la red (conviene más que en salida.py)
+NIVEL_ENVIO = 6
+COLUMNA_TURNO = 'BBDD'
+# Margen al calcular la cantidad de partes (el tamaño comprimido no es exactamente proporcional a las filas)
+MARGEN = 0.9
+
+
+def _nombre(archivo):
+    """Nombre sin extensión (BASE_FINAL_... de .csv, .csv.gz o .zip)"""
+    return archivo.name.split('.')[0]
+
+
+def directorio_envio(archivo):
+    return archivo.parent / 'envio' / _nombre(archivo)
+
+
+# ==================== LECTURA ====================
+@contextmanager
+def _abrir_csv(archivo):
+    """Bytes del CSV (el de adentro del .zip, descomprimido si es .csv.gz)"""
+    if archivo.suffix == '.zip':
+        with zipfile.ZipFile(archivo) as zf, zf.open(zf.namelist()[0]) as f:
+            yield f
+    elif archivo.suffix == '.gz':
+        with gzip.open(archivo, 'rb') as f:
+            yield f
+    else:
+        with open(archivo, 'rb') as f:
+            yield f
+
+
+def _leer(archivo):
+    """Base final como tabla Arrow con todas las columnas como texto y sin nulos (se reescribe igual)"""
+    with _abrir_csv(archivo) as f:
+        nombres = next(csv.reader([f.readline().decode('utf-8')], delimiter=';'))
+    with _abrir_csv(archivo) as f:
+        return pacsv.read_csv(
+            f,
+            parse_options=pacsv.ParseOptions(delimiter=';', newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(column_types={nombre: pa.string() for nombre in nombres},
+                                                 null_values=[], strings_can_be_null=False),
+        )
+
+
+# ==================== PARTES ====================
+def _escribir(tabla, destino):
+    return escribir_csv(tabla.to_pandas(), destino, 'zip', nivel=NIVEL_ENVIO)
+
+
+def _por_tamanio(tabla, destino, limite):
+    """
+    Escribe `tabla` en destino.zip o, si no entra, en destino_parte1deN.zip ...
+    con N tal que cada parte quede por debajo de `limite`
+    """
+    entero = _escribir(tabla, destino)
+    if entero.stat().st_size <= limite:
+        return [entero]
+    cantidad = math.ceil(entero.stat().st_size / (limite * MARGEN))
+    entero.unlink()
+    while True:
+        filas = math.ceil(len(tabla) / cantidad)
+        partes = [
+            _escribir(tabla.slice(i * filas, filas), destino.with_name(f'{destino.stem}_parte{i + 1}de{cantidad}.csv'))
+            for i in range(cantidad)
+        ]
+        if all(parte.stat().st_size <= limite for parte in partes) or filas == 1:
+            return partes
+        for parte in partes:
+            parte.unlink()
+        cantidad += 1
+
+
+def _turnos(tabla):
+    """{sufijo: filas de ese turno} según la columna BBDD (en el orden en que aparecen)"""
+    if COLUMNA_TURNO not in tabla.column_names:
+        return {}
+    columna = tabla[COLUMNA_TURNO]
+    return {
+        (valor.rsplit('_', 1)[-1] or 'SIN_TURNO'): tabla.filter(pc.equal(columna, valor))
+        for valor in pc.unique(columna).to_pylist()
+    }
+
+
+def _partir(archivo, directorio, limite):
+    """Partes de `archivo` (en `directorio`), comprimidas y de a lo sumo `limite` bytes"""
+    nombre = _nombre(archivo)
+    comprimido = archivo.suffix in ('.zip', '.gz')
+    if comprimido and archivo.stat().st_size <= limite:
+        return [archivo]
+    if not comprimido:
+        destino = directorio / f'{nombre}.zip'
+        with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=NIVEL_ENVIO) as zf:
+            zf.write(archivo, archivo.name)
+        if destino.stat().st_size <= limite:
+            return [destino]
+        destino.unlink()
+
+    tabla = _leer(archivo)
+    turnos = _turnos(tabla)
+    if len(turnos) < 2:
+        return _por_tamanio(tabla, directorio / f'{nombre}.csv', limite)
+    partes = []
+    for turno, filas in turnos.items():
+        partes += _por_tamanio(filas, directorio / f'{nombre}_{turno}.csv', limite)
+    return partes
+
+
+# ==================== MANIFIESTO ====================
+def _manifiesto(directorio):
+    try:
+        return json.loads((directorio / 'envio.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _guardar_manifiesto(directorio, manifiesto):
+    tmp = directorio / 'envio.tmp'
+    tmp.write_text(json.dumps(manifiesto, ensure_ascii=False, indent=1), encoding='utf-8')
+    os.replace(tmp, directorio / 'envio.json')
+
+
+def preparar(archivo, limite):
+    """
+    Partes de `archivo` para enviar (lista de Paths, en orden) y las que faltan
+    subir. Reutiliza las del envío anterior si el archivo y el límite no cambiaron
+    """
+    archivo = Path(archivo)
+    directorio = directorio_envio(archivo)
+    huella = huella_archivo(archivo)
+    manifiesto = _manifiesto(directorio)
+    if (manifiesto is None or (manifiesto['origen'], manifiesto['limite']) != (huella, limite)
+            or not all(Path(parte).is_file() for parte in manifiesto['partes'])):
+        shutil.rmtree(directorio, ignore_errors=True)
+        directorio.mkdir(parents=True)
+        partes = _partir(archivo, directorio, limite)
+        manifiesto = {'origen': huella, 'limite': limite, 'partes': [str(parte) for parte in partes], 'enviadas': []}
+        _guardar_manifiesto(directorio, manifiesto)
+
+    partes = [Path(parte) for parte in manifiesto['partes']]
+    pendientes = [parte for parte in partes if str(parte) not in manifiesto['enviadas']]
+    if not pendientes:
+        # El envío anterior terminó: se vuelve a mandar todo
+        manifiesto['enviadas'] = []
+        _guardar_manifiesto(directorio, manifiesto)
+        pendientes = partes
+    return partes, pendientes
+
+
+def marcar_enviada(archivo, parte):
+    """Registra que `parte` ya se subió (si el envío se corta, no se vuelve a subir)"""
+    directorio = directorio_envio(Path(archivo))
+    manifiesto = _manifiesto(directorio)
+    if manifiesto is not None and str(parte) not in manifiesto['enviadas']:
+        manifiesto['enviadas'].append(str(parte))
+        _guardar_manifiesto(directorio, manifiesto)
@@ -0,0 +1,104 @@
+"""
+Esquemas tipados de los parquet que genera el pipeline.
+
+En lugar de guardar todo como texto (`astype(str)`), cada salida declara sus
+tipos: números de línea como int64, fechas como date32 y los estados /
+tipificaciones como categorías (dictionary). La primera columna de cada
+esquema es la clave del archivo.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
+_CATEGORIA = pa.dictionary(pa.int32(), pa.string())
+
+TIPIFICACIONES = pa.schema([
+    ('Cliente', pa.int64()),
+    ('Tipificacion', _CATEGORIA),
+    ('fecha', pa.date32()),
+    ('fecha_consulta', pa.date32()),
+])
+
+IRIS = pa.schema([
+    ('linea', pa.int64()),
+    ('fecha', pa.date32()),
+    ('estado', _CATEGORIA),
+    ('fecha_consulta', pa.date32()),
+])
+
+LINEAS_FILTRADAS = pa.schema([
+    ('linea', pa.int64()),
+])
+
+
+def clave(esquema):
+    """Nombre de la columna clave (la primera del esquema)"""
+    return esquema.names[0]
+
+
+# ==================== CONVERSIÓN ====================
+def _a_int64(serie):
+    """Números de línea a int64; lo que no es un entero válido queda nulo"""
+    if pd.api.types.is_integer_dtype(serie.dtype):
+        return pa.array(serie, type=pa.int64(), from_pandas=True)
+    if pd.api.types.is_float_dtype(serie.dtype):
+        return pa.array(serie.round().astype('Int64'), type=pa.int64(), from_pandas=True)
+    texto = serie.astype('string').str.strip().str.replace(r'\.0$', '', regex=True)
+    texto = texto.where(texto.str.fullmatch(r'\d{1,18}', na=False))
+    return pc.cast(pa.array(texto, type=pa.string(), from_pandas=True), pa.int64())
+
+
+def _a_fecha(serie):
+    fechas = pd.to_datetime(serie, errors='coerce')
+    return pa.array(fechas, from_pandas=True).cast(pa.date32())
+
+
+def _a_categoria(serie):
+    texto = serie.astype(object).where(serie.notna())
+    return pa.array(texto, type=pa.string(), from_pandas=True).dictionary_encode()
+
+
+_CONVERSORES = {
+    pa.int64(): _a_int64,
+    pa.date32(): _a_fecha,
+    _CATEGORIA: _a_categoria,
+}
+
+
+def a_tabla(df, esquema):
+    """DataFrame (con columnas de cualquier tipo) -> tabla Arrow con el esquema declarado"""
+    return pa.Table.from_arrays(
+        [_CONVERSORES[campo.type](df[campo.name]) for campo in esquema],
+        schema=esquema,
+    )
+
+
+def conformar(tabla, esquema):
+    """
+    Lleva una tabla leída de disco al esquema declarado (para archivos viejos
+    guardados como texto). Si ya coincide no hace nada
+    """
+    campos = [esquema.field(nombre) for nombre in tabla.column_names if nombre in esquema.names]
+    destino = pa.schema(campos)
+    if tabla.select(destino.names).schema.equals(destino):
+        return tabla.select(destino.names)
+    return a_tabla(tabla.select(destino.names).to_pandas(), destino)
+
+
+def a_pandas(tabla):
+    """Tabla tipada -> DataFrame: fechas como datetime64 y claves int64 nulables"""
+    return tabla.to_pandas(date_as_object=False, types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+
+# ==================== LECTURA / ESCRITURA ====================
+def leer_parquet(archivo, esquema, columns=None):
+    """Lee un parquet y lo devuelve como DataFrame tipado según el esquema"""
+    tabla = pq.read_table(archivo, columns=columns)
+    return conformar(tabla, esquema).to_pandas(date_as_object=False)
+
+
+def escribir_parquet(df, archivo, esquema):
+    """Escribe un DataFrame con el esquema declarado"""
+    pq.write_table(a_tabla(df, esquema), archivo, compression='snappy')
@@ -0,0 +1,319 @@
+"""
+Índices en disco para cruzar líneas (y DNI) sin cargar las tablas completas en pandas.
+
+Cada índice es un directorio con arrays numpy (`.npy`) ordenados por línea
+(int64) que se abren memory-mapped, más un `huella.json` con la huella
+(mtime / tamaño) de los archivos de origen. Las consultas son búsquedas
+binarias vectorizadas (`np.searchsorted`) sobre todo el lote de una vez.
+
+Índice de exclusión (lineas_filtradas_150 + Registro_No_Llame):
+
+    indice_exclusion/
+    ├── lineas.npy    int64 ordenado, sin repetidos
+    ├── fuentes.npy   uint8: bit por fuente en la que aparece la línea
+    └── huella.json
+
+Índice de estados Iris (tabla de consulta del Iris-consolidado):
+
+    indice_iris/
+    ├── lineas.npy    int64 ordenado
+    ├── estados.npy   uint8: código de estado (0 = la línea no está en Iris)
+    ├── fechas.npy    datetime64[D]: fecha del estado
+    └── huella.json   huella de los fragmentos + nombres de los estados
+
+Índice de CUIT (base_cuit.csv compilado; el CSV solo se parsea cuando cambia):
+
+    indice_cuit/
+    ├── dnis.npy      int64 ordenado (un DNI puede repetirse: tiene un CUIT por fila)
+    ├── cuits.npy     bytes: CUIT ya limpio (sin '.0' ni espacios), como texto
+    ├── con_cuit.npy  bool: la fila del CSV tenía CUIT (no vacío)
+    └── huella.json
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import esquemas
+from consolidado import huella_consolidado, leer_tabla_consolidado
+
+
+# Orden de las fuentes del índice de exclusión (bit 0, bit 1, ...)
+FUENTES_EXCLUSION = ('lineas_filtradas', 'no_llame')
+
+
+# ==================== ARCHIVOS ====================
+def huella_archivo(archivo):
+    """mtime y tamaño de un archivo de origen"""
+    stat = archivo.stat()
+    return {'mtime_ns': stat.st_mtime_ns, 'tamanio': stat.st_size}
+
+
+def _leer_json(archivo):
+    try:
+        return json.loads(archivo.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _guardar(directorio, arrays, huella, datos=None):
+    """
+    Escribe los arrays y después la huella (cada archivo con tmp + rename): si
+    se corta a mitad de camino la huella no coincide y el índice se reconstruye.
+    `datos` (opcional) se guarda junto a la huella
+    """
+    directorio.mkdir(parents=True, exist_ok=True)
+    for nombre, array in arrays.items():
+        tmp = directorio / f'{nombre}.tmp.npy'
+        np.save(tmp, array)
+        os.replace(tmp, directorio / f'{nombre}.npy')
+    tmp = directorio / 'huella.tmp'
+    tmp.write_text(json.dumps({'huella': huella, 'datos': datos}), encoding='utf-8')
+    os.replace(tmp, directorio / 'huella.json')
+
+
+def _cargar(directorio, nombres, huella):
+    """
+    {nombre: array memory-mapped} (y 'datos') si el índice existe y su huella
+    coincide, sino None
+    """
+    guardado = _leer_json(directorio / 'huella.json')
+    if guardado is None or guardado.get('huella') != huella:
+        return None
+    try:
+        arrays = {nombre: np.load(directorio / f'{nombre}.npy', mmap_mode='r') for nombre in nombres}
+    except (OSError, ValueError):
+        return None
+    if len({len(array) for array in arrays.values()}) != 1:
+        return None
+    arrays['datos'] = guardado.get('datos')
+    return arrays
+
+
+def _posiciones(lineas_indice, lineas):
+    """Posición de cada línea en el índice y máscara de las que están"""
+    lineas = np.asarray(lineas, dtype=np.int64)
+    posiciones = np.searchsorted(lineas_indice, lineas)
+    posiciones = np.minimum(posiciones, max(len(lineas_indice) - 1, 0))
+    if len(lineas_indice) == 0:
+        return posiciones, np.zeros(len(lineas), dtype=bool)
+    return posiciones, lineas_indice[posiciones] == lineas
+
+
+# ==================== ÍNDICE DE EXCLUSIÓN ====================
+def _lineas_int64(archivo):
+    """Columna `linea` de un parquet como int64 (lo que no es un número válido se descarta)"""
+    lineas = esquemas.leer_parquet(archivo, esquemas.LINEAS_FILTRADAS)['linea']
+    return lineas.dropna().to_numpy(dtype=np.int64)
+
+
+def _combinar(lineas, marcas, nuevas, bit):
+    """Agrega `nuevas` con la marca `bit` a los arrays ordenados (lineas, marcas)"""
+    nuevas = np.unique(np.asarray(nuevas, dtype=np.int64))
+    posiciones, esta = _posiciones(lineas, nuevas)
+    marcas = np.array(marcas, dtype=np.uint8)
+    marcas[posiciones[esta]] |= bit
+    faltan = nuevas[~esta]
+    donde = np.searchsorted(lineas, faltan)
+    return (
+        np.insert(lineas, donde, faltan),
+        np.insert(marcas, donde, np.full(len(faltan), bit, dtype=np.uint8)),
+    )
+
+
+def _huella_exclusion(archivos):
+    return {fuente: huella_archivo(archivos[fuente]) for fuente in FUENTES_EXCLUSION}
+
+
+def construir_exclusion(directorio, archivos):
+    """
+    Reconstruye el índice de exclusión desde cero.
+    `archivos` = {fuente: parquet con columna `linea`} para cada fuente de FUENTES_EXCLUSION
+    """
+    huella = _huella_exclusion(archivos)
+    lineas = np.empty(0, dtype=np.int64)
+    marcas = np.empty(0, dtype=np.uint8)
+    for bit, fuente in enumerate(FUENTES_EXCLUSION):
+        lineas, marcas = _combinar(lineas, marcas, _lineas_int64(archivos[fuente]), 1 << bit)
+    _guardar(directorio, {'lineas': lineas, 'fuentes': marcas}, huella)
+    print(f"✓ Índice de exclusión reconstruido: {len(lineas)} líneas")
+
+
+def cargar_exclusion(directorio, archivos):
+    """Índice de exclusión memory-mapped; se reconstruye si falta o cambió alguna fuente"""
+    huella = _huella_exclusion(archivos)
+    indice = _cargar(directorio, ('lineas', 'fuentes'), huella)
+    if indice is None:
+        construir_exclusion(directorio, archivos)
+        indice = _cargar(directorio, ('lineas', 'fuentes'), huella)
+    return indice
+
+
+def agregar_a_exclusion(directorio, archivos, fuente, lineas, huella_anterior):
+    """
+    Agrega líneas nuevas de una fuente al índice existente (sin releer las
+    fuentes) y actualiza la huella de ese archivo. Se llama después de
+    reescribir el parquet de la fuente, con `huella_anterior` = su huella antes
+    de reescribirlo. Si el índice no existe o no estaba al día con esa versión
+    no hace nada: se reconstruye en la próxima consulta.
+    Devuelve la cantidad de líneas agregadas al índice.
+    """
+    huella = _huella_exclusion(archivos)
+    indice = _cargar(directorio, ('lineas', 'fuentes'), {**huella, fuente: huella_anterior})
+    if indice is None:
+        return 0
+    bit = 1 << FUENTES_EXCLUSION.index(fuente)
+    antes = len(indice['lineas'])
+    lineas, marcas = _combinar(indice['lineas'], indice['fuentes'], lineas, bit)
+    del indice  # liberar el mmap antes de reemplazar los archivos
+    _guardar(directorio, {'lineas': lineas, 'fuentes': marcas}, huella)
+    return len(lineas) - antes
+
+
+def consultar_exclusion(indice, lineas):
+    """
+    Cruza un lote de líneas (int64) contra el índice en una sola pasada.
+    Devuelve (máscara de líneas excluidas, {fuente: cantidad de líneas del lote en esa fuente})
+    """
+    posiciones, esta = _posiciones(indice['lineas'], lineas)
+    marcas = np.zeros(len(esta), dtype=np.uint8)
+    marcas[esta] = indice['fuentes'][posiciones[esta]]
+    conteos = {
+        fuente: int(np.count_nonzero(marcas & (1 << bit)))
+        for bit, fuente in enumerate(FUENTES_EXCLUSION)
+    }
+    return esta, conteos
+
+
+# ==================== ÍNDICE DE ESTADOS IRIS ====================
+# Código de las líneas que no están en el Iris-consolidado
+NO_ESTA = 0
+
+
+def construir_iris(directorio, consolidado):
+    """Reconstruye el índice de estados desde el Iris-consolidado (sin pasar por pandas)"""
+    huella = huella_consolidado(consolidado)
+    tabla = leer_tabla_consolidado(consolidado, esquemas.IRIS, columns=['linea', 'fecha', 'estado'])
+
+    lineas = tabla['linea'].to_numpy()
+    orden = np.argsort(lineas, kind='stable')
+    estado = pc.cast(tabla['estado'], 'string')
+    nombres = pc.unique(estado).drop_null().sort().to_pylist()
+    # Código = posición en `nombres` + 1; estado nulo = len(nombres) + 1
+    codigos = pc.fill_null(pc.index_in(estado, value_set=pa.array(nombres, pa.string())), len(nombres)).to_numpy() + 1
+    fechas = tabla['fecha'].to_numpy().astype('datetime64[D]')
+
+    _guardar(directorio, {
+        'lineas': lineas[orden],
+        'estados': codigos.astype(np.uint8)[orden],
+        'fechas': fechas[orden],
+    }, huella, {'estados': nombres})
+    print(f"✓ Índice de estados Iris reconstruido: {len(lineas)} líneas")
+
+
+def cargar_iris(directorio, consolidado):
+    """
+    Índice de estados memory-mapped; se reconstruye si cambió el consolidado.
+    Lanza FileNotFoundError si el Iris-consolidado no existe.
+    """
+    huella = huella_consolidado(consolidado)
+    if not huella:
+        raise FileNotFoundError(f"No existe el consolidado {consolidado}")
+    indice = _cargar(directorio, ('lineas', 'estados', 'fechas'), huella)
+    if indice is None:
+        construir_iris(directorio, consolidado)
+        indice = _cargar(directorio, ('lineas', 'estados', 'fechas'), huella)
+    return indice
+
+
+def codigo_estado(indice, nombre):
+    """Código de un estado (p. ej. 'Port Out'); -1 si ninguna línea lo tiene"""
+    nombres = indice['datos']['estados']
+    return nombres.index(nombre) + 1 if nombre in nombres else -1
+
+
+def etiquetas_estados(indice, sin_estado):
+    """Nombre de estado por código (para indexar con los códigos): NO_ESTA -> `sin_estado`, estado nulo -> None"""
+    return np.array([sin_estado] + indice['datos']['estados'] + [None], dtype=object)
+
+
+def consultar_estados(indice, lineas):
+    """
+    Estado Iris de un lote de líneas (int64) con una búsqueda binaria.
+    Devuelve (códigos uint8, NO_ESTA si la línea no está; fechas datetime64[D], NaT si no está)
+    """
+    posiciones, esta = _posiciones(indice['lineas'], lineas)
+    codigos = np.full(len(esta), NO_ESTA, dtype=np.uint8)
+    codigos[esta] = indice['estados'][posiciones[esta]]
+    fechas = np.full(len(esta), np.datetime64('NaT'), dtype='datetime64[D]')
+    fechas[esta] = indice['fechas'][posiciones[esta]]
+    return codigos, fechas
+
+
+# ==================== ÍNDICE DE CUIT ====================
+# DNI en forma canónica (como lo escribe str(int)): los demás nunca coinciden con el DNI del lote
+_DNI_CANONICO = r'^[1-9]\d{0,17}$'
+
+
+def construir_cuit(directorio, archivo):
+    """Reconstruye el índice de CUIT desde base_cuit.csv (columnas DNI, CUIT)"""
+    huella = huella_archivo(archivo)
+    df_cuit = pd.read_csv(archivo, delimiter=",", encoding="utf-8", dtype=str, usecols=['DNI', 'CUIT'])
+
+    # El cruce es por igualdad de texto: solo pueden coincidir los DNI canónicos
+    df_cuit = df_cuit[df_cuit['DNI'].str.fullmatch(_DNI_CANONICO, na=False)]
+    dnis = df_cuit['DNI'].to_numpy().astype(np.int64)
+    cuits = df_cuit['CUIT'].fillna('').str.replace(r'\.0$', '', regex=True).str.strip()
+    # Orden estable: los CUIT de un mismo DNI quedan en el orden del CSV (igual que el merge)
+    orden = np.argsort(dnis, kind='stable')
+
+    _guardar(directorio, {
+        'dnis': dnis[orden],
+        'cuits': np.char.encode(np.array(cuits.tolist(), dtype=str), 'utf-8')[orden],
+        'con_cuit': df_cuit['CUIT'].notna().to_numpy()[orden],
+    }, huella)
+    print(f"✓ Índice de CUIT reconstruido: {len(dnis)} DNI")
+
+
+def cargar_cuit(directorio, archivo):
+    """Índice de CUIT memory-mapped; se reconstruye si cambió base_cuit.csv"""
+    huella = huella_archivo(archivo)
+    indice = _cargar(directorio, ('dnis', 'cuits', 'con_cuit'), huella)
+    if indice is None:
+        construir_cuit(directorio, archivo)
+        indice = _cargar(directorio, ('dnis', 'cuits', 'con_cuit'), huella)
+    return indice
+
+
+def consultar_cuit(indice, dnis):
+    """
+    Cruce de un lote de DNI (texto) contra el índice, con el resultado de un
+    merge left: un DNI con k CUIT da k filas, en el orden del lote.
+    Devuelve (posición en el lote de cada fila resultante, CUIT como texto ('' si
+    no hay), máscara de las filas con CUIT)
+    """
+    dnis = pd.Series(dnis, dtype=object)
+    canonicos = dnis.str.fullmatch(_DNI_CANONICO, na=False).to_numpy(dtype=bool)
+    claves = np.zeros(len(dnis), dtype=np.int64)
+    claves[canonicos] = dnis[canonicos].to_numpy().astype(np.int64)
+
+    desde = np.searchsorted(indice['dnis'], claves, side='left')
+    hasta = np.searchsorted(indice['dnis'], claves, side='right')
+    cantidades = np.where(canonicos, hasta - desde, 0)
+
+    # Cada DNI del lote ocupa max(k, 1) filas; la j-ésima toma el CUIT desde + j
+    repeticiones = np.maximum(cantidades, 1)
+    filas = np.repeat(np.arange(len(dnis)), repeticiones)
+    inicio_fila = np.repeat(np.cumsum(repeticiones) - repeticiones, repeticiones)
+    posiciones = np.repeat(desde, repeticiones) + np.arange(len(filas)) - inicio_fila
+    encontrado = np.repeat(cantidades > 0, repeticiones)
+
+    cuits = np.full(len(filas), '', dtype=object)
+    con_cuit = np.zeros(len(filas), dtype=bool)
+    if encontrado.any():
+        cuits[encontrado] = np.char.decode(np.asarray(indice['cuits'][posiciones[encontrado]]), 'utf-8')
+        con_cuit[encontrado] = indice['con_cuit'][posiciones[encontrado]]
+    return filas, cuits, con_cuit
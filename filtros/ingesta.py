@@ -0,0 +1,214 @@
+"""
+Ingesta de los archivos crudos del script 1 (reportes CSV y estados Iris TXT).
+
+Cada archivo se parsea, limpia y deduplica por separado, en paralelo en un
+pool de procesos (un worker por núcleo). Los resultados se unen con un solo
+concat al final, en lugar de ir acumulando con `pd.concat` archivo por archivo.
+
+Las funciones `leer_*` no imprimen nada: devuelven (DataFrame, avisos) y el
+proceso principal muestra los avisos en el orden de los archivos.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from telefonos import normalizar_telefonos
+
+
+# ==================== FECHAS ====================
+def _fechas(texto, formato, patron):
+    """
+    Texto -> timestamp[s] con `formato`, nulo si no lo cumple. strptime desborda
+    los días que no existen (31/02 -> 03/03): `patron` extrae el día y el mes
+    escritos (grupos d y m) y se descartan las fechas en que no coinciden
+    """
+    partes = pc.extract_regex(texto, patron)
+    fecha = pc.strptime(texto, format=formato, unit='s', error_is_null=True)
+    coincide = pc.and_(
+        pc.equal(pc.day(fecha), pc.cast(pc.struct_field(partes, 'd'), pa.int64())),
+        pc.equal(pc.month(fecha), pc.cast(pc.struct_field(partes, 'm'), pa.int64())),
+    )
+    return pc.if_else(pc.fill_null(coincide, False), fecha, pa.scalar(None, fecha.type))
+
+
+# ==================== REPORTES ====================
+VALID_TIPIFICATIONS = {
+    "Cliente moroso (Supera umbral)",
+    "Edificio sin Disp de Caja",
+    "Venta",
+    "Ya tiene MVS"
+}
+VALID_CAUSA_TERMINACION = {
+    "Se discó un número que no corresponde a un abonado en servicio",
+    "La Linea se encuentra en reparación"
+}
+
+
+COLUMNAS_REPORTE = ["Inicio", "Cliente", "Tipificación", "Causa Terminación"]
+
+
+_FORMATO_INICIO = '%d/%m/%Y %H:%M:%S'
+
+
+def _inicio_a_datetime(serie):
+    """Inicio 'dd/mm/aaaa hh:mm:ss' -> datetime64[s]; NaT si está vacío o no es una fecha válida"""
+    fechas = _fechas(pa.array(serie, type=pa.string(), from_pandas=True), _FORMATO_INICIO,
+                     r'^(?P<d>\d{1,2})/(?P<m>\d{1,2})/\d{4} ')
+    return pd.Series(fechas.to_numpy(zero_copy_only=False), index=serie.index, name=serie.name)
+
+
+def leer_reporte(file):
+    """
+    Reporte de llamadas -> registros [Cliente, Tipificacion, fecha, fecha_consulta].
+    Todo sobre columnas completas: primero se normaliza Cliente y después se
+    deduplica sobre el número normalizado ("011 15..." y "11..." son la misma
+    línea), quedándose con la llamada de Inicio más reciente.
+    """
+    df_temp = pd.read_csv(file, sep=';', encoding='utf-8', dtype=str, usecols=COLUMNAS_REPORTE, engine='pyarrow')
+
+    # LIMPIEZA DE DATOS (Reportes)
+    df_temp = df_temp[(df_temp['Tipificación'].isin(VALID_TIPIFICATIONS)) | (df_temp['Causa Terminación'].isin(VALID_CAUSA_TERMINACION))]
+
+    # Eliminar filas con Cliente nulo (normalizar_telefonos puede retornar nulo)
+    df_temp = df_temp.assign(Cliente=normalizar_telefonos(df_temp['Cliente'])).dropna(subset=['Cliente'])
+
+    # Una fila por línea normalizada: la de Inicio más reciente (si una línea
+    # solo tiene Inicio vacío queda su primera fila, con fecha nula)
+    df_temp['Inicio'] = _inicio_a_datetime(df_temp['Inicio'])
+    df_temp = (
+        df_temp.sort_values('Inicio', ascending=False, kind='stable', na_position='last')
+        .drop_duplicates(subset='Cliente', keep='first')
+    )
+
+    # 'No Disp.' se reemplaza por la causa de terminación
+    df_temp['Tipificacion'] = df_temp['Tipificación'].where(
+        df_temp['Tipificación'] != 'No Disp.', df_temp['Causa Terminación']
+    )
+    df_temp['fecha'] = df_temp['Inicio'].dt.date
+    df_temp['fecha_consulta'] = datetime.today().date()
+
+    # ✅ COLUMNAS A CONSERVAR
+    return df_temp[['Cliente', 'Tipificacion', 'fecha', 'fecha_consulta']].reset_index(drop=True), []
+
+
+# ==================== IRIS ====================
+COLUMNAS_IRIS = ['linea', 'fecha', 'estado']
+
+# Tamaño de cada bloque leído del TXT: la memoria no depende del tamaño del export
+BLOQUE_IRIS = 16 << 20
+
+
+def _fechas_iris(texto):
+    """dd/mm/aaaa -> timestamp; nulo si no tiene ese formato o no es una fecha real (31/02)"""
+    return _fechas(texto, '%d/%m/%Y', r'^(?P<d>\d{1,2})/(?P<m>\d{1,2})/\d{4}$')
+
+
+def _ultimo_por_linea(tabla):
+    """Un registro por línea: el de fecha más reciente (ante empate, el primero en el archivo)"""
+    tabla = tabla.sort_by([('fecha', 'descending')])
+    ultimos = tabla.group_by('linea', use_threads=False).aggregate([('fecha', 'first'), ('estado', 'first')])
+    return ultimos.rename_columns(COLUMNAS_IRIS)
+
+
+def leer_iris(file):
+    """
+    Export de Iris (linea&fecha&estado) -> registros [linea, fecha, estado, fecha_consulta].
+    Se lee en bloques con el lector CSV de pyarrow; cada bloque se valida con
+    operaciones vectorizadas y se reduce por su cuenta al último estado por
+    línea. Los resultados de los bloques se unen con una sola reducción al final.
+    """
+    avisos = []
+    invalidas = 0
+
+    def descartar(fila):
+        nonlocal invalidas
+        invalidas += 1
+        return 'skip'
+
+    lector = pacsv.open_csv(
+        file,
+        read_options=pacsv.ReadOptions(column_names=COLUMNAS_IRIS, block_size=BLOQUE_IRIS, encoding='utf8'),
+        # Filas con otra cantidad de campos que 3 se descartan
+        parse_options=pacsv.ParseOptions(delimiter='&', invalid_row_handler=descartar),
+        convert_options=pacsv.ConvertOptions(
+            column_types={columna: pa.string() for columna in COLUMNAS_IRIS},
+            strings_can_be_null=True,
+        ),
+    )
+
+    bloques = []
+    incompletas = 0
+    with lector:
+        for lote in lector:
+            # Los 3 campos presentes (no vacíos)
+            completas = pc.and_(pc.and_(pc.is_valid(lote['linea']), pc.is_valid(lote['fecha'])), pc.is_valid(lote['estado']))
+            incompletas += lote.num_rows - pc.sum(completas).as_py() if lote.num_rows else 0
+
+            fecha = _fechas_iris(lote['fecha'])
+            validas = pc.and_(
+                pc.and_(completas, pc.is_valid(fecha)),
+                pc.fill_null(pc.match_substring_regex(lote['linea'], r'^\d+$'), False),
+            )
+            tabla = pa.table({'linea': lote['linea'], 'fecha': fecha, 'estado': lote['estado']}).filter(validas)
+            bloques.append(_ultimo_por_linea(tabla))
+
+    # Si no quedan filas válidas, el archivo no se marca como procesado
+    if incompletas + invalidas > 0:
+        avisos.append(f"⚠ Se descartaron {incompletas + invalidas} filas corruptas/incompletas")
+    # Los bloques quedan en el orden del archivo: ante empate sigue ganando el primero
+    ultimos = _ultimo_por_linea(pa.concat_tables(bloques)) if bloques else None
+    if ultimos is None or len(ultimos) == 0:
+        return None, avisos + ["✗ No se encontraron filas válidas con 3 columnas"]
+
+    df_temp = ultimos.to_pandas()
+    df_temp['fecha_consulta'] = datetime.today().date()
+    return df_temp, avisos
+
+
+# ==================== POOL ====================
+def _procesar(funcion, file):
+    """Corre en el worker: los errores vuelven como aviso en lugar de cortar el pool"""
+    try:
+        df, avisos = funcion(file)
+        return df, avisos, None
+    except Exception as e:
+        return None, [], str(e)
+
+
+def procesar_archivos(funcion, files, max_workers=None):
+    """
+    Aplica `funcion` (leer_reporte / leer_iris) a cada archivo en un pool de
+    procesos e imprime el resultado de cada uno en orden.
+    Devuelve (DataFrame unido, archivos procesados correctamente).
+    """
+    workers = min(len(files), max_workers or os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            resultados = list(pool.map(_procesar, [funcion] * len(files), files))
+    else:
+        resultados = [_procesar(funcion, file) for file in files]
+
+    partes = []
+    procesados = []
+    for file, (df, avisos, error) in zip(files, resultados):
+        print(f"\n→ Procesando: {file.name}")
+        for aviso in avisos:
+            print(f"  {aviso}")
+        if error is not None:
+            print(f"  ✗ Error procesando {file.name}: {error}")
+            continue
+        if df is None:
+            continue
+        print(f"  Registros válidos extraídos: {len(df)}")
+        partes.append(df)
+        procesados.append(file)
+
+    # Un solo concat con todos los archivos
+    partes = [df for df in partes if not df.empty]
+    df_all = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+    return df_all, procesados
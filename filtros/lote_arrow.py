@@ -0,0 +1,149 @@
+"""
+Motor arrow del script 2: las reglas diarias como un único plan de Acero.
+
+Con `--motor arrow` la base elegible no pasa por pandas hasta el final: sobre
+la tabla Arrow del snapshot se arma un plan
+
+    base elegible -> filtro (reglas de columna) -> anti-join exclusiones
+                  -> anti-join llamadas de ayer [-> join Iris -> filtro estado]
+
+que Acero ejecuta en un solo paso y con varios hilos. Las reglas son las
+mismas de reglas.py (REGLAS_DIARIAS o data/reglas.json); cada tipo se traduce
+a una expresión de filtro o a un join:
+
+    antiguedad / rango / valores / no_nulo   -> filtro sobre la columna
+    excluir                                  -> anti-join con la tabla de `contexto`
+    estado                                   -> outer join con la tabla de `contexto` + filtro
+
+Las tablas de contexto tienen como primera columna la clave del join (con el
+mismo nombre que en la base: `linea_num` o `linea`). Las reglas inactivas no
+se agregan al plan: este motor no calcula la atribución por regla (para eso
+está el motor pandas).
+
+El resultado es el mismo DataFrame que devuelve el motor pandas (mismas
+filas, orden, índice y tipos); `python filtros/2_Filtro-seleccion-de-lote.py
+--paridad` corre los dos y compara el base.csv que escribe cada uno.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.acero as acero
+import pyarrow.compute as pc
+
+
+# Columnas auxiliares del plan
+_FILA = '__fila'
+_CLAVE = '__clave'
+_VALOR = '__valor'
+_ESTA = '__esta'
+
+
+# ==================== REGLAS -> EXPRESIONES ====================
+def _antiguedad(regla, esquema):
+    fecha_limite = datetime.now() - timedelta(days=regla['dias'])
+    return pc.field(regla['columna']) < pa.scalar(fecha_limite, esquema.field(regla['columna']).type)
+
+
+def _rango(regla, esquema):
+    campo = pc.field(regla['columna'])
+    return (campo >= regla['minimo']) & (campo <= regla['maximo'])
+
+
+def _valores(regla, esquema):
+    return pc.field(regla['columna']).isin(regla['valores'])
+
+
+def _no_nulo(regla, esquema):
+    return pc.field(regla['columna']).is_valid()
+
+
+_EXPRESIONES = {
+    'antiguedad': _antiguedad,
+    'rango': _rango,
+    'valores': _valores,
+    'no_nulo': _no_nulo,
+}
+
+
+# ==================== PLAN ====================
+def _fuente(tabla):
+    return acero.Declaration('table_source', acero.TableSourceNodeOptions(tabla))
+
+
+def _anti_join(plan, esquema, contexto):
+    clave = contexto.column_names[0]
+    # Las claves del join tienen que tener el mismo tipo (p. ej. string / large_string)
+    exclusiones = contexto.select([clave]).rename_columns([_CLAVE]).cast(pa.schema([(_CLAVE, esquema.field(clave).type)]))
+    # Acero arma la tabla hash con la entrada derecha: va la base (ya filtrada, la más chica)
+    # y las exclusiones solo se recorren. 'right anti' = filas de la base sin match
+    return acero.Declaration(
+        'hashjoin', acero.HashJoinNodeOptions('right anti', [_CLAVE], [clave]),
+        inputs=[_fuente(exclusiones), plan],
+    )
+
+
+def _filtro_estado(plan, esquema, columnas, contexto, regla, ausente):
+    """Join con (clave, estado) que conserva toda la base; las filas sin match toman el valor `ausente`"""
+    clave, estado = contexto.column_names[:2]
+    estados = pa.table({
+        _CLAVE: contexto[clave].cast(esquema.field(clave).type),
+        _VALOR: contexto[estado].cast(pa.string()),
+        _ESTA: pa.array(np.ones(len(contexto), dtype=bool)),
+    })
+    # Igual que en el anti-join, la base queda como entrada derecha (lado de la tabla hash)
+    plan = acero.Declaration(
+        'hashjoin', acero.HashJoinNodeOptions('right outer', [_CLAVE], [clave], [_VALOR, _ESTA], columnas + [_FILA]),
+        inputs=[_fuente(estados), plan],
+    )
+    valor = pc.if_else(pc.field(_ESTA).is_valid(), pc.field(_VALOR), pa.scalar(ausente, pa.string()))
+    # Mismo criterio que Series.isin: un estado nulo solo pasa si None está en los permitidos
+    permitidos = [p for p in regla['permitidos'] if p is not None]
+    condicion = valor.isin(permitidos)
+    if None in regla['permitidos']:
+        condicion = condicion | valor.is_null()
+    plan = acero.Declaration('filter', acero.FilterNodeOptions(condicion), inputs=[plan])
+    return acero.Declaration(
+        'project', acero.ProjectNodeOptions([pc.field(c) for c in columnas + [_FILA]], columnas + [_FILA]),
+        inputs=[plan],
+    )
+
+
+def seleccionar(tabla, reglas, contexto, ausentes=None):
+    """
+    Aplica las reglas activas a la base elegible (tabla Arrow) en un solo plan.
+    `contexto`: {nombre: tabla Arrow} para las reglas excluir / estado;
+    `ausentes`: valor de estado para las filas sin match ({nombre: valor}).
+    Devuelve un DataFrame igual al del motor pandas
+    """
+    ausentes = ausentes or {}
+    columnas = tabla.column_names
+    tabla = tabla.append_column(_FILA, pa.array(np.arange(len(tabla), dtype=np.int64)))
+    plan = _fuente(tabla)
+
+    # Reglas de columna: un solo nodo de filtro al principio (reduce lo que entra a los joins)
+    activas = [regla for regla in reglas if regla.get('activa', True)]
+    expresiones = []
+    for regla in activas:
+        if regla['tipo'] in _EXPRESIONES:
+            expresiones.append(_EXPRESIONES[regla['tipo']](regla, tabla.schema))
+        elif regla['tipo'] not in ('excluir', 'estado'):
+            raise ValueError(f"La regla '{regla['nombre']}' ({regla['tipo']}) no está soportada por el motor arrow")
+    if expresiones:
+        condicion = expresiones[0]
+        for expresion in expresiones[1:]:
+            condicion = condicion & expresion
+        plan = acero.Declaration('filter', acero.FilterNodeOptions(condicion), inputs=[plan])
+
+    for regla in activas:
+        if regla['tipo'] == 'excluir':
+            plan = _anti_join(plan, tabla.schema, contexto[regla['contexto']])
+        elif regla['tipo'] == 'estado':
+            plan = _filtro_estado(plan, tabla.schema, columnas, contexto[regla['contexto']], regla,
+                                  ausentes.get(regla['contexto']))
+
+    # Los joins no conservan el orden: se vuelve al orden (e índice) de la base elegible
+    resultado = plan.to_table(use_threads=True).sort_by(_FILA)
+    df = resultado.select(columnas).to_pandas()
+    df.index = resultado[_FILA].to_numpy()
+    return df
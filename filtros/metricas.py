@@ -0,0 +1,277 @@
+"""
+Métricas de cada corrida del pipeline (usado por pipeline.py y los scripts).
+
+Cada etapa y cada paso de filtrado se envuelve en `medir(nombre, filas)`, que
+registra tiempo de pared, tiempo de CPU (incluye los workers de la ingesta),
+RSS pico durante el paso, filas de entrada / salida y bytes leídos / escritos.
+Sin una corrida activa `medir` solo mide y no guarda nada, así que los
+scripts se pueden seguir corriendo sueltos.
+
+`corrida(directorio)` activa el registro y al terminar escribe un JSON por
+corrida en data/runs/ (corrida-AAAAMMDDTHHMMSSffffff.json):
+
+    {'inicio': ..., 'estado': 'ok' | 'error', 'pasos': [
+        {'nombre', 'nivel', 'wall_s', 'cpu_s', 'rss_pico_mb',
+         'filas_entrada', 'filas_salida', 'bytes_leidos', 'bytes_escritos'}, ...]}
+
+Los pasos quedan en orden de inicio; `nivel` indica el anidamiento (0 = total).
+
+`rss_pico_mb` es el pico de ese paso, no el de toda la vida del proceso (en
+el bot, que corre el pipeline varias veces en el mismo proceso, todos los
+pasos mostrarían el de la corrida más pesada). En Linux se reinicia el pico
+del proceso al empezar cada paso (/proc/self/clear_refs) y el de los pasos
+que lo contienen se lleva a mano. Donde no se puede reiniciar (macOS,
+Windows) el pico de vida solo se atribuye al paso si subió durante el paso;
+si no, `rss_pico_mb` queda en None. El de los workers de la ingesta (hijos)
+se cuenta en el paso durante el que subió.
+
+`corrida(directorio, al_avanzar=f)` además avisa el inicio y el fin de cada
+paso con `f(evento, paso)` ('inicio' / 'fin', copia del dict del paso): el
+bot lo usa para informar el avance mientras corre el pipeline.
+"""
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+
+MB = 1024 * 1024
+
+
+# ==================== CONTADORES DEL PROCESO ====================
+def _contadores_posix():
+    import resource
+    # En Linux ru_maxrss del proceso vuelve al RSS actual con _reiniciar_pico
+    propio = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hijos = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    escala = 1 if sys.platform == 'darwin' else 1024
+    leidos = escritos = None
+    try:
+        with open('/proc/self/io', encoding='ascii') as f:
+            io = dict(linea.split(': ') for linea in f.read().splitlines())
+        leidos, escritos = int(io['rchar']), int(io['wchar'])
+    except (OSError, KeyError, ValueError):
+        pass
+    return propio * escala, hijos * escala, leidos, escritos
+
+
+def _contadores_windows():
+    import ctypes
+    from ctypes import wintypes
+
+    class MEMORIA(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+            (nombre, ctypes.c_size_t) for nombre in (
+                'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage', 'QuotaPagedPoolUsage',
+                'QuotaPeakNonPagedPoolUsage', 'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage',
+            )
+        ]
+
+    class IO(ctypes.Structure):
+        _fields_ = [(nombre, ctypes.c_ulonglong) for nombre in (
+            'ReadOperationCount', 'WriteOperationCount', 'OtherOperationCount',
+            'ReadTransferCount', 'WriteTransferCount', 'OtherTransferCount',
+        )]
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    proceso = kernel32.GetCurrentProcess()
+    memoria = MEMORIA(cb=ctypes.sizeof(MEMORIA))
+    io = IO()
+    pico = memoria.PeakWorkingSetSize if ctypes.windll.psapi.GetProcessMemoryInfo(
+        proceso, ctypes.byref(memoria), memoria.cb) else None
+    if kernel32.GetProcessIoCounters(proceso, ctypes.byref(io)):
+        return pico, None, io.ReadTransferCount, io.WriteTransferCount
+    return pico, None, None, None
+
+
+def _contadores():
+    """
+    (RSS pico del proceso, RSS pico de los hijos terminados, bytes leídos,
+    bytes escritos); None si no se puede medir
+    """
+    try:
+        return _contadores_windows() if os.name == 'nt' else _contadores_posix()
+    except (ImportError, OSError, AttributeError):
+        return None, None, None, None
+
+
+def _cpu():
+    """CPU del proceso + la de los hijos ya terminados (workers del pool de la ingesta)"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+# ==================== RSS PICO POR PASO ====================
+_reinicio = None  # si se puede reiniciar el pico del proceso (se prueba la primera vez)
+_picos = []  # pico hasta ahora de cada paso abierto, en bytes (solo con reinicio)
+
+
+def _reiniciar_pico():
+    """Lleva el pico de RSS del proceso (VmHWM, ru_maxrss) al RSS actual (Linux >= 4.0)"""
+    global _reinicio
+    if _reinicio is not False:
+        try:
+            with open('/proc/self/clear_refs', 'w', encoding='ascii') as f:
+                f.write('5')
+            _reinicio = True
+        except OSError:
+            _reinicio = False
+    return _reinicio
+
+
+def _iniciar_pico(propio):
+    """Empieza a medir el pico de un paso. `propio`: pico del proceso al empezar"""
+    if propio is None:
+        return False
+    # Lo que subió desde el último reinicio es de todos los pasos abiertos
+    _picos[:] = [max(pico, propio) for pico in _picos]
+    if not _reiniciar_pico():
+        return False
+    _picos.append(_contadores()[0])
+    return True
+
+
+def _terminar_pico(reiniciado, inicio, fin):
+    """
+    Pico de RSS del paso en bytes, o None si no se puede saber.
+    `inicio` / `fin`: (pico del proceso, pico de los hijos) al empezar y al terminar
+    """
+    (propio_inicio, hijos_inicio), (propio, hijos) = inicio, fin
+    if reiniciado:
+        pico = max(_picos.pop(), propio)
+        if _picos:
+            _picos[-1] = max(_picos[-1], pico)
+    else:
+        # Sin reinicio el pico es de vida: es el del paso solo si subió durante el paso
+        pico = propio if propio is not None and propio_inicio is not None and propio > propio_inicio else None
+    if hijos is not None and hijos_inicio is not None and hijos > hijos_inicio:
+        pico = max(pico or 0, hijos)
+    return pico
+
+
+# ==================== PASOS ====================
+_activa = None   # reporte de la corrida en curso (dict) o None
+_al_avanzar = None  # observador de la corrida en curso (ver `corrida`)
+_nivel = 0
+
+
+def _avisar(evento, paso):
+    if _activa is not None and _al_avanzar is not None:
+        _al_avanzar(evento, dict(paso))
+
+
+def _contar(filas):
+    if filas is None or isinstance(filas, int):
+        return filas
+    return len(filas)
+
+
+class Paso(dict):
+    """Medición de un paso; `salida(df)` registra las filas que quedan"""
+
+    def salida(self, filas):
+        self['filas_salida'] = _contar(filas)
+
+
+@contextmanager
+def medir(nombre, filas=None):
+    """
+    Mide el bloque y lo agrega a la corrida activa (si hay).
+    `filas`: DataFrame / cantidad de filas de entrada
+    """
+    global _nivel
+    paso = Paso(nombre=nombre, nivel=_nivel, filas_entrada=_contar(filas), filas_salida=None)
+    if _activa is not None:
+        _activa['pasos'].append(paso)
+    _avisar('inicio', paso)
+    propio, hijos, leidos, escritos = _contadores()
+    reiniciado = _iniciar_pico(propio)
+    wall, cpu = time.perf_counter(), _cpu()
+    _nivel += 1
+    try:
+        yield paso
+    finally:
+        _nivel -= 1
+        propio_fin, hijos_fin, leidos_fin, escritos_fin = _contadores()
+        pico = _terminar_pico(reiniciado, (propio, hijos), (propio_fin, hijos_fin))
+        paso.update(
+            wall_s=round(time.perf_counter() - wall, 3),
+            cpu_s=round(_cpu() - cpu, 3),
+            rss_pico_mb=round(pico / MB, 1) if pico is not None else None,
+            bytes_leidos=leidos_fin - leidos if leidos is not None else None,
+            bytes_escritos=escritos_fin - escritos if escritos is not None else None,
+        )
+        _avisar('fin', paso)
+
+
+@contextmanager
+def corrida(directorio, nombre='pipeline', al_avanzar=None):
+    """
+    Activa el registro de métricas y escribe el reporte JSON al terminar (también si falla).
+    `al_avanzar(evento, paso)` se llama al iniciar y al terminar cada paso
+    """
+    global _activa, _al_avanzar
+    inicio = datetime.now()
+    _al_avanzar = al_avanzar
+    _activa = reporte = {'nombre': nombre, 'inicio': inicio.isoformat(timespec='seconds'), 'estado': 'ok', 'pasos': []}
+    try:
+        with medir('total'):
+            yield reporte
+    except BaseException as e:
+        reporte['estado'] = 'error'
+        reporte['error'] = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _activa = _al_avanzar = None
+        directorio.mkdir(parents=True, exist_ok=True)
+        archivo = directorio / f"corrida-{inicio.strftime('%Y%m%dT%H%M%S%f')}.json"
+        tmp = archivo.with_suffix('.tmp')
+        tmp.write_text(json.dumps(reporte, ensure_ascii=False, indent=1), encoding='utf-8')
+        os.replace(tmp, archivo)
+
+
+# ==================== RESUMEN ====================
+def ultimo_reporte(directorio):
+    """Reporte de la corrida más reciente de `directorio` (dict) o None"""
+    archivos = sorted(Path(directorio).glob('corrida-*.json'))
+    if not archivos:
+        return None
+    return json.loads(archivos[-1].read_text(encoding='utf-8'))
+
+
+def _filas(paso):
+    if paso.get('omitida'):
+        return "(omitida, sin cambios)"
+    entrada, salida = paso.get('filas_entrada'), paso.get('filas_salida')
+    if entrada is not None and salida is not None:
+        return f"{entrada} → {salida}"
+    if salida is not None:
+        return f"→ {salida}"
+    return ""
+
+
+def resumir(reporte, mas_lentos=5):
+    """Texto corto con el total, cada etapa y los pasos más lentos (para Telegram)"""
+    pasos = reporte['pasos']
+    total = pasos[0]
+    lineas = [
+        f"{reporte['inicio']}  {reporte['estado']}",
+        f"total {total['wall_s']:.1f}s  CPU {total['cpu_s']:.1f}s  RSS pico {total['rss_pico_mb'] or '?'} MB",
+        "",
+    ]
+    for paso in pasos[1:]:
+        if paso['nivel'] == 1:
+            lineas.append(f"{paso['nombre']:<28} {paso['wall_s']:>7.1f}s  {_filas(paso)}")
+    internos = sorted((p for p in pasos if p['nivel'] > 1), key=lambda p: p['wall_s'], reverse=True)
+    if internos:
+        lineas += ["", "Pasos más lentos:"]
+        for paso in internos[:mas_lentos]:
+            lineas.append(f"{paso['nombre']:<28} {paso['wall_s']:>7.1f}s  {_filas(paso)}")
+    if reporte.get('error'):
+        lineas += ["", reporte['error']]
+    return "\n".join(lineas)
@@ -0,0 +1,162 @@
+"""
+Corre las 3 etapas del pipeline en un solo proceso.
+
+El lote que selecciona el script 2 pasa en memoria al script 3 (sin escribir y
+releer data/bases/base.csv) y pandas / pyarrow se importan una sola vez en
+lugar de una por script. Los archivos persistentes (consolidados, índices,
+lineas_filtradas_150) se siguen actualizando igual que al correr cada script.
+
+Cada etapa se omite si sus entradas no cambiaron desde la última corrida
+(ver checkpoints.py): sin archivos crudos nuevos y con la misma base, correr
+el pipeline dos veces en el día reutiliza el lote y la base final.
+
+Cada corrida deja un reporte de métricas por etapa y por paso en data/runs/
+(ver metricas.py).
+
+    python filtros/pipeline.py                # base final, sin intermedios
+    python filtros/pipeline.py --checkpoint   # además escribe data/bases/base.csv
+    python filtros/pipeline.py --forzar       # corre todas las etapas aunque no haya cambios
+    python filtros/pipeline.py --motor arrow  # etapa 2 como un solo plan de Acero (ver lote_arrow.py)
+    python filtros/pipeline.py --comprimir gzip  # base final como .csv.gz (o zip, ver salida.py)
+    python filtros/pipeline.py --semilla 1234    # repite el muestreo / turnos de una corrida anterior
+
+Los scripts siguen pudiendo correrse por separado como antes.
+"""
+import argparse
+import importlib
+from datetime import date
+from pathlib import Path
+
+from catalogo import DATA_PROCESSED, DATA_ROOT
+from checkpoints import etapa_vigente, guardar_df, huella, leer_df, registrar_etapa
+from indices import huella_archivo
+from metricas import corrida, medir, resumir
+from salida import COMPRESIONES, escribir_csv
+
+
+# Los nombres de los scripts no son identificadores válidos: se importan por nombre de módulo
+etapa1 = importlib.import_module('1_generar-archivos-filtrado')
+etapa2 = importlib.import_module('2_Filtro-seleccion-de-lote')
+etapa3 = importlib.import_module('3_Formato-base')
+
+CHECKPOINTS = DATA_PROCESSED / 'checkpoints'
+LOTE = CHECKPOINTS / 'lote.parquet'
+RUNS = DATA_ROOT / 'runs'  # un reporte de métricas JSON por corrida (ver metricas.py)
+
+
+# ==================== ENTRADAS POR ETAPA ====================
+def _codigo():
+    """Huella de los módulos del pipeline: un cambio de código invalida el caché"""
+    return {archivo.name: huella_archivo(archivo) for archivo in sorted(Path(__file__).parent.glob('*.py'))}
+
+
+def _entradas_ingesta():
+    pendientes = (
+        etapa1.get_unprocessed_files(etapa1.REPORTES_DIR, '.csv')
+        + etapa1.get_unprocessed_files(etapa1.IRIS_DIR, '.txt')
+    )
+    return {
+        'codigo': _codigo(),
+        'pendientes': {archivo.name: huella_archivo(archivo) for archivo in sorted(pendientes)},
+        'tipificaciones': huella(etapa1.TIPIFICACIONES_OUTPUT),
+        'iris': huella(etapa1.IRIS_OUTPUT),
+        'lineas_filtradas': huella(etapa1.LINEAS_FILTRADAS_150),
+    }
+
+
+def _entradas_lote():
+    return {
+        'codigo': _codigo(),
+        'fecha': date.today().isoformat(),  # corte de 30 días y reporte de ayer
+        'base': huella(etapa2.BASE_MAIN_DIR),
+        'no_llame': huella(etapa2.NO_LLAME_DIR),
+        'lineas_filtradas': huella(etapa2.LINEAS_FILTRADAS),
+        'iris': huella(etapa2.IRIS_CONSOLIDADO),
+        'reporte_dia_anterior': huella(etapa2.reporte_dia_anterior()),
+        'reglas': huella(etapa2.REGLAS),
+    }
+
+
+def _entradas_formato(entradas_lote, compresion, semilla):
+    return {
+        'codigo': _codigo(),
+        'fecha': date.today().isoformat(),
+        'lote': entradas_lote,
+        'cuit': huella(etapa3.CUIT_FILE),
+        'compresion': compresion,
+        'semilla': semilla,
+    }
+
+
+# ==================== RUNNER ====================
+def ejecutar(checkpoint=False, forzar=False, motor='pandas', compresion=None, semilla=None, al_avanzar=None):
+    """
+    Etapa 1 (ingesta) -> etapa 2 (lote) -> etapa 3 (formato).
+    Con `checkpoint` se escribe también el intermedio base.csv; con `forzar`
+    se ignora el caché; `motor` elige el motor de la etapa 2 y `compresion`
+    (None, 'gzip' o 'zip') la de la base final; `semilla` fija el muestreo de la
+    etapa 3 (la de cada corrida queda en el reporte); `al_avanzar(evento, paso)`
+    recibe el inicio / fin de cada etapa y paso (ver metricas.py). Devuelve la ruta de la base final
+    """
+    with corrida(RUNS, al_avanzar=al_avanzar) as reporte:
+        # Etapa 1: las entradas se registran después de correr (la etapa reescribe sus propias salidas)
+        with medir('etapa 1: ingesta') as paso:
+            if not forzar and etapa_vigente(CHECKPOINTS, 'ingesta', _entradas_ingesta()) is not None:
+                paso['omitida'] = True
+                print("✓ Etapa 1 omitida: no hay archivos nuevos ni cambios en los consolidados")
+            else:
+                etapa1.main()
+                registrar_etapa(CHECKPOINTS, 'ingesta', _entradas_ingesta())
+
+        # Etapa 2
+        with medir('etapa 2: lote') as paso:
+            entradas = _entradas_lote()
+            salidas = None if forzar else etapa_vigente(CHECKPOINTS, 'lote', entradas)
+            if salidas is not None:
+                paso['omitida'] = True
+                df_lote = leer_df(salidas['lote'])
+                print(f"✓ Etapa 2 omitida: lote sin cambios ({df_lote.shape[0]} registros)")
+            else:
+                df_lote = etapa2.main(guardar_csv=False, motor=motor)
+                guardar_df(df_lote, LOTE)
+                registrar_etapa(CHECKPOINTS, 'lote', entradas, {'lote': LOTE})
+            if checkpoint:
+                escribir_csv(df_lote, etapa2.BASE_OUTPUT)
+            paso.salida(df_lote)
+
+        # Etapa 3
+        with medir('etapa 3: formato', df_lote) as paso:
+            entradas = _entradas_formato(entradas, compresion, semilla)
+            salidas = None if forzar else etapa_vigente(CHECKPOINTS, 'formato', entradas)
+            if salidas is not None:
+                paso['omitida'] = True
+                ruta = salidas['base_final']
+                print(f"✓ Etapa 3 omitida: base final vigente ({ruta.name})")
+            else:
+                ruta = etapa3.main(df_lote, compresion, semilla)
+                registrar_etapa(CHECKPOINTS, 'formato', entradas, {'base_final': ruta})
+
+    print("\n" + resumir(reporte))
+    return ruta
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline de filtrado en un solo proceso")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help="escribir también los archivos intermedios (data/bases/base.csv)")
+    parser.add_argument('--forzar', action='store_true',
+                        help="correr todas las etapas aunque sus entradas no hayan cambiado")
+    parser.add_argument('--motor', choices=['pandas', 'arrow'], default='pandas',
+                        help="motor de la etapa 2: pandas (con atribución por regla) o arrow (plan de Acero)")
+    parser.add_argument('--comprimir', choices=COMPRESIONES, default=None,
+                        help="comprimir la base final al escribirla (.csv.gz o .zip)")
+    parser.add_argument('--semilla', type=int, default=None,
+                        help="semilla del muestreo por DNI y de los turnos de la etapa 3 (para repetir una corrida)")
+    args = parser.parse_args()
+    ejecutar(checkpoint=args.checkpoint, forzar=args.forzar, motor=args.motor, compresion=args.comprimir,
+             semilla=args.semilla)
+
+
+if __name__ == '__main__':
+    # El guard es necesario para el pool de procesos de la ingesta (spawn en Windows)
+    main()
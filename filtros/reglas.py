@@ -0,0 +1,226 @@
+"""
+Motor de reglas del lote (usado por base_principal.py y el script 2).
+
+Cada regla es un dict con `nombre`, `tipo` y sus parámetros; los filtros del
+script 2 pasan a ser una lista de reglas en lugar de bloques de código.
+`aplicar` evalúa todas las reglas como máscaras booleanas sobre las columnas
+del DataFrame y filtra una sola vez (sin una copia intermedia por filtro).
+
+Tipos de regla:
+
+    rango            {'columna', 'minimo', 'maximo'}          minimo <= valor <= maximo
+    valores          {'columna', 'valores'}                   valor en la lista
+    no_nulo          {'columna'}                              valor presente / parseable
+    anio_segun       {'columna', 'fecha', 'anios'}            año de `fecha` permitido para el valor de `columna`
+                                                              (p. ej. {'Contrato CPP': [2023, 2024, 2025]})
+    antiguedad       {'columna', 'dias'}                      fecha anterior a hoy - `dias`
+    prefijo_o_menor  {'columna', 'prefijos', 'menor_a'}       número < menor_a o que empieza con un prefijo
+    excluir          {'contexto'}                             fila no marcada en contexto[...] (máscara)
+    estado           {'contexto', 'permitidos'}               contexto[...] (estado por fila) en permitidos
+
+Las reglas con `'activa': False` se evalúan y se cuentan, pero no filtran.
+
+Atribución: por cada regla, cuántas filas rechaza primero (en el orden de la
+lista, igual que los conteos de los filtros secuenciales) y cuántas rechaza
+en total (una fila puede fallar varias reglas).
+
+Las reglas se pueden sobrescribir sin tocar el código con un JSON
+(`cargar_reglas`): {'estaticas': [...], 'diarias': [...]}.
+"""
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from areas import digitos, empieza_con
+
+
+# ==================== EVALUADORES ====================
+# Cada uno devuelve la máscara (numpy bool) de las filas que CUMPLEN la regla
+def _numerico(serie):
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return serie
+    return pd.to_numeric(serie, errors='coerce')
+
+
+def _rango(df, regla, contexto):
+    return _numerico(df[regla['columna']]).between(regla['minimo'], regla['maximo']).to_numpy(dtype=bool)
+
+
+def _valores(df, regla, contexto):
+    return df[regla['columna']].isin(regla['valores']).to_numpy(dtype=bool)
+
+
+def _no_nulo(df, regla, contexto):
+    return df[regla['columna']].notna().to_numpy(dtype=bool)
+
+
+def _anio_segun(df, regla, contexto):
+    anios = df[regla['fecha']].dt.year
+    valores = df[regla['columna']]
+    mascara = np.zeros(len(df), dtype=bool)
+    for valor, permitidos in regla['anios'].items():
+        mascara |= ((valores == valor) & anios.isin(permitidos)).to_numpy(dtype=bool)
+    return mascara
+
+
+def _antiguedad(df, regla, contexto):
+    fecha_limite = datetime.now() - timedelta(days=regla['dias'])
+    return (df[regla['columna']] < fecha_limite).to_numpy(dtype=bool)
+
+
+def _prefijo_o_menor(df, regla, contexto):
+    numeros = _numerico(df[regla['columna']])
+    validos = numeros.notna().to_numpy()
+    enteros = numeros.fillna(0).to_numpy().astype(np.int64)
+    mascara = validos & (enteros < regla['menor_a'])
+    # Mismo resultado que str(numero).startswith(prefijo), comparando los primeros dígitos
+    cantidad_digitos = digitos(enteros)
+    for prefijo in regla['prefijos']:
+        mascara |= validos & empieza_con(enteros, prefijo, cantidad_digitos)
+    return mascara
+
+
+def _excluir(df, regla, contexto):
+    return ~np.asarray(contexto[regla['contexto']], dtype=bool)
+
+
+def _estado(df, regla, contexto):
+    return pd.Series(contexto[regla['contexto']]).isin(regla['permitidos']).to_numpy(dtype=bool)
+
+
+_EVALUADORES = {
+    'rango': _rango,
+    'valores': _valores,
+    'no_nulo': _no_nulo,
+    'anio_segun': _anio_segun,
+    'antiguedad': _antiguedad,
+    'prefijo_o_menor': _prefijo_o_menor,
+    'excluir': _excluir,
+    'estado': _estado,
+}
+
+
+# ==================== APLICACIÓN ====================
+def evaluar(df, reglas, contexto=None):
+    """
+    Máscara de las filas que cumplen todas las reglas activas y la atribución:
+    [{'nombre', 'activa', 'primera', 'total'}, ...] en el orden de `reglas`
+    """
+    contexto = contexto or {}
+    fallas = np.empty((len(reglas), len(df)), dtype=bool)
+    for i, regla in enumerate(reglas):
+        fallas[i] = ~_EVALUADORES[regla['tipo']](df, regla, contexto)
+
+    activas = np.array([regla.get('activa', True) for regla in reglas], dtype=bool)
+    fallas_activas = fallas[activas]
+    rechazadas = fallas_activas.any(axis=0)
+    primera_por_regla = np.zeros(len(reglas), dtype=np.int64)
+    if len(fallas_activas):
+        # Primera regla activa que rechaza cada fila (argmax devuelve el primer True)
+        primera = np.bincount(fallas_activas.argmax(axis=0)[rechazadas], minlength=len(fallas_activas))
+        primera_por_regla[activas] = primera
+
+    atribucion = [
+        {'nombre': regla['nombre'], 'activa': bool(activa), 'primera': int(p), 'total': int(t)}
+        for regla, activa, p, t in zip(reglas, activas, primera_por_regla, fallas.sum(axis=1))
+    ]
+    return ~rechazadas, atribucion
+
+
+def aplicar(df, reglas, contexto=None):
+    """Filtra `df` con todas las reglas en una sola pasada. Devuelve (df filtrado, atribución)"""
+    mascara, atribucion = evaluar(df, reglas, contexto)
+    return df[mascara], atribucion
+
+
+def imprimir_atribucion(atribucion, filas_entrada):
+    """Conteos por regla, con el mismo formato que los filtros secuenciales"""
+    restantes = filas_entrada
+    for regla in atribucion:
+        if not regla['activa']:
+            print(f"\n=== {regla['nombre'].upper()} (informativa, no se aplica) ===")
+            print(f"Registros que no la cumplen: {regla['total']}")
+            continue
+        restantes -= regla['primera']
+        print(f"\n=== {regla['nombre'].upper()} ===")
+        print(f"Eliminados: {regla['primera']} (no la cumplen en total: {regla['total']})")
+        print(f"Registros restantes: {restantes}")
+
+
+# ==================== PREDICADOS PARA EL SCANNER ====================
+def _texto(campo):
+    return pc.utf8_trim_whitespace(ds.field(campo))
+
+
+def _predicado_valores(regla, esquema):
+    return ds.field(regla['columna']).isin(regla['valores'])
+
+
+def _predicado_rango(regla, esquema):
+    campo, minimo, maximo = regla['columna'], regla['minimo'], regla['maximo']
+    tipo = esquema.field(campo).type
+    if pa.types.is_integer(tipo) or pa.types.is_floating(tipo):
+        return (ds.field(campo) >= minimo) & (ds.field(campo) <= maximo)
+    if not (0 <= minimo <= maximo <= 9):
+        return None
+    # Texto: solo se descartan enteros de un dígito fuera de rango (lo demás lo decide pandas)
+    valor = _texto(campo)
+    en_rango = pc.match_substring_regex(valor, rf'^0*[{minimo}-{maximo}]$')
+    return en_rango | ~pc.match_substring_regex(valor, r'^\d+$')
+
+
+def _predicado_anio_segun(regla, esquema):
+    campo = regla['fecha']
+    anios = sorted({anio for permitidos in regla['anios'].values() for anio in permitidos})
+    tipo = esquema.field(campo).type
+    if pa.types.is_timestamp(tipo) or pa.types.is_date(tipo):
+        por_anio = pc.year(ds.field(campo)).isin(anios)
+    else:
+        # Texto: solo se descartan fechas ISO (AAAA-...) de otro año
+        fecha = _texto(campo)
+        anio = pc.utf8_slice_codeunits(fecha, 0, 4)
+        por_anio = anio.isin([str(a) for a in anios]) | ~pc.match_substring_regex(fecha, r'^\d{4}-')
+    return ds.field(regla['columna']).isin(list(regla['anios'])) & por_anio
+
+
+_PREDICADOS = {
+    'valores': _predicado_valores,
+    'rango': _predicado_rango,
+    'anio_segun': _predicado_anio_segun,
+}
+
+
+def predicado(reglas, esquema):
+    """
+    Predicado de pyarrow.dataset con las reglas que se pueden evaluar al leer
+    (un superconjunto de las reglas: lo que no se puede decidir en el scanner
+    pasa y lo filtra `aplicar`); None si ninguna aplica
+    """
+    expresion = None
+    for regla in reglas:
+        constructor = _PREDICADOS.get(regla['tipo'])
+        if not regla.get('activa', True) or constructor is None or regla.get('columna') not in esquema.names:
+            continue
+        parte = constructor(regla, esquema)
+        if parte is not None:
+            expresion = parte if expresion is None else expresion & parte
+    return expresion
+
+
+# ==================== CONFIGURACIÓN ====================
+def cargar_reglas(archivo, seccion, por_defecto):
+    """Reglas de `seccion` ('estaticas' / 'diarias') del JSON `archivo`; si no está, `por_defecto`"""
+    try:
+        configuracion = json.loads(archivo.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return por_defecto
+    reglas = configuracion.get(seccion, por_defecto)
+    for regla in reglas:
+        if regla.get('tipo') not in _EVALUADORES:
+            raise ValueError(f"Regla '{regla.get('nombre')}' de {archivo.name}: tipo desconocido {regla.get('tipo')!r}")
+    return reglas
@@ -0,0 +1,164 @@
+"""
+Escritura por lotes de los CSV de salida (base.csv y BASE_FINAL).
+
+En lugar de un único `DataFrame.to_csv` (formateo fila por fila en Python y
+todo el texto en memoria), `escribir_csv` recorre la tabla en lotes de
+FILAS_POR_LOTE filas: cada columna se pasa a texto con pyarrow, las filas se
+arman con `binary_join_element_wise` y los bytes del lote se escriben
+directamente desde el buffer de Arrow. La memoria extra queda acotada a un
+lote, no a la base completa.
+
+El archivo es el mismo que genera `to_csv(sep=';', index=False)`: mismo
+encabezado, mismo formato de números, booleanos y fechas y las mismas comillas
+(solo en los valores con `;`, comillas o saltos de línea, y en la fila vacía de
+una tabla de una sola columna, que el módulo csv escribe como `""`).
+
+Opcionalmente se comprime al escribir (`compresion='gzip'` -> .csv.gz,
+`'zip'` -> .zip con el CSV adentro). Se escribe a un temporal en el mismo
+directorio y se renombra al terminar: nunca queda un archivo a medias con el
+nombre final.
+"""
+import gzip
+import os
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+FILAS_POR_LOTE = 200_000
+COMPRESIONES = ('gzip', 'zip')
+# Nivel de zlib: el 1 comprime ~7 veces más rápido que el 6 y el archivo queda ~10% más grande
+NIVEL_COMPRESION = 1
+_SUFIJOS = {None: '', 'gzip': '.gz', 'zip': '.zip'}
+
+# Valores que csv.QUOTE_MINIMAL (el default de to_csv) pone entre comillas
+_REQUIERE_COMILLAS = r'[;"\r\n]'
+
+
+def _texto(valor):
+    return pa.scalar(valor, pa.large_string())
+
+
+# ==================== FORMATO ====================
+def _comillas(textos):
+    """Agrega comillas (duplicando las internas) solo a los valores que las necesitan"""
+    necesita = pc.match_substring_regex(textos, _REQUIERE_COMILLAS)
+    if not pc.any(necesita).as_py():
+        return textos
+    citados = pc.binary_join_element_wise(_texto('"'), pc.replace_substring(textos, '"', '""'), _texto('"'), _texto(''))
+    return pc.if_else(necesita, citados, textos)
+
+
+def _formatos_fecha(df):
+    """
+    Formato de cada columna de fechas, decidido sobre la columna completa (no
+    por lote): to_csv omite la hora si todas las fechas son a medianoche
+    """
+    formatos = {}
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col].dtype):
+            fechas = df[col].dropna()
+            con_hora = (fechas != fechas.dt.normalize()).any()
+            formatos[col] = '%Y-%m-%d %H:%M:%S' if con_hora else '%Y-%m-%d'
+    return formatos
+
+
+def _texto_nativo(serie):
+    """Si Arrow pasa la columna a texto igual que to_csv (texto y enteros, no bool ni floats)"""
+    if serie.dtype == object:
+        return pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'empty')
+    return pd.api.types.is_string_dtype(serie.dtype) or pd.api.types.is_integer_dtype(serie.dtype)
+
+
+def _como_texto(serie, formato_fecha=None):
+    """Columna como texto Arrow con el formato de to_csv (nulos quedan nulos)"""
+    if formato_fecha is not None:
+        serie = serie.dt.strftime(formato_fecha)
+    elif isinstance(serie.dtype, pd.CategoricalDtype) and pd.api.types.is_string_dtype(serie.cat.categories):
+        # Categórico de texto (p. ej. BBDD): se decodifica el diccionario en Arrow
+        return pc.cast(pa.array(serie, from_pandas=True).dictionary_decode(), pa.large_string())
+    elif not _texto_nativo(serie):
+        # Floats, bool, mixtos: str() de cada valor como hace to_csv ('1.0', 'True', ...)
+        valores = serie.to_numpy(dtype=object)
+        presentes = pd.notna(valores)
+        texto = np.empty(len(valores), dtype=object)
+        texto[presentes] = valores[presentes].astype(str)
+        serie = pd.Series(texto, index=serie.index)
+    try:
+        arr = pa.array(serie, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = pa.array(serie.map(str, na_action='ignore'), type=pa.large_string(), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    return pc.cast(arr, pa.large_string())
+
+
+def _lineas(df, formatos_fecha):
+    """Bytes de las filas de `df` en CSV (cada una terminada en \\n)"""
+    columnas = [_comillas(_como_texto(df[col], formatos_fecha.get(col))) for col in df.columns]
+    if len(columnas) == 1:
+        # Una fila con un único campo vacío, to_csv la escribe como "" (no como línea vacía)
+        columna = pc.fill_null(columnas[0], _texto(''))
+        columnas = [pc.if_else(pc.equal(columna, _texto('')), _texto('""'), columna)]
+    lineas = pc.binary_join_element_wise(*columnas, _texto(''), _texto(';'),
+                                         null_handling='replace', null_replacement='')
+    # El separador quedó al final de cada fila en lugar del salto de línea: se reemplaza en el buffer
+    offsets = np.frombuffer(lineas.buffers()[1], dtype=np.int64)[lineas.offset:lineas.offset + len(lineas) + 1]
+    datos = np.frombuffer(lineas.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]].copy()
+    datos[offsets[1:] - offsets[0] - 1] = ord('\n')
+    return datos
+
+
+def _encabezado(columnas):
+    return (';'.join(f'"{c.replace(chr(34), chr(34) * 2)}"' if any(x in c for x in ';"\r\n') else c
+                     for c in map(str, columnas)) + '\n').encode('utf-8')
+
+
+# ==================== ESCRITURA ====================
+def ruta_final(destino, compresion=None):
+    """Nombre con que queda el archivo para `compresion` (.csv, .csv.gz o .zip)"""
+    destino = Path(destino)
+    if compresion == 'zip':
+        return destino.with_suffix('.zip')
+    return destino.with_name(destino.name + _SUFIJOS[compresion])
+
+
+@contextmanager
+def _abrir(tmp, nombre_csv, compresion, nivel):
+    if compresion is None:
+        with open(tmp, 'wb') as f:
+            yield f
+    elif compresion == 'gzip':
+        with gzip.open(tmp, 'wb', compresslevel=nivel) as f:
+            yield f
+    else:
+        with zipfile.ZipFile(tmp, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=nivel) as zf:
+            with zf.open(nombre_csv, 'w', force_zip64=True) as f:
+                yield f
+
+
+def escribir_csv(df, destino, compresion=None, filas_por_lote=FILAS_POR_LOTE, nivel=NIVEL_COMPRESION):
+    """
+    Escribe `df` como CSV separado por ';' (UTF-8, sin índice) por lotes.
+    `compresion`: None, 'gzip' o 'zip' (`nivel` de zlib). Devuelve la ruta del archivo escrito
+    """
+    if compresion not in _SUFIJOS:
+        raise ValueError(f"Compresión desconocida: {compresion!r} (opciones: {', '.join(COMPRESIONES)})")
+    final = ruta_final(destino, compresion)
+    tmp = final.with_name(final.name + '.tmp')
+    try:
+        formatos_fecha = _formatos_fecha(df)
+        with _abrir(tmp, Path(destino).name, compresion, nivel) as f:
+            f.write(_encabezado(df.columns))
+            for inicio in range(0, len(df), filas_por_lote):
+                f.write(_lineas(df.iloc[inicio:inicio + filas_por_lote], formatos_fecha))
+        os.replace(tmp, final)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return final
@@ -0,0 +1,341 @@
+"""
+Normalización vectorizada de números telefónicos argentinos.
+
+Reemplaza los `Series.apply(normalize_phone)` / `Series.apply(procesar_numero)`
+de los scripts 1 y 2 por operaciones sobre la columna completa: los strings se
+pasan a Arrow y se trabaja directamente sobre sus buffers (offsets + bytes) con
+numpy. Las reglas se deciden con un gather de pocos bytes por fila y el
+resultado se arma de nuevo como array Arrow, sin crear strings de Python.
+
+Las filas ASCII (prácticamente todas) se resuelven así; las filas nulas o con
+caracteres no ASCII se derivan a las funciones escalares de referencia para
+conservar exactamente la semántica de `str.isdigit` / `str.strip` de Python.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+# Bytes ASCII que Python considera espacio (str.isspace / \s en re)
+_ES_ESPACIO = np.zeros(256, dtype=bool)
+_ES_ESPACIO[[9, 10, 11, 12, 13, 28, 29, 30, 31, 32]] = True
+_ESPACIOS = bytes(np.flatnonzero(_ES_ESPACIO).astype(np.uint8)).decode('ascii')
+
+# Bytes que normalize_phone elimina: espacios, guiones y paréntesis.
+# Se usan con bytes.translate, que recorre el buffer completo en una sola pasada
+_SEPARADORES = bytes(np.flatnonzero(_ES_ESPACIO).astype(np.uint8)) + b'-()'
+_TABLA_SEPARADOR = bytes(1 if b in _SEPARADORES else 0 for b in range(256))
+
+_CERO, _NUEVE, _UNO, _CINCO = ord('0'), ord('9'), ord('1'), ord('5')
+
+# Bytes extra al final del buffer: la regla más lejana lee la posición 3 + 5
+_RELLENO = 16
+
+# Pares de dígitos como los lee un uint64 little-endian ('15' -> 0x3531)
+_DOS_BYTES = {par: int.from_bytes(par.encode('ascii'), 'little') for par in ('90', '11', '15')}
+
+
+# ==================== IMPLEMENTACIONES DE REFERENCIA (ESCALARES) ====================
+def normalize_phone(phone):
+    """
+    Normaliza números de teléfono argentinos eliminando 0, 90 y 15
+    para obtener números de 10 dígitos
+    """
+    if pd.isna(phone):
+        return None
+
+    phone_str = str(phone).strip()
+
+    # Eliminar espacios, guiones y paréntesis
+    phone_clean = re.sub(r'[\s\-\(\)]', '', phone_str)
+
+    # Solo procesar si contiene solo dígitos
+    if not phone_clean.isdigit():
+        return None
+
+    # Eliminar prefijo 0 o 90 al inicio
+    if phone_clean.startswith('90'):
+        phone_clean = phone_clean[2:]
+    elif phone_clean.startswith('0'):
+        phone_clean = phone_clean[1:]
+
+    # Eliminar 15 después del código de área (posiciones 2-4 típicamente)
+    if len(phone_clean) > 4:
+        # Códigos de área de 2 dígitos + 15
+        if phone_clean[2:4] == '15':
+            phone_clean = phone_clean[:2] + phone_clean[4:]
+        # Códigos de área de 3 dígitos + 15
+        elif len(phone_clean) > 5 and phone_clean[3:5] == '15':
+            phone_clean = phone_clean[:3] + phone_clean[5:]
+        # Códigos de área de 4 dígitos + 15
+        elif len(phone_clean) > 6 and phone_clean[4:6] == '15':
+            phone_clean = phone_clean[:4] + phone_clean[6:]
+
+    # Retornar solo si tiene exactamente 10 dígitos
+    if len(phone_clean) == 10:
+        return phone_clean
+
+    return None
+
+
+def procesar_numero(numero):
+    """Procesa un número telefónico según las reglas especificadas"""
+    if not isinstance(numero, str):
+        numero = str(numero)
+
+    numero = numero.strip()
+
+    if numero.startswith("0"):
+        numero = numero[1:]
+    if numero.startswith("90"):
+        numero = numero[2:]
+    if numero.startswith("11"):
+        if len(numero) > 3 and numero[2:4] == "15":  # Si "15" sigue a la característica
+            numero = "11" + numero[4:]
+    else:
+        # Procesar otras características (3 o 4 dígitos)
+        if len(numero) >= 5:
+            caracteristica = numero[:3]
+            if numero[3:5] == "15":  # Característica de 3 dígitos
+                numero = caracteristica + numero[5:]
+            elif len(numero) > 4 and numero[:4].isdigit() and numero[4:6] == "15":  # Característica de 4 dígitos
+                caracteristica = numero[:4]
+                numero = caracteristica + numero[6:]
+
+    return numero
+
+
+# ==================== BUFFERS ARROW ====================
+def _a_arrow(serie):
+    """Convierte una Series a un array Arrow de strings (nulos se conservan)"""
+    try:
+        arr = pa.array(serie, type=pa.large_string(), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Columnas mixtas (int/float/str): convertir valor por valor como hace str()
+        arr = pa.array(serie.map(str, na_action='ignore'), type=pa.large_string(), from_pandas=True)
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    return arr
+
+
+def _buffers(arr):
+    """Devuelve (offsets int64 desde 0, bytes uint8) de un array large_string"""
+    n = len(arr)
+    offsets = np.frombuffer(arr.buffers()[1], dtype=np.int64)[arr.offset:arr.offset + n + 1]
+    buf = arr.buffers()[2]
+    datos = np.frombuffer(buf, dtype=np.uint8) if buf is not None else np.zeros(0, dtype=np.uint8)
+    return offsets - offsets[0], datos[offsets[0]:offsets[-1]]
+
+
+def _filas_ascii(arr, datos):
+    """Máscara numpy de filas no nulas y ASCII (atajo si todo el buffer es ASCII)"""
+    if len(datos) == 0 or datos.max() < 128:
+        return arr.is_valid().to_numpy(zero_copy_only=False)
+    return pc.fill_null(pc.string_is_ascii(arr), False).to_numpy(zero_copy_only=False)
+
+
+def _con_relleno(datos):
+    """Agrega bytes 0 al final para poder leer unas posiciones más allá de la última fila"""
+    return np.concatenate([datos, np.zeros(_RELLENO, dtype=np.uint8)])
+
+
+def _palabras(datos):
+    """
+    Vista uint64 (little-endian, sin alinear) de los 8 bytes que empiezan en cada
+    posición de `datos`: un gather por fila trae 8 bytes en un solo entero
+    """
+    return np.ndarray((len(datos) - 7,), dtype='<u8', buffer=datos, strides=(1,))
+
+
+def _desde_buffers(largos, datos, validos):
+    """Arma un array large_string con filas de `largos` bytes consecutivos en `datos`"""
+    offsets = np.zeros(len(largos) + 1, dtype=np.int64)
+    np.cumsum(largos, out=offsets[1:])
+    return pa.Array.from_buffers(
+        pa.large_string(), len(largos),
+        [pa.py_buffer(np.packbits(validos, bitorder='little')), pa.py_buffer(offsets), pa.py_buffer(datos)],
+    )
+
+
+def _tramos(datos, offsets, inicios, validos):
+    """
+    Arma un array large_string cuya fila i es `datos[inicios[i]:offsets[i + 1]]`.
+    Los bytes descartados al comienzo de cada fila quedan como filas intermedias
+    de un array intercalado y un take de Arrow copia solo las filas buscadas
+    """
+    n = len(inicios)
+    intercalado = np.empty(2 * n + 1, dtype=np.int64)
+    intercalado[0::2] = offsets
+    intercalado[1::2] = inicios
+    validez = None
+    if not validos.all():
+        bits = np.ones(2 * n, dtype=bool)
+        bits[1::2] = validos
+        validez = pa.py_buffer(np.packbits(bits, bitorder='little'))
+    filas = pa.Array.from_buffers(
+        pa.large_string(), 2 * n, [validez, pa.py_buffer(intercalado), pa.py_buffer(datos)],
+    )
+    return filas.take(pa.array(np.arange(1, 2 * n, 2)))
+
+
+def _contar_por_fila(mask, offsets):
+    """Cantidad de bytes marcados en `mask` (uint8 0/1) dentro de cada fila"""
+    # Suma acumulada: la cuenta de cada fila es la diferencia entre sus extremos
+    acumulado = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    return np.diff(acumulado[offsets])
+
+
+def _es_digito(byte):
+    return (byte >= _CERO) & (byte <= _NUEVE)
+
+
+def _a_serie(array, serie_original, mask_fallback, funcion_escalar):
+    """
+    Devuelve el resultado como Series con el mismo índice que la original,
+    resolviendo las filas de `mask_fallback` con la función escalar de referencia
+    """
+    resultado = array.to_pandas()
+    resultado.index = serie_original.index
+    resultado.name = serie_original.name
+    if mask_fallback.any():
+        resultado = resultado.astype(object)
+        resultado[mask_fallback] = [
+            funcion_escalar(v) for v in serie_original.to_numpy(dtype=object)[mask_fallback]
+        ]
+    return resultado
+
+
+# ==================== NORMALIZACIÓN VECTORIZADA ====================
+def normalizar_telefonos(serie):
+    """
+    Versión vectorizada de `normalize_phone`: devuelve una Series con el número
+    normalizado de 10 dígitos o nulo cuando no es válido
+    """
+    arr = _a_arrow(serie)
+    offsets, datos = _buffers(arr)
+    es_ascii = _filas_ascii(arr, datos)
+    largos = np.diff(offsets)
+
+    # Eliminar espacios, guiones y paréntesis
+    crudo = datos.tobytes()
+    separador = np.frombuffer(crudo.translate(_TABLA_SEPARADOR), dtype=np.uint8)
+    if separador.any():
+        largos = largos - _contar_por_fila(separador, offsets)
+        datos = np.frombuffer(crudo.translate(None, _SEPARADORES), dtype=np.uint8)
+    inicios = np.zeros(len(largos), dtype=np.int64)
+    np.cumsum(largos[:-1], out=inicios[1:])
+
+    # Solo procesar si contiene solo dígitos
+    limpio = _desde_buffers(largos, datos, np.ones(len(largos), dtype=bool))
+    solo_digitos = pc.fill_null(pc.ascii_is_decimal(limpio), False).to_numpy(zero_copy_only=False)
+
+    datos_rellenos = _con_relleno(datos)
+
+    # Sin chequeo de bordes: leer fuera de la fila solo afecta filas cortas,
+    # que nunca llegan a 10 dígitos
+    def byte(p):
+        return datos_rellenos[inicios + p]
+
+    # Eliminar prefijo 0 o 90 al inicio
+    b0, b1 = byte(0), byte(1)
+    prefijo = np.where((b0 == _NUEVE) & (b1 == _CERO), 2, np.where(b0 == _CERO, 1, 0))
+    inicios = inicios + prefijo
+    largos = largos - prefijo
+
+    # Eliminar 15 después del código de área de 2, 3 o 4 dígitos (en ese orden)
+    def quince_en(p):
+        return (byte(p) == _UNO) & (byte(p + 1) == _CINCO)
+
+    corte_2 = (largos > 4) & quince_en(2)
+    corte_3 = ~corte_2 & (largos > 5) & quince_en(3)
+    corte_4 = ~corte_2 & ~corte_3 & (largos > 6) & quince_en(4)
+    corte = np.select([corte_2, corte_3, corte_4], [2, 3, 4], default=0)
+    largos = largos - 2 * (corte > 0)
+
+    # Retornar solo si tiene exactamente 10 dígitos
+    validos = es_ascii & solo_digitos & (largos == 10)
+
+    # Cada fila válida ocupa a lo sumo 12 bytes desde su inicio: se toma esa ventana
+    # y se eligen las 10 columnas que quedan según dónde estaba el 15
+    filas = np.flatnonzero(validos)
+    ventanas = np.lib.stride_tricks.sliding_window_view(datos_rellenos, 12)[inicios[filas]]
+    resultado = ventanas[:, :10].copy()
+    corte = corte[filas]
+    for posicion_15 in (2, 3, 4):
+        con_corte = np.flatnonzero(corte == posicion_15)
+        resultado[con_corte, posicion_15:] = ventanas[con_corte, posicion_15 + 2:]
+    resultado = _desde_buffers(np.where(validos, 10, 0), resultado.ravel(), validos)
+
+    # Filas no ASCII: usar la implementación escalar (semántica Unicode de Python)
+    mask_fallback = ~es_ascii & arr.is_valid().to_numpy(zero_copy_only=False)
+    return _a_serie(resultado, serie, mask_fallback, normalize_phone)
+
+
+def procesar_numeros(serie):
+    """
+    Versión vectorizada de `procesar_numero`: elimina 0/90 y el 15 posterior a la
+    característica, sin validar la longitud final
+    """
+    arr = _a_arrow(serie)
+    offsets, datos = _buffers(arr)
+    es_ascii = _filas_ascii(arr, datos)
+
+    # strip: todos los espacios ASCII son bytes < 33, si no hay ninguno no se recorta
+    if len(datos) and datos.min() <= 32:
+        offsets, datos = _buffers(pc.ascii_trim(arr, _ESPACIOS))
+    largos = np.diff(offsets)
+    filas = offsets[:-1]
+    palabras = _palabras(_con_relleno(datos))
+
+    # Sin chequeo de bordes: cada regla protege con el largo de la fila lo que lee
+    def bytes_en(palabra, p, n=1):
+        return (palabra >> np.uint64(8 * p)) & np.uint64((1 << 8 * n) - 1)
+
+    # Prefijo 0 y luego 90 (ambos pueden aplicar, en ese orden)
+    palabra = palabras[filas]
+    cero = (largos >= 1) & (bytes_en(palabra, 0) == _CERO)
+    noventa = np.where(cero, bytes_en(palabra, 1, 2), bytes_en(palabra, 0, 2)) == _DOS_BYTES['90']
+    inicio = cero + 2 * ((largos - cero >= 2) & noventa)
+    largo = largos - inicio
+
+    # Los 8 bytes desde el inicio ya sin prefijo alcanzan para todas las reglas
+    palabra = palabras[filas + inicio]
+
+    def quince_en(p):
+        return bytes_en(palabra, p, 2) == _DOS_BYTES['15']
+
+    empieza_11 = (largo >= 2) & (bytes_en(palabra, 0, 2) == _DOS_BYTES['11'])
+
+    # Los 4 primeros bytes son dígitos si todos tienen la forma 0x3N y sumando 6
+    # ninguno pasa de 0x3F (N <= 9)
+    cuatro = palabra & np.uint64(0xFFFFFFFF)
+    cuatro_digitos = (
+        ((cuatro & np.uint64(0xF0F0F0F0)) == 0x30303030)
+        & (((cuatro + np.uint64(0x06060606)) & np.uint64(0xF0F0F0F0)) == 0x30303030)
+    )
+
+    # Característica 11: solo el 15 inmediato; otras: 3 dígitos, o 4 dígitos numéricos
+    corte_2 = empieza_11 & (largo >= 4) & quince_en(2)
+    corte_3 = ~empieza_11 & (largo >= 5) & quince_en(3)
+    corte_4 = ~empieza_11 & ~corte_3 & (largo >= 6) & cuatro_digitos & quince_en(4)
+    hay_corte = (corte_2 | corte_3 | corte_4) & es_ascii
+
+    # El 15 se elimina corriendo dos bytes a la derecha la característica que lo
+    # precede: así cada resultado queda contiguo en el buffer, desde su nuevo inicio
+    # hasta el fin de la fila. Las filas no ASCII quedan vacías
+    if hay_corte.any():
+        filas_corte = np.flatnonzero(hay_corte)
+        desde = filas[filas_corte] + inicio[filas_corte]
+        caracteristica = np.where(corte_2, 2, np.where(corte_3, 3, 4))[filas_corte]
+        original, datos = datos, datos.copy()
+        for k in range(4):
+            mueve = caracteristica > k
+            datos[desde[mueve] + k + 2] = original[desde[mueve] + k]
+    inicio = np.where(es_ascii, filas + inicio + 2 * hay_corte, offsets[1:])
+    resultado = _tramos(datos, offsets, inicio, es_ascii)
+
+    # Nulos y filas no ASCII: implementación escalar (str(nan) == 'nan', etc.)
+    return _a_serie(resultado, serie, ~es_ascii, procesar_numero)
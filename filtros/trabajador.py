@@ -0,0 +1,214 @@
+"""
+Proceso de trabajo persistente del bot (pipeline "en caliente").
+
+En lugar de lanzar `python filtros/pipeline.py` en cada /start (arranque del
+intérprete, import de pandas / pyarrow y lectura en frío de la base en cada
+corrida), el bot mantiene un proceso hijo que importa el pipeline una sola vez
+y lo corre como llamada a función. Entre corridas ese proceso conserva:
+
+    - el snapshot de la base elegible y las demás tablas leídas por el
+      catálogo (caché LRU de catalogo.py, CACHE_MB)
+    - los índices memory-mapped de exclusión (lineas_filtradas_150 +
+      Registro_No_Llame), Iris y CUIT (indices.py); los arrays viven en el
+      page cache del sistema, no en el heap del proceso
+
+Nada se invalida a mano: cada entrada del caché y cada índice guarda la huella
+de su archivo de origen y se relee solo si ese archivo cambió. Si cambia el
+código de filtros/ el proceso se reinicia antes de la siguiente corrida, y si
+una corrida supera el timeout (o se cancela) el proceso se termina y el
+siguiente pedido arranca uno nuevo.
+
+    trabajador = Trabajador()
+    trabajador.iniciar()                      # arranca y precalienta en segundo plano
+    resultado = trabajador.ejecutar(timeout=1800, compresion='gzip')
+    trabajador.ejecutar(al_avanzar=f)         # f(evento, paso) por cada etapa / paso (ver metricas.py)
+    trabajador.cancelar()                     # desde otro hilo: corta la corrida en curso
+"""
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from pathlib import Path
+
+from indices import huella_archivo
+
+
+FILTROS_DIR = Path(__file__).parent
+# Límite del caché del catálogo en el proceso de trabajo (la base elegible de producción ocupa ~1 GB)
+CACHE_MB = float(os.environ.get('FILTROS_CACHE_MB') or 2048)
+# Espera para que el proceso termine solo antes de matarlo
+ESPERA_CIERRE = 10
+
+
+def _codigo():
+    """Huella de los módulos de filtros/: si cambia, el proceso se reinicia"""
+    return {archivo.name: huella_archivo(archivo) for archivo in sorted(FILTROS_DIR.glob('*.py'))}
+
+
+# ==================== PROCESO DE TRABAJO ====================
+def precalentar():
+    """
+    Carga lo que usan todas las corridas: el snapshot de la base elegible (al
+    caché del catálogo) y los índices, que se reconstruyen acá si están viejos
+    """
+    import catalogo
+    import pipeline
+    from indices import cargar_cuit, cargar_exclusion, cargar_iris
+
+    etapa2, etapa3 = pipeline.etapa2, pipeline.etapa3
+    pasos = {
+        'base elegible': (etapa2.BASE_ELEGIBLE, lambda: catalogo.tabla(etapa2.BASE_ELEGIBLE)),
+        'índice de exclusión': (etapa2.NO_LLAME_DIR, lambda: cargar_exclusion(etapa2.INDICE_EXCLUSION, {
+            'lineas_filtradas': etapa2.LINEAS_FILTRADAS,
+            'no_llame': etapa2.NO_LLAME_DIR,
+        })),
+        'índice Iris': (etapa2.IRIS_CONSOLIDADO, lambda: cargar_iris(etapa2.INDICE_IRIS, etapa2.IRIS_CONSOLIDADO)),
+        'índice CUIT': (etapa3.CUIT_FILE, lambda: cargar_cuit(etapa3.INDICE_CUIT, etapa3.CUIT_FILE)),
+    }
+    for nombre, (origen, cargar) in pasos.items():
+        if not origen.exists():
+            continue
+        try:
+            cargar()
+        except Exception as e:
+            # La corrida lo vuelve a intentar (y reporta el error por su lado)
+            print(f"⚠️ No se pudo precargar {nombre}: {e}")
+    print(f"✓ Proceso de trabajo listo (caché: {catalogo.estado_cache()['bytes'] / 2**20:.0f} MB)")
+
+
+def _bucle(conexion, cache_mb):
+    """
+    Importa el pipeline una vez y atiende pedidos (kwargs de pipeline.ejecutar)
+    hasta recibir None. Durante la corrida manda ('avance', evento, paso) y al
+    final ('ok', ruta, segundos) o ('error', traceback, segundos)
+    """
+    # Ctrl+C en la consola le llega también al hijo: el que decide cuándo cortar es el bot
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import catalogo
+    catalogo.configurar_cache(cache_mb)
+    import pipeline
+
+    def al_avanzar(evento, paso):
+        conexion.send(('avance', evento, paso))
+
+    inicio = time.perf_counter()
+    precalentar()
+    conexion.send(('listo', time.perf_counter() - inicio))
+
+    while True:
+        pedido = conexion.recv()
+        if pedido is None:
+            break
+        inicio = time.perf_counter()
+        try:
+            ruta = pipeline.ejecutar(**pedido, al_avanzar=al_avanzar)
+        except (Exception, SystemExit):
+            conexion.send(('error', traceback.format_exc(), time.perf_counter() - inicio))
+        else:
+            conexion.send(('ok', ruta, time.perf_counter() - inicio))
+
+
+# ==================== LADO DEL BOT ====================
+class Trabajador:
+    """Proceso de trabajo visto desde el bot: lo arranca, le pasa corridas y lo reinicia si hace falta"""
+
+    def __init__(self, cache_mb=CACHE_MB):
+        self.cache_mb = cache_mb
+        self.corridas = 0  # corridas atendidas por el proceso actual
+        self._proceso = None
+        self._conexion = None
+        self._codigo = None
+        self._listo = False
+
+    def vivo(self):
+        return self._proceso is not None and self._proceso.is_alive()
+
+    def iniciar(self):
+        """Arranca el proceso si no está vivo o si cambió el código; True si arrancó uno nuevo"""
+        codigo = _codigo()
+        if self.vivo() and codigo == self._codigo:
+            return False
+        if self.vivo():
+            print("🔄 Cambió el código de filtros/: reiniciando el proceso de trabajo")
+        self.detener()
+        # spawn también en Linux: el bot puede tener hilos (fork con hilos no es seguro)
+        contexto = multiprocessing.get_context('spawn')
+        self._conexion, hijo = contexto.Pipe()
+        self._proceso = contexto.Process(target=_bucle, args=(hijo, self.cache_mb), name='filtros-trabajador')
+        self._proceso.start()
+        hijo.close()
+        self._codigo = codigo
+        self._listo = False
+        self.corridas = 0
+        return True
+
+    def detener(self, forzar=False):
+        """Cierra el proceso: le pide que termine o, con `forzar` (cancelación / timeout), lo mata"""
+        proceso, conexion = self._proceso, self._conexion
+        self._proceso = self._conexion = None
+        if proceso is None:
+            return
+        if not forzar and proceso.is_alive() and self._listo:
+            try:
+                conexion.send(None)
+                proceso.join(ESPERA_CIERRE)
+            except (OSError, EOFError):
+                pass
+        if proceso.is_alive():
+            proceso.terminate()
+            proceso.join(ESPERA_CIERRE)
+            if proceso.is_alive():
+                proceso.kill()
+                proceso.join()
+        conexion.close()
+
+    def cancelar(self):
+        """
+        Mata el proceso en medio de una corrida (se puede llamar desde otro hilo):
+        `ejecutar` termina con RuntimeError y el próximo pedido arranca un proceso
+        nuevo. Las salidas se escriben a temporales + rename, así que no quedan a medias
+        """
+        proceso = self._proceso
+        if proceso is not None and proceso.is_alive():
+            proceso.terminate()
+
+    def _recibir(self, fin):
+        """Siguiente mensaje del proceso; TimeoutError / RuntimeError (y el proceso se descarta) si no llega"""
+        restante = None if fin is None else max(fin - time.monotonic(), 0)
+        try:
+            llego = self._conexion.poll(restante)
+            if llego:
+                return self._conexion.recv()
+        except (EOFError, OSError):
+            proceso = self._proceso
+            self.detener(forzar=True)
+            raise RuntimeError(
+                f"El proceso de trabajo terminó inesperadamente (código {proceso.exitcode})") from None
+        self.detener(forzar=True)
+        raise TimeoutError("La corrida superó el tiempo máximo")
+
+    def ejecutar(self, timeout=None, al_avanzar=None, **opciones):
+        """
+        Corre `pipeline.ejecutar(**opciones)` en el proceso de trabajo. Devuelve
+        {'ruta', 'segundos', 'caliente'}; si la corrida falla levanta RuntimeError
+        con el traceback del proceso. `al_avanzar(evento, paso)` se llama (en
+        este hilo) con el avance de cada etapa y paso
+        """
+        self.iniciar()
+        fin = None if timeout is None else time.monotonic() + timeout
+        if not self._listo:
+            self._recibir(fin)  # ('listo', segundos de precarga)
+            self._listo = True
+        caliente = self.corridas > 0
+        self._conexion.send(opciones)
+        mensaje = self._recibir(fin)
+        while mensaje[0] == 'avance':
+            if al_avanzar is not None:
+                al_avanzar(*mensaje[1:])
+            mensaje = self._recibir(fin)
+        estado, valor, segundos = mensaje
+        self.corridas += 1
+        if estado == 'error':
+            raise RuntimeError(valor)
+        return {'ruta': Path(valor), 'segundos': segundos, 'caliente': caliente}
@@ -1,198 +1,445 @@
-import requests
-import subprocess
-import time
-import sys
+import asyncio
+import json
 import os
-from pathlib import Path
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+import aiohttp
 
 # ==================== CONFIGURACIÓN ====================
-TOKEN = "8490086356:AAE1dlwognbqUlZIgyGU0m_iU8MOhkb-INU"
-CHAT_ID = "1874753772"
+TOKEN = os.environ.get("TELEGRAM_TOKEN") or "8490086356:AAE1dlwognbqUlZIgyGU0m_iU8MOhkb-INU"
+CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID") or "1874753772"
+# Servidor de la API de bots (TELEGRAM_API permite apuntar el bot a un servidor local de prueba)
+API_URL = (os.environ.get("TELEGRAM_API") or "https://api.telegram.org").rstrip("/")
 BASE_DIR = Path(__file__).parent.parent  # Subir un nivel desde telegram-bot/
 
-# Scripts a ejecutar en orden
-SCRIPTS = [
-    "filtros/1_generar-archivos-filtrado.py",
-    "filtros/2_Filtro-seleccion-de-lote.py",
-    "filtros/3_Formato-base.py"
-]
-
-# Archivo final esperado
-OUTPUT_PATTERN = "data/bases/BASE_FINAL_*.csv"
-
-
-# ==================== FUNCIONES ====================
-def send_message(text):
+# Timeout de una corrida del pipeline (las 3 etapas)
+TIMEOUT_PIPELINE = 1800
+# La base final se escribe comprimida ('zip' se abre directo en el teléfono; 'gzip' o None también sirven)
+COMPRESION = "zip"
+
+# Envío de la base (ver filtros/envio.py): Telegram acepta hasta 50 MB por archivo de un bot,
+# se deja margen para el multipart. Lo que no entra se parte por turno y por tamaño
+LIMITE_ARCHIVO = 48 * 1024 * 1024
+# Reintentos de cada parte, con espera exponencial (2s, 4s, 8s... hasta ESPERA_MAXIMA)
+REINTENTOS = 5
+ESPERA_INICIAL = 2
+ESPERA_MAXIMA = 60
+TIMEOUT_SUBIDA = 300
+
+# Long polling: segundos que getUpdates espera mensajes nuevos antes de responder vacío
+LONG_POLLING = 30
+# Conexiones del pool HTTP: una queda tomada por el long polling, el resto para los envíos
+CONEXIONES = 4
+# Corridas que pueden esperar en cola detrás de la que está corriendo
+MAXIMO_EN_COLA = 1
+
+sys.path.insert(0, str(BASE_DIR / "filtros"))
+import envio
+from catalogo import DATA_ROOT
+from metricas import resumir, ultimo_reporte
+from trabajador import Trabajador
+
+# Reportes de métricas que deja cada corrida del pipeline (ver filtros/metricas.py)
+RUNS_DIR = DATA_ROOT / "runs"
+
+# Proceso que mantiene el pipeline importado y los datos estáticos en memoria entre
+# corridas (ver filtros/trabajador.py): se arranca junto con el bot
+trabajador = Trabajador()
+
+# Las corridas se ejecutan en este hilo (una a la vez) para no bloquear el loop de asyncio
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline")
+
+# Estado compartido por el loop: sesión HTTP, cola de corridas, corrida en curso y última terminada
+estado = {
+    "sesion": None,
+    "cola": None,
+    "corridas": 0,   # número de la última corrida pedida
+    "trabajo": None,  # corrida en curso: {'numero', 'inicio', 'etapa', 'paso', 'cancelada'}
+    "ultima": None,   # última corrida terminada: {'numero', 'resultado', 'fin', 'segundos', 'ruta', 'detalle'}
+}
+# Referencias a las tareas de los comandos (asyncio solo guarda referencias débiles)
+tareas = set()
+# Un envío de archivos a la vez (el del final de la corrida y el de /last usan el mismo manifiesto)
+envios = asyncio.Lock()
+
+
+# ==================== API DE TELEGRAM ====================
+async def api(metodo, espera=None, **campos):
+    """
+    Llama a un método de la API de bots por la sesión compartida (conexiones
+    reutilizadas); `espera`: timeout total del pedido en segundos
+    """
+    url = f"{API_URL}/bot{TOKEN}/{metodo}"
+    async with estado["sesion"].post(url, json=campos, timeout=aiohttp.ClientTimeout(total=espera)) as response:
+        return await response.json()
+
+
+async def send_message(text):
     """Envía un mensaje al usuario por Telegram"""
-    url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-    data = {
-        "chat_id": CHAT_ID,
-        "text": text,
-        "parse_mode": "Markdown"
-    }
     try:
-        requests.post(url, json=data)
+        await api("sendMessage", espera=30, chat_id=CHAT_ID, text=text, parse_mode="Markdown")
     except Exception as e:
         print(f"Error enviando mensaje: {e}")
 
 
-def send_document(file_path):
-    """Envía un archivo al usuario por Telegram"""
-    url = f"https://api.telegram.org/bot{TOKEN}/sendDocument"
-    try:
-        # Verificar tamaño del archivo (Telegram límite: 50MB para bots)
-        file_size_mb = file_path.stat().st_size / (1024 * 1024)
-
-        if file_size_mb > 50:
-            send_message(f"⚠️ El archivo es muy grande ({file_size_mb:.1f}MB). Telegram permite máximo 50MB.\n\n📍 Ubicación del archivo:\n`{file_path}`")
-            return None
-
-        with open(file_path, 'rb') as file:
-            files = {'document': file}
-            data = {'chat_id': CHAT_ID}
-            # Aumentar timeout para archivos grandes
-            response = requests.post(url, files=files, data=data, timeout=300)
-
-            if response.status_code == 200:
-                return response.json()
-            else:
-                send_message(f"❌ Error del servidor: {response.status_code}\n{response.text[:200]}")
-                return None
-    except requests.exceptions.Timeout:
-        send_message(f"⏱️ Timeout al enviar archivo. El archivo está listo en:\n`{file_path}`")
-    except Exception as e:
-        print(f"Error enviando archivo: {e}")
-        send_message(f"❌ Error enviando archivo ({file_size_mb:.1f}MB): {type(e).__name__}\n\n📍 El archivo está disponible en:\n`{file_path}`")
+async def subir(parte, caption=None):
+    """
+    Sube un archivo con sendDocument por la sesión compartida, reintentando con
+    espera exponencial si falla la conexión o el servidor (5xx / 429). True si se subió
+    """
+    url = f"{API_URL}/bot{TOKEN}/sendDocument"
+    # Las partes son de a lo sumo LIMITE_ARCHIVO: se leen una vez, fuera del loop de asyncio
+    contenido = await asyncio.to_thread(parte.read_bytes)
+    for intento in range(REINTENTOS + 1):
+        espera = min(ESPERA_INICIAL * 2 ** intento, ESPERA_MAXIMA)
+        try:
+            data = aiohttp.FormData()
+            data.add_field("chat_id", CHAT_ID)
+            if caption:
+                data.add_field("caption", caption)
+            data.add_field("document", contenido, filename=parte.name)
+            async with estado["sesion"].post(url, data=data, timeout=aiohttp.ClientTimeout(total=TIMEOUT_SUBIDA)) as response:
+                if response.status == 200:
+                    return True
+                texto = await response.text()
+                motivo = f"HTTP {response.status}"
+                if response.status == 429:
+                    # Telegram indica cuánto esperar
+                    try:
+                        espera = json.loads(texto)["parameters"]["retry_after"]
+                    except (ValueError, KeyError, TypeError):
+                        pass
+                elif response.status < 500:
+                    await send_message(f"❌ Error del servidor: {response.status}\n{texto[:200]}")
+                    return False
+        except (aiohttp.ClientError, TimeoutError) as e:
+            motivo = type(e).__name__
+        if intento < REINTENTOS:
+            print(f"⚠️ Falló la subida de {parte.name} ({motivo}): reintento en {espera}s")
+            await asyncio.sleep(espera)
+    print(f"❌ No se pudo subir {parte.name} después de {REINTENTOS + 1} intentos ({motivo})")
+    return False
+
+
+async def send_document(file_path):
+    """
+    Envía la base al usuario por Telegram: comprimida y, si no entra en un
+    archivo, partida por turno / tamaño (ver filtros/envio.py). Si el envío se
+    corta, el siguiente (p. ej. /last) retoma desde la primera parte que no llegó
+    """
+    async with envios:
+        try:
+            partes, pendientes = await asyncio.get_running_loop().run_in_executor(
+                None, envio.preparar, file_path, LIMITE_ARCHIVO)
+        except Exception as e:
+            print(f"Error preparando archivo: {e}")
+            await send_message(f"❌ Error preparando el archivo: {type(e).__name__}\n\n📍 El archivo está disponible en:\n`{file_path}`")
+            return False
 
+        total = len(partes)
+        if total > 1:
+            tamanio_mb = file_path.stat().st_size / (1024 * 1024)
+            retoma = f" (se retoma desde la parte {partes.index(pendientes[0]) + 1})" if len(pendientes) < total else ""
+            await send_message(f"📦 El archivo ({tamanio_mb:.1f}MB) se envía en {total} partes{retoma}")
+
+        for parte in pendientes:
+            numero = partes.index(parte) + 1
+            if not await subir(parte, f"Parte {numero}/{total}" if total > 1 else None):
+                await send_message(f"❌ No se pudo enviar la parte {numero}/{total} (`{parte.name}`).\n\n"
+                                   f"Usa /last para reintentar desde esa parte.\n📍 El archivo está disponible en:\n`{file_path}`")
+                return False
+            envio.marcar_enviada(file_path, parte)
+        return True
 
-def execute_pipeline():
-    """Ejecuta los 3 scripts en secuencia"""
-    send_message("🚀 *Iniciando pipeline de filtrado*\n\n⏳ Este proceso puede tardar varios minutos...")
 
-    start_time = time.time()
+async def get_updates(offset=None):
+    """Obtiene actualizaciones del bot (long polling)"""
+    campos = {"timeout": LONG_POLLING}
+    if offset is not None:
+        campos["offset"] = offset
+    try:
+        return await api("getUpdates", espera=LONG_POLLING + 10, **campos)
+    except Exception as e:
+        print(f"Error obteniendo actualizaciones: {e}")
+        return None
 
-    for i, script in enumerate(SCRIPTS, 1):
-        script_name = Path(script).name
-        send_message(f"📄 *Script {i}/3:* `{script_name}`\n⏳ Ejecutando...")
 
-        try:
-            # Ejecutar script usando el mismo Python que ejecuta este bot
-            # Configurar variables de entorno para forzar UTF-8
-            env = os.environ.copy()
-            env['PYTHONIOENCODING'] = 'utf-8'
-
-            result = subprocess.run(
-                [sys.executable, script],
-                cwd=BASE_DIR,
-                capture_output=True,
-                text=True,
-                timeout=600,  # 10 minutos de timeout por script
-                env=env,
-                encoding='utf-8',
-                errors='replace'  # Reemplaza caracteres no decodificables
-            )
-
-            if result.returncode == 0:
-                send_message(f"✅ *Script {i}/3 completado:* `{script_name}`")
-            else:
-                error_msg = result.stderr[-500:] if result.stderr else "Error desconocido"
-                send_message(f"❌ *Error en script {i}/3:* `{script_name}`\n\n```\n{error_msg}\n```")
-                send_message("⚠️ Pipeline detenido debido al error")
-                return False
+async def send_run_report():
+    """Envía el resumen de métricas de la última corrida (tiempos, filas y memoria por etapa)"""
+    try:
+        reporte = ultimo_reporte(RUNS_DIR)
+        if reporte is None:
+            await send_message("ℹ️ Todavía no hay reportes de corridas en `data/runs`")
+            return
+        await send_message(f"📊 *Métricas de la corrida*\n```\n{resumir(reporte)}\n```")
+    except Exception as e:
+        print(f"Error leyendo reporte de métricas: {e}")
+
+
+# ==================== CORRIDAS ====================
+def _duracion(segundos):
+    return f"{int(segundos // 60)}m {int(segundos % 60)}s"
+
+
+async def informar_avance(trabajo, avances):
+    """Actualiza la etapa en curso (para /status) y avisa el inicio / fin de cada etapa"""
+    while (avance := await avances.get()) is not None:
+        evento, paso = avance
+        if paso["nivel"] != 1:
+            # Pasos internos: solo quedan como referencia para /status
+            trabajo["paso"] = paso["nombre"] if evento == "inicio" else None
+            continue
+        nombre = paso["nombre"].capitalize()
+        if evento == "inicio":
+            trabajo["etapa"], trabajo["paso"] = paso["nombre"], None
+            await send_message(f"⏳ *{nombre}*...")
+        elif paso.get("omitida"):
+            await send_message(f"⏭️ *{nombre}:* sin cambios, se reutiliza la anterior")
+        else:
+            filas = f" ({paso['filas_salida']} registros)" if paso.get("filas_salida") is not None else ""
+            await send_message(f"✅ *{nombre}:* {paso['wall_s']:.1f}s{filas}")
 
-        except subprocess.TimeoutExpired:
-            send_message(f"⏱️ *Timeout en script {i}/3:* `{script_name}`\n\nEl script superó los 10 minutos de ejecución")
-            return False
-        except Exception as e:
-            send_message(f"❌ *Error ejecutando script {i}/3:* `{script_name}`\n\n```\n{str(e)}\n```")
-            return False
 
-    # Calcular tiempo total
-    elapsed_time = time.time() - start_time
-    minutes = int(elapsed_time // 60)
-    seconds = int(elapsed_time % 60)
+async def correr_en_trabajador(trabajo):
+    """trabajador.ejecutar en el hilo de las corridas, informando el avance mientras tanto"""
+    loop = asyncio.get_running_loop()
+    # El avance llega desde el hilo de la corrida: se pasa al loop por una cola (mantiene el orden)
+    avances = asyncio.Queue()
 
-    send_message(f"✅ *Pipeline completado exitosamente*\n\n⏱️ Tiempo total: {minutes}m {seconds}s")
+    def al_avanzar(evento, paso):
+        loop.call_soon_threadsafe(avances.put_nowait, (evento, paso))
 
-    # Buscar y enviar archivo final
+    informar = asyncio.create_task(informar_avance(trabajo, avances))
     try:
-        output_dir = BASE_DIR / "data" / "bases"
-        output_files = list(output_dir.glob("BASE_FINAL_*.csv"))
-        if output_files:
-            # Ordenar por fecha de modificación, tomar el más reciente
-            latest_file = max(output_files, key=lambda p: p.stat().st_mtime)
-            send_message(f"📎 *Enviando archivo final:* `{latest_file.name}`")
-            send_document(latest_file)
-            send_message("🎉 *Proceso completado!*")
-        else:
-            send_message(f"⚠️ Pipeline completado pero no se encontró el archivo final en {output_dir}")
-    except Exception as e:
-        send_message(f"❌ Error buscando/enviando archivo: {str(e)}")
+        return await loop.run_in_executor(
+            executor, lambda: trabajador.ejecutar(timeout=TIMEOUT_PIPELINE, compresion=COMPRESION, al_avanzar=al_avanzar))
+    finally:
+        avances.put_nowait(None)
+        await informar
 
-    return True
 
+async def execute_pipeline(trabajo):
+    """Corre el pipeline (filtros/pipeline.py) en el proceso de trabajo y envía la base final"""
+    numero = trabajo["numero"]
+    await send_message(f"🚀 *Iniciando pipeline de filtrado* (corrida #{numero})\n\n⏳ Este proceso puede tardar varios minutos...")
+
+    # iniciar() puede reiniciar el proceso (código nuevo): se hace en el hilo de las corridas
+    if await asyncio.get_running_loop().run_in_executor(executor, trabajador.iniciar) or not trabajador.corridas:
+        await send_message("📄 *Pipeline:* cargando datos en el proceso de trabajo (primera corrida)...")
+    else:
+        await send_message(f"📄 *Pipeline:* proceso de trabajo en caliente ({trabajador.corridas} corridas previas)")
 
-def get_updates(offset=None):
-    """Obtiene actualizaciones del bot"""
-    url = f"https://api.telegram.org/bot{TOKEN}/getUpdates"
-    params = {"timeout": 30, "offset": offset}
     try:
-        response = requests.get(url, params=params, timeout=35)
-        return response.json()
+        resultado = await correr_en_trabajador(trabajo)
+    except TimeoutError:
+        await send_message(f"⏱️ *Timeout en el pipeline*\n\nLa corrida superó los {TIMEOUT_PIPELINE // 60} minutos de ejecución")
+        return {"resultado": "timeout"}
+    except RuntimeError as e:
+        if trabajo["cancelada"]:
+            await send_message(f"🛑 *Corrida #{numero} cancelada*")
+            return {"resultado": "cancelada"}
+        error_msg = str(e)[-500:] or "Error desconocido"
+        await send_message(f"❌ *Error en el pipeline*\n\n```\n{error_msg}\n```")
+        await send_message("⚠️ Pipeline detenido debido al error")
+        await send_run_report()
+        return {"resultado": "error", "detalle": error_msg}
     except Exception as e:
-        print(f"Error obteniendo actualizaciones: {e}")
-        return None
+        await send_message(f"❌ *Error ejecutando el pipeline*\n\n```\n{str(e)}\n```")
+        return {"resultado": "error", "detalle": str(e)}
 
+    await send_message(f"✅ *Pipeline completado exitosamente*\n\n⏱️ Tiempo total: {_duracion(resultado['segundos'])}")
+    await send_run_report()
 
-def main():
-    """Función principal del bot"""
-    print("🤖 Bot de Telegram iniciado")
-    print(f"👤 Escuchando mensajes del Chat ID: {CHAT_ID}")
-    print("📱 Envía /start para ejecutar el pipeline\n")
+    # Enviar el archivo final que generó la corrida
+    latest_file = resultado["ruta"]
+    try:
+        if latest_file.is_file():
+            await send_message(f"📎 *Enviando archivo final:* `{latest_file.name}`")
+            if await send_document(latest_file):
+                await send_message("🎉 *Proceso completado!*")
+        else:
+            await send_message(f"⚠️ Pipeline completado pero no se encontró el archivo final `{latest_file}`")
+    except Exception as e:
+        await send_message(f"❌ Error buscando/enviando archivo: {str(e)}")
+    return {"resultado": "ok", "ruta": latest_file}
 
-    send_message("🤖 *Bot activado*\n\nEnvía /start para ejecutar el pipeline de filtrado")
 
+async def atender_cola():
+    """Toma las corridas pedidas con /start de a una y las ejecuta"""
+    cola = estado["cola"]
+    while True:
+        numero = await cola.get()
+        trabajo = {"numero": numero, "inicio": time.monotonic(), "etapa": None, "paso": None, "cancelada": False}
+        estado["trabajo"] = trabajo
+        try:
+            final = await execute_pipeline(trabajo)
+        except Exception as e:
+            print(f"❌ Error en la corrida #{numero}: {e}")
+            final = {"resultado": "error", "detalle": str(e)}
+        finally:
+            estado["trabajo"] = None
+            cola.task_done()
+        estado["ultima"] = {"numero": numero, "fin": datetime.now(),
+                            "segundos": time.monotonic() - trabajo["inicio"], **final}
+
+
+# ==================== COMANDOS ====================
+def lanzar(corrutina):
+    """Atiende un comando en su propia tarea, sin frenar el long polling"""
+    tarea = asyncio.create_task(corrutina)
+    tareas.add(tarea)
+    tarea.add_done_callback(tareas.discard)
+
+
+async def cmd_start():
+    cola = estado["cola"]
+    pendientes = cola.qsize() + (estado["trabajo"] is not None)
+    if pendientes > MAXIMO_EN_COLA:
+        await send_message("⏳ Ya hay una corrida en curso y otra en cola. Usa /status para ver el avance")
+        return
+    estado["corridas"] += 1
+    cola.put_nowait(estado["corridas"])
+    if pendientes:
+        await send_message(f"📥 Corrida #{estado['corridas']} en cola: empieza cuando termine la anterior")
+
+
+async def cmd_status():
+    trabajo = estado["trabajo"]
+    if trabajo is None:
+        proceso = f"en caliente ({trabajador.corridas} corridas)" if trabajador.vivo() else "detenido"
+        await send_message(f"💤 *Sin corridas en curso*\n\n⚙️ Proceso de trabajo: {proceso}")
+        return
+    etapa = trabajo["etapa"] or "preparando"
+    paso = f"\n🔹 Paso: {trabajo['paso']}" if trabajo["paso"] else ""
+    en_cola = f"\n📥 En cola: {estado['cola'].qsize()}" if estado["cola"].qsize() else ""
+    await send_message(f"⚙️ *Corrida #{trabajo['numero']} en curso*\n\n"
+                       f"📄 {etapa.capitalize()}{paso}\n⏱️ {_duracion(time.monotonic() - trabajo['inicio'])}{en_cola}")
+
+
+async def cmd_cancel():
+    trabajo = estado["trabajo"]
+    # Las corridas en cola se descartan
+    descartadas = 0
+    while not estado["cola"].empty():
+        estado["cola"].get_nowait()
+        estado["cola"].task_done()
+        descartadas += 1
+    if trabajo is None:
+        texto = f"🗑️ {descartadas} corrida(s) en cola descartada(s)" if descartadas else "💤 No hay corridas en curso"
+        await send_message(texto)
+        return
+    trabajo["cancelada"] = True
+    trabajador.cancelar()
+    await send_message(f"🛑 Cancelando la corrida #{trabajo['numero']}...")
+
+
+async def cmd_last():
+    ultima = estado["ultima"]
+    if ultima is None:
+        await send_message("ℹ️ Todavía no terminó ninguna corrida desde que arrancó el bot. Usa /reporte para ver las métricas de la última corrida registrada")
+        return
+    iconos = {"ok": "✅", "error": "❌", "timeout": "⏱️", "cancelada": "🛑"}
+    texto = (f"{iconos[ultima['resultado']]} *Última corrida #{ultima['numero']}:* {ultima['resultado']}\n\n"
+             f"🕐 Terminó: {ultima['fin']:%d/%m %H:%M}\n⏱️ Duración: {_duracion(ultima['segundos'])}")
+    if ultima.get("ruta"):
+        texto += f"\n📎 Archivo: `{ultima['ruta'].name}`"
+    if ultima.get("detalle"):
+        texto += f"\n\n```\n{ultima['detalle'][-300:]}\n```"
+    await send_message(texto)
+    if ultima.get("ruta") and ultima["ruta"].is_file():
+        await send_document(ultima["ruta"])
+
+
+COMANDOS = {
+    "/start": cmd_start,
+    "/status": cmd_status,
+    "/cancel": cmd_cancel,
+    "/last": cmd_last,
+    "/reporte": send_run_report,
+}
+
+
+async def escuchar():
+    """Long polling de mensajes: cada comando se atiende en su propia tarea (nunca espera a una corrida)"""
     offset = None
-
     while True:
         try:
-            updates = get_updates(offset)
-
-            if updates and updates.get("ok"):
-                for update in updates.get("result", []):
-                    offset = update["update_id"] + 1
+            updates = await get_updates(offset)
+
+            if not (updates and updates.get("ok")):
+                await asyncio.sleep(5)
+                continue
+
+            for update in updates.get("result", []):
+                offset = update["update_id"] + 1
+
+                # Verificar si hay un mensaje
+                if "message" not in update:
+                    continue
+
+                message = update["message"]
+                chat_id = str(message["chat"]["id"])
+                text = message.get("text", "")
+
+                # Solo responder al chat autorizado
+                if chat_id != CHAT_ID:
+                    continue
+
+                print(f"📩 Mensaje recibido: {text}")
+                comando = COMANDOS.get(text.split("@")[0].strip() if text else "")
+                if comando is not None:
+                    lanzar(comando())
+                else:
+                    lanzar(send_message(
+                        "ℹ️ Comando no reconocido.\n\nUsa /start para ejecutar el pipeline, /status para ver el avance, "
+                        "/cancel para cancelarlo, /last para la última corrida o /reporte para ver sus métricas"))
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Error en el loop principal: {e}")
+            await asyncio.sleep(5)
 
-                    # Verificar si hay un mensaje
-                    if "message" not in update:
-                        continue
 
-                    message = update["message"]
-                    chat_id = str(message["chat"]["id"])
-                    text = message.get("text", "")
+async def run_bot():
+    """Sesión HTTP compartida, cola de corridas y long polling hasta que se detenga el bot"""
+    conector = aiohttp.TCPConnector(limit=CONEXIONES)
+    async with aiohttp.ClientSession(connector=conector) as sesion:
+        estado["sesion"] = sesion
+        estado["cola"] = asyncio.Queue()
 
-                    # Solo responder al chat autorizado
-                    if chat_id != CHAT_ID:
-                        continue
+        # El proceso de trabajo importa el pipeline y precarga los datos mientras se espera el primer /start
+        await asyncio.get_running_loop().run_in_executor(executor, trabajador.iniciar)
 
-                    print(f"📩 Mensaje recibido: {text}")
+        await send_message("🤖 *Bot activado*\n\nEnvía /start para ejecutar el pipeline de filtrado")
+        principales = [asyncio.create_task(escuchar()), asyncio.create_task(atender_cola())]
+        try:
+            await asyncio.gather(*principales)
+        finally:
+            for tarea in principales + list(tareas):
+                tarea.cancel()
+            await send_message("🛑 *Bot detenido*")
 
-                    # Procesar comando /start
-                    if text == "/start":
-                        print("🚀 Ejecutando pipeline...")
-                        execute_pipeline()
-                    else:
-                        send_message("ℹ️ Comando no reconocido.\n\nUsa /start para ejecutar el pipeline")
 
-            time.sleep(1)
+def main():
+    """Función principal del bot"""
+    print("🤖 Bot de Telegram iniciado")
+    print(f"👤 Escuchando mensajes del Chat ID: {CHAT_ID}")
+    print("📱 Envía /start para ejecutar el pipeline\n")
 
-        except KeyboardInterrupt:
-            print("\n\n👋 Bot detenido por el usuario")
-            send_message("🛑 *Bot detenido*")
-            break
-        except Exception as e:
-            print(f"❌ Error en el loop principal: {e}")
-            time.sleep(5)
+    try:
+        asyncio.run(run_bot())
+    except KeyboardInterrupt:
+        print("\n\n👋 Bot detenido por el usuario")
+    finally:
+        # Cortar la corrida en curso (si hay) y cerrar el proceso de trabajo
+        trabajador.cancelar()
+        executor.shutdown(wait=True)
+        trabajador.detener()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,96 @@
+"""
+Servidor local que imita la API de bots de Telegram (sendMessage,
+sendDocument, getUpdates), para probar el bot sin red:
+
+    async with BotApiFalsa() as api:
+        monkeypatch.setattr(telegram_bot, 'API_URL', api.url)
+        api.fallas += [500, (429, 1), 'cortar']   # próximos sendDocument
+        ...
+        api.documentos   # [(nombre del archivo, caption), ...] que llegaron
+
+Cada falla programada se consume con un sendDocument: un código HTTP, (429,
+retry_after), 'cortar' (cierra la conexión sin responder) o None (se
+acepta). Sin fallas pendientes el documento se acepta.
+
+Para probar el bot a mano: `python tests/bot_api_falsa.py` y correr el bot con
+TELEGRAM_API=http://127.0.0.1:8081
+"""
+import asyncio
+
+from aiohttp import web
+
+
+class BotApiFalsa:
+    def __init__(self, puerto=0):
+        self.puerto = puerto
+        self.url = None
+        self.fallas = []
+        self.documentos = []
+        self.mensajes = []
+        self.intentos = 0  # pedidos de sendDocument (aceptados o no)
+        self.actualizaciones = asyncio.Queue()
+        self._update_id = 0
+        self._runner = None
+
+    # ==================== MÉTODOS ====================
+    async def _send_message(self, request):
+        campos = await request.json()
+        self.mensajes.append(campos['text'])
+        return web.json_response({'ok': True, 'result': {'message_id': len(self.mensajes)}})
+
+    async def _send_document(self, request):
+        self.intentos += 1
+        falla = self.fallas.pop(0) if self.fallas else None
+        if falla == 'cortar':
+            request.transport.close()
+            return web.Response()
+        campos = await request.post()
+        if isinstance(falla, tuple):
+            codigo, retry_after = falla
+            return web.json_response({'ok': False, 'error_code': codigo, 'description': 'Too Many Requests',
+                                      'parameters': {'retry_after': retry_after}}, status=codigo)
+        if falla is not None:
+            return web.json_response({'ok': False, 'error_code': falla, 'description': 'Error'}, status=falla)
+        self.documentos.append((campos['document'].filename, campos.get('caption')))
+        return web.json_response({'ok': True, 'result': {'message_id': len(self.documentos)}})
+
+    async def _get_updates(self, request):
+        campos = await request.json()
+        try:
+            actualizacion = await asyncio.wait_for(self.actualizaciones.get(), campos.get('timeout', 0))
+        except TimeoutError:
+            return web.json_response({'ok': True, 'result': []})
+        return web.json_response({'ok': True, 'result': [actualizacion]})
+
+    def enviar_comando(self, texto, chat_id=1):
+        """Encola un mensaje del usuario para el próximo getUpdates"""
+        self._update_id += 1
+        self.actualizaciones.put_nowait({'update_id': self._update_id,
+                                         'message': {'chat': {'id': chat_id}, 'text': texto}})
+
+    # ==================== SERVIDOR ====================
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post('/bot{token}/sendMessage', self._send_message)
+        app.router.add_post('/bot{token}/sendDocument', self._send_document)
+        app.router.add_post('/bot{token}/getUpdates', self._get_updates)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        sitio = web.TCPSite(self._runner, '127.0.0.1', self.puerto)
+        await sitio.start()
+        self.puerto = sitio._server.sockets[0].getsockname()[1]
+        self.url = f'http://127.0.0.1:{self.puerto}'
+        return self
+
+    async def __aexit__(self, *_):
+        await self._runner.cleanup()
+
+
+async def _servir(puerto):
+    async with BotApiFalsa(puerto) as api:
+        print(f'API de bots falsa en {api.url}')
+        await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(_servir(8081))
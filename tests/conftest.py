@@ -0,0 +1,71 @@
+import asyncio
+import importlib.util
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+# Los módulos de filtros/, telegram-bot/ y benchmarks/ se importan por nombre, como en los scripts
+RAIZ = Path(__file__).resolve().parent.parent
+for carpeta in ('filtros', 'telegram-bot', 'benchmarks'):
+    sys.path.insert(0, str(RAIZ / carpeta))
+
+
+@pytest.fixture(scope='session')
+def datos_sinteticos(tmp_path_factory):
+    """Directorio de datos sintéticos chico (como los de benchmarks/, ~10k filas de base)"""
+    from generadores import generar
+    directorio = tmp_path_factory.mktemp('datos')
+    generar(directorio, fraccion=0.002, semilla=1)
+    return directorio
+
+
+@pytest.fixture
+def datos(datos_sinteticos, tmp_path, monkeypatch):
+    """Copia de los datos sintéticos como directorio de datos del catálogo (los scripts escriben en él)"""
+    import catalogo
+    directorio = tmp_path / 'datos'
+    shutil.copytree(datos_sinteticos, directorio)
+    monkeypatch.setattr(catalogo, 'DATA_ROOT', directorio)
+    monkeypatch.setattr(catalogo, 'DATA_RAW', directorio / 'raw')
+    monkeypatch.setattr(catalogo, 'DATA_PROCESSED', directorio / 'processed')
+    catalogo.vaciar_cache()
+    return directorio
+
+
+def cargar_script(nombre):
+    """Módulo nuevo de un script de filtros/ (sus rutas del catálogo se resuelven al importarlo)"""
+    spec = importlib.util.spec_from_file_location(nombre.replace('-', '_'), RAIZ / 'filtros' / f'{nombre}.py')
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+# ==================== BOT ====================
+@pytest.fixture
+def bot(monkeypatch):
+    """Módulo del bot para las pruebas: sin esperas largas entre reintentos y con estado propio"""
+    import telegram_bot
+    monkeypatch.setattr(telegram_bot, 'REINTENTOS', 3)
+    monkeypatch.setattr(telegram_bot, 'ESPERA_INICIAL', 0.01)
+    monkeypatch.setattr(telegram_bot, 'ESPERA_MAXIMA', 0.05)
+    monkeypatch.setattr(telegram_bot, 'TIMEOUT_SUBIDA', 10)
+    monkeypatch.setattr(telegram_bot, 'LONG_POLLING', 1)
+    monkeypatch.setattr(telegram_bot, 'estado', dict(telegram_bot.estado, ultima=None, trabajo=None, corridas=0))
+    return telegram_bot
+
+
+def correr_con_api(bot, prueba, monkeypatch):
+    """Corre `prueba(api)` con el bot apuntando a una API falsa (ver bot_api_falsa.py). Devuelve la API"""
+    import aiohttp
+    from bot_api_falsa import BotApiFalsa
+
+    async def principal():
+        async with BotApiFalsa() as api, aiohttp.ClientSession() as sesion:
+            monkeypatch.setattr(bot, 'API_URL', api.url)
+            bot.estado['sesion'] = sesion
+            bot.estado['cola'] = asyncio.Queue()
+            await prueba(api)
+            return api
+    return asyncio.run(principal())
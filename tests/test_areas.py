@@ -0,0 +1,43 @@
+"""ani1_y_linea_15 contra las funciones escalares de referencia (las del script 3 original)"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from areas import CODIGOS_3_DIGITOS, CODIGOS_4_DIGITOS, agregar_15_a_linea, ani1_y_linea_15, extraer_ani1
+
+
+def _lineas(rng, n):
+    """Código de 2, 3 o 4 dígitos (o cualquier prefijo) + abonado de 0 a 8 dígitos, a veces con espacios"""
+    codigos = np.concatenate([
+        ['11'] * 50, sorted(CODIGOS_3_DIGITOS), sorted(CODIGOS_4_DIGITOS), ['1', '2', '22', '29', '9', '0', ''],
+    ])
+    abonados = [str(v)[1:1 + largo] for v, largo in zip(rng.integers(10**9, 10**10, n), rng.integers(0, 9, n))]
+    bordes = rng.choice(['', '', '', ' ', '\t', '　'], (2, n))
+    return [a + c + b + z for a, c, b, z in zip(bordes[0], rng.choice(codigos, n), abonados, bordes[1])]
+
+
+def _comparar(serie):
+    ani1, linea_15 = ani1_y_linea_15(serie)
+    assert ani1.index.equals(serie.index) and linea_15.index.equals(serie.index)
+    assert ani1.tolist() == [extraer_ani1(v) for v in serie.to_numpy(dtype=object)]
+    assert linea_15.tolist() == [agregar_15_a_linea(v) for v in serie.to_numpy(dtype=object)]
+
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_igual_a_la_referencia(dtype):
+    rng = np.random.default_rng(19)
+    valores = _lineas(rng, 20_000)
+    valores[::53] = [None] * len(valores[::53])
+    _comparar(pd.Series(valores, dtype=dtype, index=np.arange(len(valores)) * 2))
+
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_valores_cortos_y_nulos(dtype):
+    _comparar(pd.Series(['', ' ', '1', '11', '111', '2', '22', '220', '2202', '22021', '3', '38', '388',
+                         '3894', ' 11 ', None, '0', '15'], dtype=dtype))
+
+
+def test_columna_mixta():
+    # Lo que no es texto (números, NaN) no tiene código de área
+    _comparar(pd.Series([1123456789, '1123456789', 2202.0, np.nan, None, '2202123456'], dtype=object))
+    _comparar(pd.Series([], dtype=object))
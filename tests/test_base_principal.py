@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import catalogo
+from base_principal import COLUMNAS, REGLAS_ESTATICAS, _filtros_estaticos, _limpiar, base_elegible
+from generadores import generar_base
+
+
+def _sin_predicado(archivo, reglas=REGLAS_ESTATICAS):
+    """La base elegible leyendo todas las filas y filtrando después (sin pushdown)"""
+    df_base = _filtros_estaticos(_limpiar(pd.read_parquet(archivo, columns=COLUMNAS)), reglas)
+    return df_base.sort_values('linea_num', kind='stable', ignore_index=True)
+
+
+def _comparar(archivo, snapshot):
+    catalogo.vaciar_cache()
+    obtenido = base_elegible(archivo, snapshot)
+    esperado = _sin_predicado(archivo)
+    for columna in ['linea', 'dni', 'compania', 'contrato', 'nombre_completo']:
+        assert obtenido[columna].tolist() == esperado[columna].tolist()
+    return obtenido
+
+
+def _fila(linea, compania='Claro', contrato='Contrato CPP', nombre='X'):
+    return {
+        'linea': linea, 'nombre_completo': nombre, 'tipo_doc': 'DNI', 'dni': '30111222',
+        'compania': compania, 'contrato': contrato, 'fecha_portout': '2024-05-01',
+        'cantidad_de_lineas': '2', 'otras_lineas': None,
+    }
+
+
+def test_duplicado_cuya_primera_fila_no_pasa(tmp_path):
+    archivo = tmp_path / 'base.parquet'
+    filas = [
+        # La primera aparición no pasa (compañía): la línea no entra aunque la segunda pase
+        _fila('3421234567', compania='Movistar'),
+        _fila('3421234567', nombre='segunda'),
+        # Mismo número con '.0' y espacios: es la misma línea después de limpiar
+        _fila(' 3511234567.0 ', contrato='Baja'),
+        _fila('3511234567', nombre='segunda'),
+        # La primera pasa: queda la primera
+        _fila('3871234567', nombre='primera'),
+        _fila('3871234567', compania='Personal'),
+        _fila('3411234567'),
+    ]
+    pq.write_table(pa.Table.from_pylist(filas), archivo)
+    obtenido = _comparar(archivo, tmp_path / 'base_elegible.parquet')
+    assert obtenido['linea'].tolist() == ['3411234567', '3871234567']
+    assert obtenido['nombre_completo'].tolist() == ['X', 'primera']
+
+
+def test_igual_que_sin_predicado_en_base_sintetica(tmp_path):
+    archivo = tmp_path / 'base.parquet'
+    generar_base(np.random.default_rng(7), 50_000, archivo)
+    _comparar(archivo, tmp_path / 'base_elegible.parquet')
+
+
+def test_reglas_sin_dni_ni_prefijo(tmp_path):
+    # Sin las reglas de DNI y prefijo pueden quedar DNI o líneas no numéricos
+    reglas = [regla for regla in REGLAS_ESTATICAS if regla['columna'] not in ('dni', 'linea_num')]
+    archivo = tmp_path / 'base.parquet'
+    filas = [_fila('3421234567'), dict(_fila('3511234567'), dni='sin dato'), _fila('abc')]
+    pq.write_table(pa.Table.from_pylist(filas), archivo)
+    catalogo.vaciar_cache()
+    obtenido = base_elegible(archivo, tmp_path / 'base_elegible.parquet', reglas)
+    assert sorted(obtenido['linea'].tolist()) == ['3421234567', '3511234567', 'abc']
+    assert obtenido['dni'].isna().sum() == 1
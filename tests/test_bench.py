@@ -0,0 +1,18 @@
+import json
+import subprocess
+
+import bench
+
+
+def test_caso_que_falla_no_usa_el_reporte_anterior(tmp_path, monkeypatch):
+    # Reporte de una corrida anterior del mismo caso
+    (tmp_path / 'runs').mkdir()
+    (tmp_path / 'runs' / 'corrida-20250101T000000000000.json').write_text(
+        json.dumps({'nombre': 'lote', 'estado': 'ok', 'pasos': []}), encoding='utf-8')
+
+    def muerto(argumentos, **_):
+        # El hijo muere (p. ej. OOM-kill) antes de escribir su reporte
+        return subprocess.CompletedProcess(argumentos, -9, '', '')
+
+    monkeypatch.setattr(bench.subprocess, 'run', muerto)
+    assert bench._hijo('lote', tmp_path) is None
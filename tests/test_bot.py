@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import zipfile
+
+import pytest
+
+from conftest import correr_con_api
+
+
+class TrabajadorFalso:
+    """
+    Reemplazo de trabajador.Trabajador: avisa las etapas como el pipeline y, si
+    `bloquear`, se queda en la etapa 1 hasta `soltar()` o `cancelar()`
+    """
+
+    def __init__(self, ruta, bloquear=False):
+        self.ruta = ruta
+        self.corridas = 0
+        self.en_curso = threading.Event()
+        self._soltar = threading.Event()
+        self._cancelada = False
+        if not bloquear:
+            self._soltar.set()
+
+    def iniciar(self):
+        return False
+
+    def vivo(self):
+        return True
+
+    def soltar(self):
+        self._soltar.set()
+
+    def cancelar(self):
+        self._cancelada = True
+        self._soltar.set()
+
+    def ejecutar(self, timeout=None, al_avanzar=None, **opciones):
+        al_avanzar('inicio', {'nombre': 'etapa 1: ingesta', 'nivel': 1})
+        al_avanzar('inicio', {'nombre': 'consolidado Iris', 'nivel': 2})
+        self.en_curso.set()
+        self._soltar.wait(10)
+        if self._cancelada:
+            raise RuntimeError('El proceso de trabajo terminó (código -15)')
+        al_avanzar('fin', {'nombre': 'consolidado Iris', 'nivel': 2, 'wall_s': 0.1})
+        al_avanzar('fin', {'nombre': 'etapa 1: ingesta', 'nivel': 1, 'wall_s': 0.2, 'filas_salida': None})
+        al_avanzar('inicio', {'nombre': 'etapa 2: lote', 'nivel': 1})
+        al_avanzar('fin', {'nombre': 'etapa 2: lote', 'nivel': 1, 'wall_s': 0.0, 'omitida': True})
+        al_avanzar('inicio', {'nombre': 'etapa 3: formato', 'nivel': 1})
+        al_avanzar('fin', {'nombre': 'etapa 3: formato', 'nivel': 1, 'wall_s': 1.5, 'filas_salida': 120})
+        self.corridas += 1
+        return {'ruta': self.ruta, 'segundos': 2.0, 'caliente': False}
+
+
+@pytest.fixture
+def base_final(tmp_path):
+    archivo = tmp_path / 'BASE_FINAL_prueba.zip'
+    with zipfile.ZipFile(archivo, 'w') as zf:
+        zf.writestr('BASE_FINAL_prueba.csv', 'ANI1;BBDD\n1144445555;BASE_TM\n')
+    return archivo
+
+
+async def _esperar(condicion, segundos=10):
+    for _ in range(int(segundos / 0.02)):
+        if condicion():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError('no se cumplió a tiempo')
+
+
+async def _con_bot(bot, prueba):
+    """Long polling y cola de corridas del bot corriendo mientras dura `prueba`"""
+    principales = [asyncio.create_task(bot.escuchar()), asyncio.create_task(bot.atender_cola())]
+    try:
+        await prueba()
+    finally:
+        for tarea in principales:
+            tarea.cancel()
+        await asyncio.gather(*principales, *bot.tareas, return_exceptions=True)
+
+
+@pytest.fixture
+def sin_reportes(bot, tmp_path, monkeypatch):
+    monkeypatch.setattr(bot, 'RUNS_DIR', tmp_path / 'runs')
+
+
+def test_status_y_cancel_durante_una_corrida(bot, base_final, sin_reportes, monkeypatch):
+    falso = TrabajadorFalso(base_final, bloquear=True)
+    monkeypatch.setattr(bot, 'trabajador', falso)
+
+    async def prueba(api):
+        def llego(texto):
+            return lambda: any(texto in mensaje for mensaje in api.mensajes)
+
+        async def pasos():
+            api.enviar_comando('/start', chat_id=bot.CHAT_ID)
+            await asyncio.to_thread(falso.en_curso.wait, 10)
+            # Mientras la corrida está en curso el bot sigue atendiendo comandos
+            api.enviar_comando('/start', chat_id=bot.CHAT_ID)
+            await _esperar(llego('Corrida #2 en cola'))
+            api.enviar_comando('/status', chat_id=bot.CHAT_ID)
+            await _esperar(llego('Corrida #1 en curso'))
+            api.enviar_comando('/cancel', chat_id=bot.CHAT_ID)
+            await _esperar(lambda: bot.estado['ultima'] is not None)
+
+        await _con_bot(bot, pasos)
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    estado = next(mensaje for mensaje in api.mensajes if 'Corrida #1 en curso' in mensaje)
+    assert 'Etapa 1: ingesta' in estado and 'Paso: consolidado Iris' in estado and 'En cola: 1' in estado
+    assert any('Cancelando la corrida #1' in mensaje for mensaje in api.mensajes)
+    assert any('Corrida #1 cancelada' in mensaje for mensaje in api.mensajes)
+    assert bot.estado['ultima']['resultado'] == 'cancelada'
+    # La corrida en cola se descartó: nunca empezó
+    assert bot.estado['cola'].empty()
+    assert not any('corrida #2)' in mensaje for mensaje in api.mensajes)
+    assert api.documentos == []
+
+
+def test_avance_por_etapa_en_orden(bot, base_final, sin_reportes, monkeypatch):
+    monkeypatch.setattr(bot, 'trabajador', TrabajadorFalso(base_final))
+
+    async def prueba(api):
+        async def pasos():
+            api.enviar_comando('/start', chat_id=bot.CHAT_ID)
+            await _esperar(lambda: bot.estado['ultima'] is not None)
+
+        await _con_bot(bot, pasos)
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    assert bot.estado['ultima']['resultado'] == 'ok'
+    esperados = [
+        'Iniciando pipeline de filtrado* (corrida #1)',
+        'cargando datos en el proceso de trabajo',
+        '⏳ *Etapa 1: ingesta*...',
+        '✅ *Etapa 1: ingesta:* 0.2s',
+        '⏳ *Etapa 2: lote*...',
+        '⏭️ *Etapa 2: lote:* sin cambios',
+        '⏳ *Etapa 3: formato*...',
+        '✅ *Etapa 3: formato:* 1.5s (120 registros)',
+        'Pipeline completado exitosamente',
+        f'Enviando archivo final:* `{base_final.name}`',
+        'Proceso completado',
+    ]
+    posiciones = [next(i for i, mensaje in enumerate(api.mensajes) if texto in mensaje) for texto in esperados]
+    assert posiciones == sorted(posiciones)
+    # Los pasos internos no se informan por mensaje
+    assert not any('consolidado Iris' in mensaje for mensaje in api.mensajes)
+    assert api.documentos == [(base_final.name, None)]
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import envio
+from conftest import correr_con_api
+from salida import escribir_csv
+
+
+def _parte(tmp_path):
+    parte = tmp_path / 'BASE_FINAL.zip'
+    parte.write_bytes(b'PK' + bytes(1000))
+    return parte
+
+
+def test_reintenta_despues_de_un_500(bot, tmp_path, capsys, monkeypatch):
+    async def prueba(api):
+        api.fallas += [500, 502]
+        assert await bot.subir(_parte(tmp_path), 'Parte 1/1')
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    assert api.intentos == 3
+    assert api.documentos == [('BASE_FINAL.zip', 'Parte 1/1')]
+    assert capsys.readouterr().out.count('HTTP 5') == 2
+
+
+def test_429_espera_retry_after(bot, tmp_path, capsys, monkeypatch):
+    async def prueba(api):
+        api.fallas.append((429, 1))
+        assert await bot.subir(_parte(tmp_path))
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    assert api.intentos == 2 and len(api.documentos) == 1
+    assert 'HTTP 429): reintento en 1s' in capsys.readouterr().out
+
+
+def test_reintenta_si_se_corta_la_conexion(bot, tmp_path, monkeypatch):
+    async def prueba(api):
+        api.fallas.append('cortar')
+        assert await bot.subir(_parte(tmp_path))
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    assert api.intentos == 2 and len(api.documentos) == 1
+
+
+def test_reintentos_agotados(bot, tmp_path, capsys, monkeypatch):
+    async def prueba(api):
+        api.fallas += [500] * 10
+        assert not await bot.subir(_parte(tmp_path))
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    assert api.intentos == bot.REINTENTOS + 1
+    assert api.documentos == []
+    assert 'No se pudo subir BASE_FINAL.zip después de 4 intentos (HTTP 500)' in capsys.readouterr().out
+
+
+def test_error_4xx_no_se_reintenta(bot, tmp_path, monkeypatch):
+    async def prueba(api):
+        api.fallas.append(400)
+        assert not await bot.subir(_parte(tmp_path))
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    assert api.intentos == 1
+    assert api.mensajes and 'Error del servidor: 400' in api.mensajes[0]
+
+
+def _base_final(tmp_path, filas=6000):
+    """BASE_FINAL con dos turnos y texto poco comprimible (para que se parta)"""
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'ANI1': rng.integers(10**9, 10**10, filas).astype(str),
+        'Nombre': [format(x, 'x') for x in rng.integers(0, 2**62, filas)],
+        'BBDD': np.where(np.arange(filas) % 2 == 0, 'BASE_TM', 'BASE_TT'),
+    })
+    return escribir_csv(df, tmp_path / 'BASE_FINAL_prueba.csv')
+
+
+def test_last_retoma_desde_la_parte_que_no_llego(bot, tmp_path, monkeypatch):
+    archivo = _base_final(tmp_path)
+    monkeypatch.setattr(bot, 'LIMITE_ARCHIVO', archivo.stat().st_size // 6)
+    bot.estado['ultima'] = {'numero': 1, 'resultado': 'ok', 'fin': datetime.now(), 'segundos': 10,
+                            'ruta': archivo}
+
+    async def prueba(api):
+        # Primer envío: la segunda parte falla en todos los intentos
+        api.fallas += [None] + [500] * (bot.REINTENTOS + 1)
+        assert not await bot.send_document(archivo)
+        assert len(api.documentos) == 1
+
+        # /last por getUpdates: retoma desde la segunda parte
+        api.enviar_comando('/last', chat_id=bot.CHAT_ID)
+        escucha = asyncio.create_task(bot.escuchar())
+        manifiesto = envio.directorio_envio(archivo) / 'envio.json'
+        try:
+            for _ in range(200):
+                partes = json.loads(manifiesto.read_text(encoding='utf-8'))
+                if len(partes['enviadas']) == len(partes['partes']):
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            escucha.cancel()
+        await asyncio.gather(*bot.tareas, return_exceptions=True)
+
+    api = correr_con_api(bot, prueba, monkeypatch)
+    partes, _ = envio.preparar(archivo, bot.LIMITE_ARCHIVO)
+    total = len(partes)
+    assert total > 2
+    nombres = [nombre for nombre, _ in api.documentos]
+    # Cada parte llegó una sola vez: la primera no se volvió a subir
+    assert sorted(nombres) == sorted(parte.name for parte in partes)
+    assert [caption for _, caption in api.documentos] == [f'Parte {i}/{total}' for i in range(1, total + 1)]
+    assert any(f'se envía en {total} partes (se retoma desde la parte 2)' in texto for texto in api.mensajes)
@@ -0,0 +1,23 @@
+import pyarrow as pa
+
+import catalogo
+
+
+def test_cache_separa_por_formato_y_esquema(tmp_path):
+    archivo = tmp_path / 'reporte.csv'
+    archivo.write_text('a;b,c\n1;2,3\n', encoding='utf-8')
+    catalogo.vaciar_cache()
+    catalogo.configurar_cache(16)
+    try:
+        por_punto_y_coma = catalogo.tabla(archivo, formato='csv', separador=';')
+        por_coma = catalogo.tabla(archivo, formato='csv', separador=',')
+        assert por_punto_y_coma.column_names == ['a', 'b,c']
+        assert por_coma.column_names == ['a;b', 'c']
+
+        conformada = catalogo.tabla(archivo, formato='csv', separador=';', esquema=pa.schema([('a', pa.int64())]))
+        assert conformada.schema.field('a').type == pa.int64()
+        assert catalogo.tabla(archivo, formato='csv', separador=';').schema.field('a').type == pa.string()
+        assert catalogo.estado_cache()['entradas'] == 3
+    finally:
+        catalogo.configurar_cache(0)
+        catalogo.vaciar_cache()
@@ -0,0 +1,66 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import esquemas
+from consolidado import _bucket, agregar_al_consolidado, leer_consolidado, migrar_consolidado
+
+
+def _iris(lineas, fecha, estado):
+    return pd.DataFrame({
+        'linea': lineas,
+        'fecha': pd.Timestamp(fecha),
+        'estado': estado,
+        'fecha_consulta': pd.Timestamp(fecha),
+    })
+
+
+def _assert_una_por_linea(directorio, lineas, estado):
+    df = leer_consolidado(directorio, esquemas.IRIS)
+    assert df['linea'].dtype == 'int64'
+    assert sorted(df['linea']) == sorted(lineas)
+    assert (df['estado'] == estado).all()
+
+
+def test_bucket_no_depende_del_dtype():
+    lineas = [1123456789, 2214123456, 3514987654]
+    assert (_bucket(pd.Series(lineas, dtype='Int64').to_numpy(dtype='int64')) == _bucket(lineas)).all()
+    assert (_bucket(pd.Series(lineas, dtype=float)) == _bucket(lineas)).all()
+
+
+def test_migracion_con_clave_invalida_y_upsert(tmp_path):
+    lineas = [1123456789 + i for i in range(50)]
+    # Consolidado viejo: archivo único guardado como texto, con una línea que no es un número
+    legado = _iris([str(v) for v in lineas] + ['no-es-linea'], '2025-01-01', 'Activo').astype(str)
+    legado.to_parquet(tmp_path / 'Iris-consolidado.parquet')
+    directorio = tmp_path / 'Iris-consolidado'
+
+    migrar_consolidado(directorio, esquemas.IRIS)
+    _assert_una_por_linea(directorio, lineas, 'Activo')
+
+    escritos = agregar_al_consolidado(directorio, _iris(lineas, '2025-02-01', 'Port Out'), esquemas.IRIS)
+    assert escritos == len(lineas)
+    _assert_una_por_linea(directorio, lineas, 'Port Out')
+
+
+def test_almacen_con_bucket_viejo_se_reparte(tmp_path):
+    lineas = [1123456789 + i for i in range(50)]
+    directorio = tmp_path / 'Iris-consolidado'
+    # Almacén sin particion.json: todo en un bucket que no es el de su hash int64
+    (directorio / 'bucket=00').mkdir(parents=True)
+    tabla = esquemas.a_tabla(_iris(lineas, '2025-01-01', 'Activo'), esquemas.IRIS)
+    pq.write_table(tabla, directorio / 'bucket=00' / 'parte-20250101T000000000000.parquet')
+
+    migrar_consolidado(directorio, esquemas.IRIS)
+    _assert_una_por_linea(directorio, lineas, 'Activo')
+    agregar_al_consolidado(directorio, _iris(lineas, '2025-02-01', 'Port Out'), esquemas.IRIS)
+    _assert_una_por_linea(directorio, lineas, 'Port Out')
+
+
+def test_upsert_omite_claves_nulas(tmp_path):
+    directorio = tmp_path / 'Iris-consolidado'
+    df = _iris(pd.array([1123456789, None], dtype='Int64'), '2025-01-01', 'Activo')
+    assert agregar_al_consolidado(directorio, df, esquemas.IRIS) == 1
+    tabla = pa.concat_tables([pq.read_table(f) for f in directorio.glob('bucket=*/*.parquet')])
+    assert tabla['linea'].null_count == 0
+    _assert_una_por_linea(directorio, [1123456789], 'Activo')
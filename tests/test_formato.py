@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import cargar_script
+
+
+@pytest.fixture
+def etapa3(datos):
+    """Script 3 sobre una copia de los datos sintéticos"""
+    return cargar_script('3_Formato-base')
+
+
+def test_limitar_por_clave_como_groupby_head(etapa3):
+    rng = np.random.default_rng(11)
+    claves = rng.integers(0, 300, 2000).astype(str).astype(object)
+    claves[::37] = None
+    df = pd.DataFrame({'DNI': claves, 'fila': np.arange(len(claves))})
+
+    obtenido = etapa3.limitar_por_clave(df, 'DNI', 2, np.random.default_rng(5))
+    mezclado = df.take(np.random.default_rng(5).permutation(len(df)))
+    esperado = mezclado.groupby('DNI').head(2).reset_index(drop=True)
+    pd.testing.assert_frame_equal(obtenido, esperado)
+    assert obtenido['DNI'].value_counts().max() == 2
+
+
+def test_lote_vacio(etapa3):
+    lote = pd.DataFrame({columna: pd.Series([], dtype=object) for columna in [
+        'linea', 'nombre_completo', 'tipo_doc', 'dni', 'compania', 'contrato', 'fecha_portout',
+        'cantidad_de_lineas', 'otras_lineas']})
+    archivo = etapa3.main(df=lote, semilla=1)
+    assert archivo.read_text(encoding='utf-8').splitlines() == [
+        'Nombre del Cliente;DNI;ANI1;Linea1;Linea2;PlanActual;OperadorActual;Domicilio;CP;Localidad;'
+        'email;Provincia;BBDD;Generico']
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from indices import cargar_cuit, consultar_cuit
+
+
+def _merge(dnis, archivo):
+    """Cruce original del script 3: merge left contra base_cuit.csv"""
+    df_cuit = pd.read_csv(archivo, delimiter=",", encoding="utf-8", dtype=str)
+    df = pd.DataFrame({'DNI': pd.Series(dnis, dtype='str')}).merge(df_cuit[['DNI', 'CUIT']], on='DNI', how='left')
+    email = df['CUIT'].notnull().map({True: 'BASE CUIT', False: ""})
+    provincia = df['CUIT'].fillna("").astype(str).str.replace(r'\.0$', '', regex=True).str.strip()
+    return pd.DataFrame({'DNI': df['DNI'], 'email': email, 'Provincia': provincia})
+
+
+def _indice(dnis, indice):
+    filas, cuits, con_cuit = consultar_cuit(indice, dnis)
+    return pd.DataFrame({
+        'DNI': pd.Series(dnis, dtype='str').take(filas).reset_index(drop=True),
+        'email': np.where(con_cuit, 'BASE CUIT', ''),
+        'Provincia': cuits,
+    })
+
+
+def _comparar(dnis, indice, archivo):
+    pd.testing.assert_frame_equal(_indice(dnis, indice), _merge(dnis, archivo), check_dtype=False)
+
+
+def test_cuit_como_el_merge(tmp_path):
+    archivo = tmp_path / 'base_cuit.csv'
+    archivo.write_text(
+        'DNI,CUIT\n'
+        '30111222,20301112223\n'
+        '30111222,27301112224\n'      # DNI con dos CUIT: dos filas
+        '25000000,20250000001.0\n'    # CUIT leído como float en algún export
+        '28000000, 23280000009 \n'
+        '29000000,\n'                 # DNI sin CUIT
+        'sin dato,20999999999\n',
+        encoding='utf-8',
+    )
+    rng = np.random.default_rng(3)
+    dnis = ['30111222', '25000000', '99999999', '28000000', '29000000', '30111222', None, '']
+    dnis += list(rng.choice(['30111222', '25000000', '12345678', '28000000'], 200))
+    _comparar(dnis, cargar_cuit(tmp_path / 'indice_cuit', archivo), archivo)
+
+
+def test_cuit_se_reconstruye_si_cambia_el_csv(tmp_path, capsys):
+    archivo = tmp_path / 'base_cuit.csv'
+    archivo.write_text('DNI,CUIT\n30111222,20301112223\n', encoding='utf-8')
+    cargar_cuit(tmp_path / 'indice_cuit', archivo)
+    assert 'reconstruido' in capsys.readouterr().out
+
+    # Sin cambios se reutiliza
+    cargar_cuit(tmp_path / 'indice_cuit', archivo)
+    assert 'reconstruido' not in capsys.readouterr().out
+
+    archivo.write_text('DNI,CUIT\n30111222,20301112223\n40111222,20401112223\n', encoding='utf-8')
+    indice = cargar_cuit(tmp_path / 'indice_cuit', archivo)
+    assert 'reconstruido' in capsys.readouterr().out
+    _comparar(['40111222', '30111222', '50111222'], indice, archivo)
@@ -0,0 +1,75 @@
+import pandas as pd
+
+from ingesta import leer_reporte
+
+
+ENCABEZADO = 'Inicio;Cliente;Tipificación;Causa Terminación\n'
+
+
+def _reporte(tmp_path, filas):
+    archivo = tmp_path / 'reporte.csv'
+    archivo.write_text(ENCABEZADO + ''.join(f'{";".join(fila)}\n' for fila in filas), encoding='utf-8')
+    return leer_reporte(archivo)[0].set_index('Cliente')
+
+
+def test_cliente_solo_con_inicio_vacio(tmp_path):
+    df = _reporte(tmp_path, [
+        ('', '011 15 2345 6789', 'Venta', ''),
+        ('01/10/2025 10:00:00', '3511234567', 'Venta', ''),
+    ])
+    assert sorted(df.index) == ['1123456789', '3511234567']
+    assert pd.isna(df.loc['1123456789', 'fecha'])
+    assert df.loc['3511234567', 'fecha'] == pd.Timestamp('2025-10-01').date()
+
+
+def test_gana_el_inicio_mas_reciente(tmp_path):
+    df = _reporte(tmp_path, [
+        ('01/10/2025 10:00:00', '1123456789', 'Venta', ''),
+        ('', '011 15 2345 6789', 'Ya tiene MVS', ''),
+        ('03/10/2025 09:00:00', '01123456789', 'No Disp.', 'La Linea se encuentra en reparación'),
+        ('02/10/2025 18:30:00', '1123456789', 'Venta', ''),
+    ])
+    assert len(df) == 1
+    assert df.loc['1123456789', 'Tipificacion'] == 'La Linea se encuentra en reparación'
+    assert df.loc['1123456789', 'fecha'] == pd.Timestamp('2025-10-03').date()
+
+
+def test_iris_en_varios_bloques(tmp_path, monkeypatch):
+    import numpy as np
+
+    import ingesta
+
+    rng = np.random.default_rng(2)
+    n = 20_000
+    filas = pd.DataFrame({
+        'linea': rng.integers(3_400_000_000, 3_400_002_000, n).astype(str),
+        # Pocas fechas distintas: muchos empates, también entre bloques
+        'fecha': [f'{d:02d}/10/2025' for d in rng.integers(1, 6, n)],
+        'estado': rng.choice(['Activa', 'Port Out', 'Baja', 'Port In'], n),
+    })
+    archivo = tmp_path / 'iris.txt'
+    archivo.write_text(''.join(f'{l}&{f}&{e}\n' for l, f, e in filas.itertuples(index=False)) + 'x&1/1/2025\n',
+                       encoding='utf-8')
+    monkeypatch.setattr(ingesta, 'BLOQUE_IRIS', 32 << 10)
+
+    df, avisos = ingesta.leer_iris(archivo)
+    assert avisos == ['⚠ Se descartaron 1 filas corruptas/incompletas']
+    filas['fecha'] = pd.to_datetime(filas['fecha'], format='%d/%m/%Y')
+    esperado = filas.sort_values('fecha', ascending=False, kind='stable').drop_duplicates('linea')
+    columnas = ['linea', 'fecha', 'estado']
+    pd.testing.assert_frame_equal(
+        df[columnas].astype({'fecha': 'datetime64[ns]'}).sort_values('linea', ignore_index=True),
+        esperado[columnas].astype({'fecha': 'datetime64[ns]'}).sort_values('linea', ignore_index=True),
+        check_dtype=False,
+    )
+
+
+def test_inicio_invalido_queda_nulo(tmp_path):
+    df = _reporte(tmp_path, [
+        ('31/02/2025 10:00:00', '1123456789', 'Venta', ''),
+        ('1/10/2025 9:05:00', '3511234567', 'Venta', ''),
+        ('2025-10-01', '3411234567', 'Venta', ''),
+    ])
+    assert pd.isna(df.loc['1123456789', 'fecha'])
+    assert pd.isna(df.loc['3411234567', 'fecha'])
+    assert df.loc['3511234567', 'fecha'] == pd.Timestamp('2025-10-01').date()
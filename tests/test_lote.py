@@ -0,0 +1,24 @@
+import shutil
+
+import pytest
+
+from conftest import cargar_script
+
+
+@pytest.fixture
+def etapa2(datos):
+    """Script 2 sobre una copia de los datos sintéticos, con el reporte de ayer en su lugar"""
+    modulo = cargar_script('2_Filtro-seleccion-de-lote')
+    shutil.copyfile(datos / 'raw' / 'reportes' / 'reporte-ayer.csv', modulo.reporte_dia_anterior())
+    return modulo
+
+
+def test_motores_escriben_el_mismo_base_csv(etapa2):
+    salidas = {}
+    for motor in ('pandas', 'arrow'):
+        lote = etapa2.main(guardar_csv=True, motor=motor)
+        salidas[motor] = etapa2.BASE_OUTPUT.read_bytes()
+        etapa2.BASE_OUTPUT.unlink()
+        assert len(lote) > 0
+    assert salidas['pandas'] == salidas['arrow']
+    assert etapa2.paridad()
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import metricas
+from metricas import medir
+
+MB = metricas.MB
+
+
+def _ocupar(megabytes):
+    """Toca `megabytes` de memoria y la libera"""
+    bloque = np.ones(megabytes * MB // 8)
+    return float(bloque[-1])
+
+
+@pytest.mark.skipif(not metricas._reiniciar_pico(), reason='sin /proc/self/clear_refs')
+def test_pico_por_paso_con_reinicio():
+    with medir('afuera') as afuera:
+        with medir('pesado') as pesado:
+            _ocupar(200)
+        with medir('liviano') as liviano:
+            _ocupar(1)
+    assert pesado['rss_pico_mb'] - liviano['rss_pico_mb'] > 150
+    # El paso que contiene al pesado se queda con su pico aunque se haya reiniciado adentro
+    assert afuera['rss_pico_mb'] >= pesado['rss_pico_mb']
+    with medir('después') as despues:
+        pass
+    assert despues['rss_pico_mb'] < pesado['rss_pico_mb'] - 150
+
+
+def test_pico_sin_reinicio(monkeypatch):
+    monkeypatch.setattr(metricas, '_reinicio', False)
+    monkeypatch.setattr(metricas, '_picos', [])
+    with medir('pesado') as pesado:
+        _ocupar(300)
+    with medir('liviano') as liviano:
+        pass
+    # El pico de vida no subió durante el paso liviano: no se le atribuye
+    assert liviano['rss_pico_mb'] is None
+    assert pesado['rss_pico_mb'] is None or pesado['rss_pico_mb'] > 300
@@ -0,0 +1,26 @@
+import pandas as pd
+
+from reglas import aplicar, evaluar
+
+
+def _df():
+    return pd.DataFrame({'dni': [5, 20000000, 30000000]})
+
+
+REGLA_DNI = {'nombre': 'dni', 'tipo': 'rango', 'columna': 'dni', 'minimo': 10000000, 'maximo': 99999999}
+
+
+def test_sin_reglas_activas_no_rechaza_nada():
+    for reglas in ([], [dict(REGLA_DNI, activa=False)]):
+        mascara, atribucion = evaluar(_df(), reglas)
+        assert mascara.tolist() == [True, True, True]
+        assert [paso['primera'] for paso in atribucion] == [0] * len(reglas)
+    # La regla inactiva igual cuenta las filas que rechazaría
+    assert atribucion[0]['total'] == 1
+
+
+def test_primera_regla_que_rechaza():
+    reglas = [REGLA_DNI, dict(REGLA_DNI, nombre='dni alto', minimo=25000000)]
+    df, atribucion = aplicar(_df(), reglas)
+    assert df['dni'].tolist() == [30000000]
+    assert [(paso['primera'], paso['total']) for paso in atribucion] == [(1, 1), (1, 2)]
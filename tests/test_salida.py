@@ -0,0 +1,47 @@
+import gzip
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from salida import escribir_csv
+
+
+def _esperado(df):
+    return df.to_csv(sep=';', index=False).encode('utf-8')
+
+
+CASOS = {
+    'booleanos en object': pd.DataFrame({'a': pd.Series([True, False, None], dtype=object), 'b': [1, 2, 3]}),
+    'una columna con nulos': pd.DataFrame({'a': ['x', None, '']}),
+    'una columna object': pd.DataFrame({'a': pd.Series(['x', None, ''], dtype=object)}),
+    'mixtos': pd.DataFrame({'a': pd.Series([1, 'a;b', 2.5, None, True, 'c"d'], dtype=object)}),
+    'floats en object': pd.DataFrame({'a': pd.Series([1.0, 2.5, None], dtype=object), 'b': ['x', 'y', 'z']}),
+    'nullables': pd.DataFrame({
+        'i': pd.array([1, None, 3], dtype='Int64'),
+        'b': pd.array([True, None, False], dtype='boolean'),
+        'f': [1.0, np.nan, 1e20],
+    }),
+    'fechas': pd.DataFrame({'d': pd.to_datetime(['2024-01-01', None, '2024-01-02 10:00:00'], format='ISO8601')}),
+    'fila toda nula': pd.DataFrame({'a': [None, 'x'], 'b': [None, 'y']}),
+    'categórico': pd.DataFrame({'c': pd.Categorical(['BBDD 1', None, 'BBDD;2']), 'n': [1, 2, 3]}),
+}
+
+
+@pytest.mark.parametrize('nombre', CASOS)
+def test_igual_que_to_csv(tmp_path, nombre):
+    df = CASOS[nombre]
+    archivo = escribir_csv(df, tmp_path / 'salida.csv', filas_por_lote=2)
+    assert archivo.read_bytes() == _esperado(df)
+
+
+def test_igual_que_to_csv_comprimido(tmp_path):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        'linea': rng.integers(3_000_000_000, 3_999_999_999, 1000).astype(str),
+        'dni': rng.integers(10_000_000, 99_999_999, 1000),
+        'activo': pd.Series(rng.random(1000) < 0.5, dtype=object),
+        'monto': np.where(rng.random(1000) < 0.1, np.nan, rng.random(1000) * 1000),
+    })
+    archivo = escribir_csv(df, tmp_path / 'salida.csv', compresion='gzip', filas_por_lote=300)
+    assert gzip.decompress(archivo.read_bytes()) == _esperado(df)
@@ -0,0 +1,90 @@
+"""
+Pruebas diferenciales: las versiones vectorizadas de telefonos.py contra las
+funciones escalares de referencia aplicadas fila por fila.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from telefonos import normalize_phone, normalizar_telefonos, procesar_numero, procesar_numeros
+
+
+N = 100_000
+
+PARES = [
+    (normalizar_telefonos, normalize_phone),
+    (procesar_numeros, procesar_numero),
+]
+
+# Caracteres que tocan alguna regla: dígitos, separadores, espacios Unicode y no ASCII
+ALFABETO = list('0123456789') * 4 + list(' -()\t\n\x0b\x1c/:.+') + ['a', 'x', 'ñ', '٣', ' ', ' ']
+
+PREFIJOS = ['', '', '0', '90', '090', '00', '9', ' ', ' 0']
+CARACTERISTICAS = ['11', '15', '221', '351', '2202', '2966', '0', '']
+CONECTORES = ['', '', '15', ' 15 ', '-15-', '(15)', '1', '5']
+
+
+def _aleatorios(rng, n):
+    """Strings de largo 0 a 16 con caracteres de ALFABETO"""
+    largos = rng.integers(0, 17, n)
+    caracteres = rng.choice(ALFABETO, largos.sum())
+    cortes = np.cumsum(largos)[:-1]
+    return [''.join(fila) for fila in np.split(caracteres, cortes)]
+
+
+def _con_forma_de_telefono(rng, n):
+    """Prefijo + característica + 15 opcional + abonado de 4 a 9 dígitos"""
+    abonados = [str(v)[1:1 + largo] for v, largo in
+                zip(rng.integers(10**9, 10**10, n), rng.integers(4, 10, n))]
+    return [
+        p + c + q + a for p, c, q, a in zip(
+            rng.choice(PREFIJOS, n), rng.choice(CARACTERISTICAS, n), rng.choice(CONECTORES, n), abonados,
+        )
+    ]
+
+
+def _como_lista(serie):
+    return [None if pd.isna(v) else v for v in serie]
+
+
+def _comparar(vectorizada, escalar, serie):
+    resultado = vectorizada(serie)
+    assert resultado.index.equals(serie.index)
+    assert _como_lista(resultado) == _como_lista(serie.map(escalar))
+
+
+@pytest.mark.parametrize('vectorizada, escalar', PARES)
+@pytest.mark.parametrize('dtype', [object, 'str'])
+@pytest.mark.parametrize('generador', [_aleatorios, _con_forma_de_telefono])
+def test_igual_a_la_referencia(vectorizada, escalar, dtype, generador):
+    rng = np.random.default_rng(20251001)
+    valores = generador(rng, N)
+    valores[::97] = [None] * len(valores[::97])
+    # Al final: separadores sueltos después del último valor y filas nulas / vacías
+    valores[-6:] = ['11 4444-5555 ', '1144445555-', None, '', None, '']
+    serie = pd.Series(valores, dtype=dtype, index=np.arange(N) * 3)
+    _comparar(vectorizada, escalar, serie)
+
+
+@pytest.mark.parametrize('vectorizada, escalar', PARES)
+def test_columna_mixta(vectorizada, escalar):
+    serie = pd.Series([1123456789, 1115123456.0, '0221-15-4123456', None, np.nan, '', ' 9011 1512345678 '],
+                      dtype=object)
+    _comparar(vectorizada, escalar, serie)
+
+
+@pytest.mark.parametrize('vectorizada, escalar', PARES)
+def test_bordes(vectorizada, escalar):
+    serie = pd.Series(['', '0', '9', '90', '090', '11', '1115', '11151', '22115', '221151',
+                       '2202151', '0901115', '   ', '15', '015', '9015'], dtype=object)
+    _comparar(vectorizada, escalar, serie)
+    _comparar(vectorizada, escalar, serie.iloc[3:])
+    _comparar(vectorizada, escalar, pd.Series([], dtype=object))
+
+
+@pytest.mark.parametrize('vectorizada, escalar', PARES)
+@pytest.mark.parametrize('dtype', [object, 'str'])
+@pytest.mark.parametrize('cola', [[None], [''], [None, ''], ['', None, None]])
+def test_nulos_y_vacios_al_final(vectorizada, escalar, dtype, cola):
+    for ultimo in ['11 4444-5555 ', '1144445555-', '(011) 15-4444-5555\t', '  ']:
+        _comparar(vectorizada, escalar, pd.Series([ultimo] + cola, dtype=dtype))